@@ -0,0 +1,285 @@
+"""
+Banc d'essai reproductible des solveurs robustes.
+
+Chaque instance est générée à partir d'une graine dérivée de (seed, n, p, numéro d'instance) :
+deux critères lancés avec la même graine sont comparés sur les mêmes instances. Les temps
+sont mesurés avec time.perf_counter et séparés en phases (génération, z*, construction du
+modèle, résolution, extraction de la solution), les instances peuvent être réparties sur un
+pool de processus, et les résultats (moyenne et percentiles par configuration) sont écrits
+en CSV ou en JSON pour suivre les régressions d'une version à l'autre. Les critères de chemin
+sont mesurés sur des graphes générés par generateurGraphes (p est alors le nombre de sommets).
+
+Exemple :
+    python benchmark.py --criteres maxmin minOWA --n 5 10 --p 10 20 --instances 10 --jobs 4 --sortie bench.csv
+    python benchmark.py --criteres chemin_maxmin chemin_minOWA --n 3 --p 100 1000 --topologie grid
+"""
+import argparse
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import numpy as np
+
+from generateurGraphes import TOPOLOGIES, generer_graphe
+from parallele import nb_workers, threads_par_worker
+from solveur import BACKENDS, ContexteSolveur, gurobi_disponible
+
+# critères disponibles : nom -> (type d'instance, critère OWA)
+CRITERES = {
+    "maxmin": ("sac", False),
+    "minmaxRegret": ("sac", False),
+    "maxOWA": ("sac", True),
+    "minOWA": ("sac", True),
+    "chemin_maxmin": ("chemin", False),
+    "chemin_minmax_regret": ("chemin", False),
+    "chemin_maxOWA": ("chemin", True),
+    "chemin_minOWA": ("chemin", True),
+}
+
+# nom de la fonction de résolution -> critère (pour calcul_tps_resol)
+FONCTIONS = {
+    "robust_shortest_path_maxmin": "chemin_maxmin",
+    "robust_shortest_path_minmax_regret": "chemin_minmax_regret",
+    "robust_shortest_path_maxOWA": "chemin_maxOWA",
+    "robust_shortest_path_minOWA": "chemin_minOWA",
+}
+
+# critères qui calculent z* : le cache de z* est désactivé pour mesurer son calcul
+# (sauf si options contient cache)
+_AVEC_Z_STAR = ("minmaxRegret", "minOWA", "chemin_minmax_regret", "chemin_minOWA")
+
+# phases chronométrées et percentiles calculés
+PHASES = ("generation", "z_star", "construction", "resolution", "extraction", "total")
+PERCENTILES = (50, 90, 99)
+
+# graine réservée aux instances de chauffe
+_GRAINE_CHAUFFE = 2 ** 32 - 1
+
+# contexte solveur du processus courant (un par worker)
+_ctx = None
+
+
+def generer_instance_sac(rng, n, p):
+    """
+    Instance de sélection de projets : coûts et utilités entre 1 et 100, budget = 50% du
+    coût total, poids OWA entre 1 et n + 1.
+    """
+    costs = rng.integers(1, 101, p)
+    return {
+        "costs": costs,
+        "utilities": rng.integers(1, 101, (n, p)),
+        "budget": int(0.5 * costs.sum()),
+        "weights": rng.integers(1, n + 2, n).tolist(),
+    }
+
+
+def generer_instance_chemin(rng, n, nb_noeuds, **generation):
+    """
+    Instance de chemin robuste sur environ nb_noeuds sommets avec n scénarios (voir
+    generateurGraphes.generer_graphe pour topologie, degre et correlation), poids OWA entre
+    1 et n + 1.
+    """
+    instance = generer_graphe(nb_noeuds, n, rng=rng, **generation)
+    instance["weights"] = rng.integers(1, n + 2, n).tolist()
+    return instance
+
+
+def _generer(critere, rng, n, p, generation):
+    if CRITERES[critere][0] == "sac":
+        return generer_instance_sac(rng, n, p)
+    return generer_instance_chemin(rng, n, p, **generation)
+
+
+def _resoudre(critere, instance, n, p, options):
+    """
+    Résoudre une instance et retourner (objectif, statut, temps par phase).
+    """
+    genre, owa = CRITERES[critere]
+    phases = {}
+    if critere in _AVEC_Z_STAR:
+        options = dict({"cache": False}, **options)
+
+    if genre == "sac":
+        import maxmin, minmaxRegret, maxOWA, minOWA
+        func = {"maxmin": maxmin.maxmin, "minmaxRegret": minmaxRegret.minmaxRegret,
+                "maxOWA": maxOWA.maxOWA, "minOWA": minOWA.minOWA}[critere]
+        args = [p, n, instance["costs"], instance["utilities"], instance["budget"]]
+        if owa:
+            args.append(instance["weights"])
+        res = func(*args, verbose=False, ctx=_ctx, **options)
+        phases["z_star"] = res.infos.get("temps_z_star", np.nan)
+        phases["construction"] = res.temps_construction
+        phases["resolution"] = res.temps_resolution
+        phases["extraction"] = res.temps_extraction
+        return res.objectif, res.statut, phases
+
+    import cheminRobuste as cr
+    func = {"chemin_maxmin": cr.robust_shortest_path_maxmin,
+            "chemin_minmax_regret": cr.robust_shortest_path_minmax_regret,
+            "chemin_maxOWA": cr.robust_shortest_path_maxOWA,
+            "chemin_minOWA": cr.robust_shortest_path_minOWA}[critere]
+    args = [instance["nodes"], instance["transitions"], instance["start"], instance["end"], n]
+    if owa:
+        args.append(instance["weights"])
+        options = dict(options, verbose=False)
+    infos = {}
+    try:
+        path, valeur = func(*args, ctx=_ctx, infos=infos, **options)
+    except ValueError:
+        path, valeur = None, None
+    for phase in ("z_star", "construction", "resolution"):
+        phases[phase] = infos.get(f"temps_{phase}", np.nan)
+    return valeur, "OPTIMAL" if path is not None else "ECHEC", phases
+
+
+def _executer(critere, n, p, k, seed, options, generation):
+    """
+    Générer puis résoudre l'instance numéro k de la configuration (n, p).
+    """
+    debut = time.perf_counter()
+    instance = _generer(critere, np.random.default_rng([seed, n, p, k]), n, p, generation)
+    duree_generation = time.perf_counter() - debut
+
+    debut = time.perf_counter()
+    objectif, statut, phases = _resoudre(critere, instance, n, p, options)
+    total = time.perf_counter() - debut
+
+    ligne = {"critere": critere, "n": n, "p": p, "instance": k, "seed": seed,
+             "objectif": objectif, "statut": statut, "generation": duree_generation, "total": total,
+             "noeuds": len(instance["nodes"]) if "nodes" in instance else np.nan,
+             "arcs": len(instance["transitions"]) if "transitions" in instance else np.nan}
+    for phase in ("z_star", "construction", "resolution", "extraction"):
+        ligne[phase] = phases.get(phase, np.nan)
+    return ligne
+
+
+def _initialiser_worker(threads, criteres, warmup, options, generation):
+    """
+    Créer le contexte solveur du processus puis faire les résolutions de chauffe (imports,
+    environnement Gurobi, caches) sur de petites instances non mesurées.
+    """
+    global _ctx
+    # sans gurobipy, les solveurs utilisent le backend "highs" et pas de contexte Gurobi
+    _ctx = ContexteSolveur(threads=threads) if gurobi_disponible() else None
+    for critere in criteres:
+        for k in range(warmup):
+            _executer(critere, 2, 5, k, _GRAINE_CHAUFFE, options, generation)
+
+
+def lancer_benchmark(criteres, n_values, p_values, nb_instances, seed=0, warmup=1, n_jobs=1,
+                     threads=None, options=None, generation=None, sortie=None, sortie_brute=None):
+    """
+    Mesurer les temps de résolution de plusieurs critères sur une grille de tailles.
+
+    Paramètres :
+    - criteres : noms de critères (clés de CRITERES).
+    - n_values : nombres de scénarios ; p_values : nombres de projets (ou de sommets pour
+      les critères de chemin).
+    - nb_instances : nombre d'instances par configuration (n, p).
+    - seed : graine des instances (None : graine aléatoire).
+    - warmup : nombre de résolutions de chauffe par critère et par worker.
+    - n_jobs : nombre de processus (1 = dans le processus courant, None = tous les cœurs).
+    - threads : threads de Gurobi par worker (par défaut, cœurs / n_jobs).
+    - options : arguments supplémentaires des solveurs (par exemple {"formulation": "compact"}
+      ou {"backend": "highs"} pour comparer les backends sur les mêmes instances).
+    - generation : paramètres du générateur de graphes des critères de chemin
+      (par exemple {"topologie": "grid", "correlation": 0.8}).
+    - sortie, sortie_brute : fichiers .csv ou .json du résumé et des mesures brutes.
+
+    Retourne (résumé par configuration, mesures brutes) sous forme de DataFrames.
+    """
+    import pandas as pd
+
+    for critere in criteres:
+        if critere not in CRITERES:
+            raise ValueError(f"Critère inconnu : {critere} (attendu : {', '.join(CRITERES)})")
+    if seed is None:
+        seed = int(np.random.SeedSequence().entropy % 2 ** 32)
+    options = options or {}
+    generation = generation or {}
+    if threads is None:
+        threads = threads_par_worker(n_jobs) if nb_workers(n_jobs) > 1 else None
+
+    taches = [(critere, n, p, k, seed, options, generation)
+              for critere in criteres for n in n_values for p in p_values for k in range(nb_instances)]
+
+    lignes = []
+    if nb_workers(n_jobs) == 1:
+        global _ctx
+        _initialiser_worker(threads, criteres, warmup, options, generation)
+        try:
+            lignes = [_executer(*tache) for tache in taches]
+        finally:
+            if _ctx is not None:
+                _ctx.dispose()
+            _ctx = None
+    else:
+        with ProcessPoolExecutor(max_workers=nb_workers(n_jobs), initializer=_initialiser_worker,
+                                 initargs=(threads, criteres, warmup, options, generation)) as executor:
+            futures = [executor.submit(_executer, *tache) for tache in taches]
+            lignes = [future.result() for future in as_completed(futures)]
+
+    brut = pd.DataFrame(lignes).sort_values(["critere", "n", "p", "instance"]).reset_index(drop=True)
+    resume = resumer(brut)
+
+    if sortie is not None:
+        ecrire(resume, sortie)
+    if sortie_brute is not None:
+        ecrire(brut, sortie_brute)
+    return resume, brut
+
+
+def resumer(brut):
+    """
+    Moyenne et percentiles de chaque phase par (critere, n, p), avec la taille moyenne des
+    graphes (|V|, |A|) pour les critères de chemin.
+    """
+    groupes = brut.groupby(["critere", "n", "p"])[list(PHASES)]
+    resume = brut.groupby(["critere", "n", "p"])[["noeuds", "arcs"]].mean()
+    resume = resume.join(groupes.mean().add_suffix("_moyenne"))
+    for q in PERCENTILES:
+        resume = resume.join(groupes.quantile(q / 100).add_suffix(f"_p{q}"))
+    resume["instances"] = groupes.size()
+    return resume.reset_index()
+
+
+def ecrire(df, chemin):
+    """
+    Écrire un DataFrame en JSON (extension .json) ou en CSV (sinon).
+    """
+    if str(chemin).endswith(".json"):
+        df.to_json(chemin, orient="records", indent=2)
+    else:
+        df.to_csv(chemin, index=False)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Banc d'essai des solveurs robustes.")
+    parser.add_argument("--criteres", nargs="+", default=["maxmin", "minmaxRegret", "maxOWA", "minOWA"],
+                        choices=list(CRITERES))
+    parser.add_argument("--n", nargs="+", type=int, default=[5, 10, 15], help="nombres de scénarios")
+    parser.add_argument("--p", nargs="+", type=int, default=[10, 15, 20], help="nombres de projets ou de sommets")
+    parser.add_argument("--instances", type=int, default=10)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--warmup", type=int, default=1)
+    parser.add_argument("--jobs", type=int, default=1)
+    parser.add_argument("--threads", type=int, default=None)
+    parser.add_argument("--backend", default=None, choices=BACKENDS,
+                        help="solveur des programmes (par défaut : Gurobi s'il est installé)")
+    parser.add_argument("--topologie", default="layered", choices=TOPOLOGIES, help="graphes des critères de chemin")
+    parser.add_argument("--degre", type=int, default=3, help="nombre moyen d'arcs sortants par sommet")
+    parser.add_argument("--correlation", type=float, default=0.5, help="corrélation des temps entre scénarios")
+    parser.add_argument("--sortie", default=None, help="fichier .csv ou .json du résumé")
+    parser.add_argument("--sortie-brute", default=None, help="fichier .csv ou .json des mesures brutes")
+    args = parser.parse_args(argv)
+
+    resume, _ = lancer_benchmark(args.criteres, args.n, args.p, args.instances, seed=args.seed,
+                                 warmup=args.warmup, n_jobs=args.jobs, threads=args.threads,
+                                 options={"backend": args.backend} if args.backend else None,
+                                 generation={"topologie": args.topologie, "degre": args.degre,
+                                             "correlation": args.correlation},
+                                 sortie=args.sortie, sortie_brute=args.sortie_brute)
+    print(resume.to_string(index=False))
+
+
+if __name__ == "__main__":
+    main()
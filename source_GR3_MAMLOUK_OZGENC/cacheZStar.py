@@ -0,0 +1,191 @@
+import hashlib
+import os
+import pickle
+import sys
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+# taille mémoire maximale par défaut des entrées du cache (256 Mo)
+OCTETS_MAX = 256 * 2 ** 20
+
+
+class CacheZStar:
+    """
+    Cache des points idéaux z* (optimum de chaque scénario), indexé par une empreinte des
+    données de l'instance : les balayages de poids ou de critères sur une même instance ne
+    calculent z* qu'une seule fois.
+
+    Le cache en mémoire garde les dernières entrées utilisées (LRU), dans la limite de
+    taille_max entrées et de octets_max octets. Les tableaux NumPy des entrées sont mis en
+    lecture seule : les appelants en renvoient des copies. Avec un repertoire, les entrées
+    sont aussi écrites sur disque (un fichier pickle par empreinte) et relues par les autres
+    processus ou les exécutions suivantes.
+
+    Attributs :
+    - taille_max : nombre maximal d'entrées en mémoire.
+    - octets_max : taille mémoire maximale des entrées (somme des nbytes de leurs tableaux).
+    - repertoire : répertoire du cache disque (None : pas de cache disque).
+    - hits, misses : nombre de valeurs trouvées / absentes.
+    """
+
+    def __init__(self, taille_max=128, repertoire=None, octets_max=OCTETS_MAX):
+        self.taille_max = taille_max
+        self.repertoire = repertoire
+        self.octets_max = octets_max
+        self.hits = 0
+        self.misses = 0
+        self._entrees = OrderedDict()
+        self._octets = 0
+        self._verrou = threading.Lock()
+        if repertoire is not None:
+            os.makedirs(repertoire, exist_ok=True)
+
+    def get(self, cle):
+        """
+        Valeur associée à cle, ou None si elle est absente de la mémoire et du disque.
+        """
+        with self._verrou:
+            if cle in self._entrees:
+                self._entrees.move_to_end(cle)
+                self.hits += 1
+                return self._entrees[cle][0]
+
+        valeur = self._lire(cle)
+        with self._verrou:
+            if valeur is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+                valeur = self._ajouter(cle, valeur)
+        return valeur
+
+    def put(self, cle, valeur):
+        with self._verrou:
+            self._ajouter(cle, valeur)
+        self._ecrire(cle, valeur)
+
+    def vider(self):
+        """
+        Vider le cache en mémoire (le cache disque est conservé).
+        """
+        with self._verrou:
+            self._entrees.clear()
+            self._octets = 0
+            self.hits = self.misses = 0
+
+    def __len__(self):
+        return len(self._entrees)
+
+    @property
+    def octets(self):
+        """
+        Taille mémoire des entrées (somme des nbytes de leurs tableaux).
+        """
+        return self._octets
+
+    def _ajouter(self, cle, valeur):
+        valeur = _figer(valeur)
+        if cle in self._entrees:
+            self._octets -= self._entrees.pop(cle)[1]
+        taille = _octets(valeur)
+        self._entrees[cle] = (valeur, taille)
+        self._octets += taille
+        while self._entrees and (len(self._entrees) > self.taille_max or self._octets > self.octets_max):
+            self._octets -= self._entrees.popitem(last=False)[1][1]
+        return valeur
+
+    def _fichier(self, cle):
+        return os.path.join(self.repertoire, cle + ".pkl")
+
+    def _lire(self, cle):
+        if self.repertoire is None:
+            return None
+        try:
+            with open(self._fichier(cle), "rb") as f:
+                return pickle.load(f)
+        except (OSError, pickle.UnpicklingError, EOFError):
+            return None
+
+    def _ecrire(self, cle, valeur):
+        if self.repertoire is None:
+            return
+        # écriture dans un fichier temporaire puis renommage : un lecteur ne voit jamais de fichier partiel
+        temporaire = f"{self._fichier(cle)}.{os.getpid()}.{threading.get_ident()}"
+        with open(temporaire, "wb") as f:
+            pickle.dump(valeur, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(temporaire, self._fichier(cle))
+
+    # le verrou n'est pas sérialisable : seule la configuration est transmise aux processus workers
+    def __getstate__(self):
+        return {"taille_max": self.taille_max, "repertoire": self.repertoire, "octets_max": self.octets_max}
+
+    def __setstate__(self, state):
+        self.__init__(state["taille_max"], state["repertoire"], state.get("octets_max", OCTETS_MAX))
+
+
+def _figer(valeur):
+    """
+    Mettre en lecture seule les tableaux NumPy de valeur (tableau ou tuple de tableaux).
+    """
+    if isinstance(valeur, np.ndarray):
+        valeur.flags.writeable = False
+    elif isinstance(valeur, tuple):
+        for v in valeur:
+            _figer(v)
+    return valeur
+
+
+def _octets(valeur):
+    if isinstance(valeur, np.ndarray):
+        return valeur.nbytes
+    if isinstance(valeur, tuple):
+        return sum(_octets(v) for v in valeur)
+    return sys.getsizeof(valeur)
+
+
+# cache utilisé par défaut (cache=True)
+_cache_defaut = CacheZStar()
+
+
+def cache_defaut():
+    return _cache_defaut
+
+
+def configurer_cache(taille_max=128, repertoire=None, octets_max=OCTETS_MAX):
+    """
+    Remplacer le cache par défaut, par exemple pour activer le cache disque.
+    """
+    global _cache_defaut
+    _cache_defaut = CacheZStar(taille_max, repertoire, octets_max)
+    return _cache_defaut
+
+
+def choisir_cache(cache):
+    """
+    Cache à utiliser pour l'argument cache des fonctions : True (cache par défaut),
+    False ou None (pas de cache) ou une instance de CacheZStar.
+    """
+    if cache is True:
+        return _cache_defaut
+    if cache is False or cache is None:
+        return None
+    return cache
+
+
+def empreinte(*donnees):
+    """
+    Empreinte SHA-256 (hexadécimale) des données d'une instance. Les tableaux NumPy sont
+    hachés par leur type, leur forme et leur contenu ; les autres objets par leur repr.
+    """
+    h = hashlib.sha256()
+    for d in donnees:
+        if isinstance(d, np.ndarray):
+            d = np.ascontiguousarray(d)
+            h.update(f"{d.dtype.str}{d.shape}".encode())
+            h.update(d.tobytes())
+        else:
+            h.update(repr(d).encode())
+        h.update(b"|")
+    return h.hexdigest()
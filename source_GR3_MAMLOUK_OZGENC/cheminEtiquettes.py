@@ -0,0 +1,294 @@
+"""
+Algorithme d'étiquetage multi-objectif pour les chemins robustes.
+
+Une étiquette est un chemin partiel du départ à un sommet, représenté par son vecteur de
+temps par scénario. Les étiquettes sont développées dans l'ordre d'une borne du critère
+(valeur du critère sur le vecteur de l'étiquette complété, scénario par scénario, par le
+meilleur temps restant jusqu'à l'arrivée) : la première étiquette qui atteint l'arrivée
+est optimale. Une étiquette dominée (composante par composante) par une autre étiquette
+du même sommet est abandonnée, ainsi que toute étiquette dont la borne ne fait pas mieux
+que la meilleure solution connue (chemins les plus rapides de chaque scénario au départ).
+
+Les étiquettes sont stockées dans des tableaux NumPy (temps, sommet, étiquette précédente,
+arc) agrandis par doublement. Au-delà de max_labels étiquettes créées, ValueError est
+levée (les fonctions de cheminRobuste.py se replient alors sur le MIP en mode "auto").
+
+Critères (mêmes valeurs que les modèles de cheminRobuste.py) :
+- "maxmin" : minimiser le temps maximal max_s T_s ;
+- "minmax_regret" : minimiser le regret maximal max_s (T_s - z*_s) ;
+- "minOWA" : valeur du modèle minOWA de cheminRobuste.py ; ses contraintes
+  r_k - b_ik >= z_i(x) - z*_i imposent r_k >= regret maximal et b_ik = 0 à l'optimum, la
+  valeur est donc (∑_k w_k) * regret maximal ;
+- "maxOWA" : maximiser l'OWA des temps (temps triés par ordre croissant, poids triés par
+  ordre décroissant) ; l'ensemble des solutions du MIP n'est celui des chemins que sans
+  circuit : ce critère est réservé aux graphes sans circuit.
+
+Les temps de trajet doivent être positifs ou nuls et les poids OWA positifs ou nuls.
+"""
+import heapq
+
+import numpy as np
+
+# critères pris en charge
+CRITERES = ("maxmin", "minmax_regret", "maxOWA", "minOWA")
+
+# nombre maximal d'étiquettes créées par défaut
+MAX_LABELS = 10 ** 6
+
+# au-delà de ce nombre de scénarios, le mode "auto" utilise le MIP
+SCENARIOS_MAX_AUTO = 5
+
+
+def chemin_robuste_etiquettes(graph, start, end, scenarios, critere, z_star=None, weights=None, max_labels=None):
+    """
+    Chemin robuste optimal pour le critère donné par étiquetage.
+
+    Paramètres :
+    - graph : Graphe de l'instance.
+    - start, end : sommets de départ et d'arrivée.
+    - scenarios : nombre de scénarios.
+    - critere : "maxmin", "minmax_regret", "maxOWA" ou "minOWA".
+    - z_star : temps des chemins les plus rapides de chaque scénario (critères à base de regret).
+    - weights : poids OWA (critères OWA).
+    - max_labels : nombre maximal d'étiquettes créées (MAX_LABELS par défaut).
+
+    Retourne (arcs du chemin dans l'ordre des arcs du graphe, valeur du critère), ou
+    (None, None) si l'arrivée n'est pas atteignable.
+    """
+    if critere not in CRITERES:
+        raise ValueError(f"Critère inconnu : {critere} (attendu : {', '.join(CRITERES)})")
+    if max_labels is None:
+        max_labels = MAX_LABELS
+
+    # reshape(0, -1) est ambigu : graphe sans arc après prétraitement d'une arrivée non atteignable
+    temps = np.asarray(graph.couts, dtype=float).reshape(graph.nb_arcs, -1 if graph.nb_arcs else scenarios)
+    temps = temps[:, :scenarios]
+    if np.any(temps < 0):
+        raise ValueError("L'étiquetage requiert des temps de trajet positifs ou nuls.")
+    critere_f = _fonction_critere(critere, scenarios, z_star, weights)
+    maximiser = critere == "maxOWA"
+
+    source, puits = graph.index[start], graph.index[end]
+    if maximiser:
+        ordre = _ordre_topologique(graph)
+        if ordre is None:
+            raise ValueError("Le critère maxOWA par étiquetage est réservé aux graphes sans circuit.")
+        restant, suivant = _plus_longs_vers(graph, temps, puits, ordre)
+    else:
+        restant, suivant = _plus_courts_vers(graph, temps, puits)
+    if not np.all(np.isfinite(restant[source])):
+        return None, None
+
+    # solution initiale : meilleur des chemins les plus rapides (ou les plus longs) de chaque scénario
+    meilleur_chemin, meilleure_valeur = None, None
+    for s in range(scenarios):
+        chemin = _chemin_arbre(graph, suivant[:, s], source, puits)
+        valeur = critere_f(temps[chemin].sum(axis=0))
+        if meilleure_valeur is None or _ameliore(valeur, meilleure_valeur, maximiser):
+            meilleur_chemin, meilleure_valeur = chemin, valeur
+
+    etiquettes = _Etiquettes(scenarios)
+    signe = -1.0 if maximiser else 1.0
+    par_sommet = [[] for _ in range(graph.nb_noeuds)]
+    e0 = etiquettes.ajouter(np.zeros(scenarios), source, -1, -1)
+    par_sommet[source].append(e0)
+    tas = [(signe * critere_f(restant[source]), e0)]
+
+    while tas:
+        cle, e = heapq.heappop(tas)
+        if not etiquettes.vivante[e]:
+            continue
+        # la borne ne peut plus améliorer la meilleure solution connue
+        if not _ameliore(signe * cle, meilleure_valeur, maximiser):
+            break
+        v = etiquettes.sommet[e]
+        if v == puits:
+            meilleur_chemin, meilleure_valeur = etiquettes.arcs_du_chemin(e), signe * cle
+            break
+
+        cout = etiquettes.temps[e]
+        for a in graph.sortants[v]:
+            w = graph.tete[a]
+            if not np.all(np.isfinite(restant[w])):
+                continue
+            nouveau = cout + temps[a]
+            borne = critere_f(nouveau + restant[w])
+            if not _ameliore(borne, meilleure_valeur, maximiser):
+                continue
+            if not _ajouter_non_domine(etiquettes, par_sommet[w], nouveau, maximiser):
+                continue
+            if etiquettes.nombre >= max_labels:
+                raise ValueError(f"Limite de {max_labels} étiquettes atteinte.")
+            f = etiquettes.ajouter(nouveau, w, e, a)
+            par_sommet[w].append(f)
+            heapq.heappush(tas, (signe * borne, f))
+
+    return [graph.arcs[a] for a in sorted(meilleur_chemin)], float(meilleure_valeur)
+
+
+def _ameliore(valeur, reference, maximiser):
+    return valeur > reference if maximiser else valeur < reference
+
+
+class _Etiquettes:
+    """
+    Stockage des étiquettes dans des tableaux NumPy agrandis par doublement.
+    """
+
+    def __init__(self, scenarios, capacite=1024):
+        self.nombre = 0
+        self.temps = np.empty((capacite, scenarios))
+        self.sommet = np.empty(capacite, dtype=np.int64)
+        self.precedente = np.empty(capacite, dtype=np.int64)
+        self.arc = np.empty(capacite, dtype=np.int64)
+        self.vivante = np.empty(capacite, dtype=bool)
+
+    def ajouter(self, temps, sommet, precedente, arc):
+        if self.nombre == len(self.sommet):
+            for nom in ("temps", "sommet", "precedente", "arc", "vivante"):
+                tableau = getattr(self, nom)
+                agrandi = np.empty((2 * len(tableau),) + tableau.shape[1:], dtype=tableau.dtype)
+                agrandi[:len(tableau)] = tableau
+                setattr(self, nom, agrandi)
+        e = self.nombre
+        self.temps[e] = temps
+        self.sommet[e] = sommet
+        self.precedente[e] = precedente
+        self.arc[e] = arc
+        self.vivante[e] = True
+        self.nombre += 1
+        return e
+
+    def arcs_du_chemin(self, e):
+        arcs = []
+        while self.precedente[e] >= 0:
+            arcs.append(int(self.arc[e]))
+            e = self.precedente[e]
+        return arcs
+
+
+def _ajouter_non_domine(etiquettes, liste, nouveau, maximiser):
+    """
+    Vrai si le vecteur nouveau n'est dominé par aucune étiquette vivante de liste ; les
+    étiquettes qu'il domine sont alors retirées (liste modifiée sur place).
+    """
+    if not liste:
+        return True
+    vecteurs = etiquettes.temps[liste]
+    if maximiser:
+        if np.any(np.all(vecteurs >= nouveau, axis=1)):
+            return False
+        dominees = np.all(vecteurs <= nouveau, axis=1)
+    else:
+        if np.any(np.all(vecteurs <= nouveau, axis=1)):
+            return False
+        dominees = np.all(vecteurs >= nouveau, axis=1)
+    if dominees.any():
+        for k in np.flatnonzero(dominees):
+            etiquettes.vivante[liste[k]] = False
+        liste[:] = [e for e, d in zip(liste, dominees) if not d]
+    return True
+
+
+def _fonction_critere(critere, scenarios, z_star, weights):
+    """
+    Valeur du critère pour un vecteur de temps par scénario.
+    """
+    if critere in ("minmax_regret", "minOWA"):
+        if z_star is None:
+            raise ValueError("z_star est requis pour les critères à base de regret.")
+        zs = np.asarray(z_star, dtype=float)[:scenarios]
+    if critere in ("maxOWA", "minOWA"):
+        if weights is None or len(weights) != scenarios:
+            raise ValueError("Un poids OWA par scénario est requis.")
+        w = np.sort(np.asarray(weights, dtype=float))[::-1]
+        if w[-1] < 0:
+            raise ValueError("L'étiquetage requiert des poids OWA positifs ou nuls.")
+
+    if critere == "maxmin":
+        return lambda t: float(t.max())
+    if critere == "minmax_regret":
+        return lambda t: float((t - zs).max())
+    if critere == "minOWA":
+        return lambda t: float(w.sum() * (t - zs).max())
+    return lambda t: float(np.sort(t) @ w)
+
+
+def _plus_courts_vers(graph, temps, puits):
+    """
+    Temps minimal de chaque sommet jusqu'au puits dans chaque scénario (Dijkstra sur les
+    arcs entrants, inf si le puits n'est pas atteignable) et arc suivant de chaque sommet
+    dans l'arbre des plus courts chemins vers le puits (-1 pour le puits et les sommets
+    qui ne l'atteignent pas).
+    """
+    restant = np.full((graph.nb_noeuds, temps.shape[1]), np.inf)
+    suivant = np.full((graph.nb_noeuds, temps.shape[1]), -1, dtype=np.int64)
+    for s in range(temps.shape[1]):
+        dist = restant[:, s]
+        dist[puits] = 0.0
+        tas = [(0.0, puits)]
+        while tas:
+            d, v = heapq.heappop(tas)
+            if d > dist[v]:
+                continue
+            for a in graph.entrants[v]:
+                u = graph.queue[a]
+                nd = d + temps[a, s]
+                if nd < dist[u]:
+                    dist[u] = nd
+                    suivant[u, s] = a
+                    heapq.heappush(tas, (nd, u))
+    return restant, suivant
+
+
+def _plus_longs_vers(graph, temps, puits, ordre):
+    """
+    Temps maximal de chaque sommet jusqu'au puits dans chaque scénario, sur un graphe sans
+    circuit parcouru dans l'ordre topologique inverse (-inf si le puits n'est pas atteignable),
+    et arc suivant de chaque sommet sur le plus long chemin (-1 comme pour _plus_courts_vers).
+    """
+    restant = np.full((graph.nb_noeuds, temps.shape[1]), -np.inf)
+    suivant = np.full((graph.nb_noeuds, temps.shape[1]), -1, dtype=np.int64)
+    restant[puits] = 0.0
+    for v in reversed(ordre):
+        for a in graph.sortants[v]:
+            longueur = temps[a] + restant[graph.tete[a]]
+            plus_long = longueur > restant[v]
+            restant[v, plus_long] = longueur[plus_long]
+            suivant[v, plus_long] = a
+    return restant, suivant
+
+
+def _ordre_topologique(graph):
+    """
+    Ordre topologique des sommets, None si le graphe contient un circuit.
+    """
+    degre = [len(e) for e in graph.entrants]
+    pile = [v for v in range(graph.nb_noeuds) if degre[v] == 0]
+    ordre = []
+    while pile:
+        v = pile.pop()
+        ordre.append(v)
+        for a in graph.sortants[v]:
+            w = graph.tete[a]
+            degre[w] -= 1
+            if degre[w] == 0:
+                pile.append(w)
+    return ordre if len(ordre) == graph.nb_noeuds else None
+
+
+def _chemin_arbre(graph, suivant_s, source, puits):
+    """
+    Chemin de la source au puits dans l'arbre des arcs suivants d'un scénario (plus court ou
+    plus long chemin). Retourne la liste des indices d'arcs.
+    """
+    chemin = []
+    v = source
+    while v != puits:
+        a = suivant_s[v]
+        # un arbre construit par _plus_courts_vers ou _plus_longs_vers n'a pas de circuit
+        if a < 0 or len(chemin) >= graph.nb_noeuds:
+            raise ValueError("Arbre des chemins vers l'arrivée incomplet.")
+        chemin.append(int(a))
+        v = graph.tete[a]
+    return chemin
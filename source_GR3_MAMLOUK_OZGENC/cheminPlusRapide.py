@@ -1,57 +1,250 @@
-from gurobipy import Model, GRB, quicksum
+import heapq
+import numpy as np
+from graphe import Graphe, graphe
+from solveur import GRB, choisir_backend, nouveau_modele, quicksum
+from programmeLineaire import ProgrammeLineaire
 
-def chemin_plus_rapide(nodes, transitions, start, end, scenario):
+# moteurs disponibles pour chemin_plus_rapide
+MOTEURS = ("auto", "dijkstra", "bellman_ford", "mip")
+
+
+def chemin_plus_rapide(nodes, transitions, start, end, scenario, engine="auto", graph=None, threads=None, ctx=None,
+                       backend=None):
     """
     Resoudre le problème du chemin le plus rapide pour un scénario donné.
+
+    Paramètres :
+    - engine : "dijkstra" (tas binaire, coûts positifs ou nuls), "bellman_ford"
+      (coûts négatifs autorisés, sans circuit absorbant), "mip" (programme linéaire
+      en nombres entiers avec Gurobi) ou "auto" (Dijkstra si tous les coûts sont
+      positifs, Bellman-Ford sinon, et le MIP en dernier recours).
+    - graph : Graphe déjà construit pour (nodes, transitions), à réutiliser d'un appel à l'autre.
+    - threads : nombre maximal de threads de Gurobi pour le moteur "mip".
+    - ctx : ContexteSolveur (environnement Gurobi partagé) ; environnement par défaut si None.
+    - backend : solveur du moteur "mip", "gurobi", "highs" (scipy.optimize.milp) ou None
+      (Gurobi s'il est installé).
+
+    Retourne un dictionnaire {"path": [...], "cost": ...} ou {"message": ...}.
+    """
+    if engine not in MOTEURS:
+        raise ValueError(f"Moteur inconnu : {engine} (attendu : {', '.join(MOTEURS)})")
+
+    graph = graphe(nodes, transitions, graph)
+
+    if engine == "mip":
+        return _chemin_plus_rapide_mip(graph, start, end, scenario, threads, ctx, backend)
+
+    poids = graph.couts_scenario(scenario)
+    cout_negatif = any(w < 0 for w in poids)
+
+    if engine == "dijkstra" and cout_negatif:
+        raise ValueError("Dijkstra requiert des coûts d'arcs positifs ou nuls.")
+
+    source = graph.index[start]
+    if engine == "dijkstra" or (engine == "auto" and not cout_negatif):
+        dist, pred = _dijkstra(graph, poids, source)
+    else:
+        try:
+            dist, pred = _bellman_ford(graph, poids, source)
+        except ValueError:
+            if engine == "bellman_ford":
+                raise
+            # circuit absorbant : on se replie sur le MIP
+            return _chemin_plus_rapide_mip(graph, start, end, scenario, threads, ctx, backend)
+
+    puits = graph.index[end]
+    if dist[puits] is None:
+        return {"message": "No optimal solution found."}
+
+    return {
+        "path": _reconstruire_chemin(graph, pred, source, puits),
+        "cost": float(dist[puits])
+    }
+
+
+def distances_depuis(nodes, transitions, start, scenario, engine="auto", graph=None):
+    """
+    Temps du chemin le plus rapide de start à chaque sommet pour un scénario donné (arbre
+    des plus courts chemins, un seul Dijkstra ou Bellman-Ford pour toutes les arrivées).
+
+    Paramètres :
+    - engine : "dijkstra", "bellman_ford" ou "auto" (Dijkstra si tous les coûts sont positifs,
+      Bellman-Ford sinon) ; le moteur "mip" ne calcule qu'un chemin à la fois.
+    - graph : Graphe déjà construit pour (nodes, transitions), à réutiliser d'un appel à l'autre.
+
+    Retourne un dictionnaire {sommet: coût} des sommets atteints depuis start.
+    Lève ValueError si un circuit de coût négatif est atteignable depuis start.
+    """
+    if engine not in ("auto", "dijkstra", "bellman_ford"):
+        raise ValueError(f"Moteur inconnu pour un arbre de chemins : {engine} (attendu : auto, dijkstra, bellman_ford)")
+
+    graph = graphe(nodes, transitions, graph)
+    poids = graph.couts_scenario(scenario)
+    cout_negatif = any(w < 0 for w in poids)
+    if engine == "dijkstra" and cout_negatif:
+        raise ValueError("Dijkstra requiert des coûts d'arcs positifs ou nuls.")
+
+    source = graph.index[start]
+    if engine == "dijkstra" or (engine == "auto" and not cout_negatif):
+        dist, _ = _dijkstra(graph, poids, source)
+    else:
+        dist, _ = _bellman_ford(graph, poids, source)
+    return {node: float(d) for node, d in zip(graph.noeuds, dist) if d is not None}
+
+
+def _dijkstra(graph, poids, source):
+    """
+    Algorithme de Dijkstra avec un tas binaire.
+    Retourne, pour chaque sommet (indice entier), sa distance depuis source (None si
+    non atteint) et l'indice de l'arc par lequel il est atteint.
+    """
+    dist = [None] * graph.nb_noeuds
+    pred = [None] * graph.nb_noeuds
+    fixe = [False] * graph.nb_noeuds
+    dist[source] = 0
+    tas = [(0, source)]
+
+    while tas:
+        d, u = heapq.heappop(tas)
+        if fixe[u]:
+            continue
+        fixe[u] = True
+        for a in graph.sortants[u]:
+            v = graph.tete[a]
+            nd = d + poids[a]
+            if dist[v] is None or nd < dist[v]:
+                dist[v] = nd
+                pred[v] = a
+                heapq.heappush(tas, (nd, v))
+    return dist, pred
+
+
+def _bellman_ford(graph, poids, source):
+    """
+    Algorithme de Bellman-Ford (passes sur les arcs, arrêt anticipé).
+    Lève ValueError si un circuit de coût négatif est atteignable depuis source.
+    """
+    dist = [None] * graph.nb_noeuds
+    pred = [None] * graph.nb_noeuds
+    dist[source] = 0
+
+    for _ in range(graph.nb_noeuds):
+        modifie = False
+        for a in range(graph.nb_arcs):
+            du = dist[graph.queue[a]]
+            if du is None:
+                continue
+            v = graph.tete[a]
+            if dist[v] is None or du + poids[a] < dist[v]:
+                dist[v] = du + poids[a]
+                pred[v] = a
+                modifie = True
+        if not modifie:
+            return dist, pred
+
+    raise ValueError("Le graphe contient un circuit de coût négatif.")
+
+
+def _reconstruire_chemin(graph, pred, source, puits):
+    """
+    Reconstruire la liste des arcs du chemin de source à puits à partir des arcs prédécesseurs.
+    """
+    chemin = []
+    v = puits
+    while v != source:
+        a = pred[v]
+        chemin.append(graph.arcs[a])
+        v = graph.queue[a]
+    chemin.reverse()
+    return chemin
+
+
+def ajouter_contraintes_flot(model, x, graph, start, end):
+    """
+    Ajouter les contraintes de conservation du flot (sortant - entrant) d'un chemin de start à end.
+    x est indexé par les arcs (i, j) ; les arcs entrants et sortants de chaque sommet
+    sont lus dans les listes d'adjacence du graphe, soit O(|A|) termes au total.
+    Retourne la liste des contraintes, dans l'ordre des sommets du graphe (changer l'arrivée
+    revient à modifier leurs seconds membres RHS).
     """
-    # les coûts des arcs pour le scénario donné
-    weights = {arc: costs[scenario] for arc, costs in transitions.items()}
+    arcs = graph.arcs
+    contraintes = []
+    for k, node in enumerate(graph.noeuds):
+        outflow = quicksum(x[arcs[a]] for a in graph.sortants[k])
+        inflow = quicksum(x[arcs[a]] for a in graph.entrants[k])
+        if node == start:
+            contraintes.append(model.addConstr(outflow - inflow == 1, name=f"flow_{node}"))
+        elif node == end:
+            contraintes.append(model.addConstr(outflow - inflow == -1, name=f"flow_{node}"))
+        else:
+            contraintes.append(model.addConstr(outflow - inflow == 0, name=f"flow_{node}"))
+    return contraintes
+
+
+def programme_chemin(graph, start, end, nom, maximiser=False, obj=0.0):
+    """
+    ProgrammeLineaire (programmeLineaire.py) d'un chemin de start à end : une variable binaire
+    par arc, dans l'ordre des arcs du graphe (coefficients d'objectif obj), et la conservation
+    du flot de chaque sommet. Retourne (programme, indices des variables d'arcs).
+    """
+    pl = ProgrammeLineaire(nom, maximiser=maximiser)
+    x = pl.binaires(graph.nb_arcs, obj=obj)
+    # sortant - entrant : +1 sur la queue de chaque arc, -1 sur sa tête
+    second_membre = np.zeros(graph.nb_noeuds)
+    second_membre[graph.index[end]] = -1.0
+    second_membre[graph.index[start]] = 1.0
+    pl.contraintes_creuses(graph.nb_noeuds, np.concatenate([graph.queue, graph.tete]), np.concatenate([x, x]),
+                           np.concatenate([np.ones(graph.nb_arcs), -np.ones(graph.nb_arcs)]),
+                           bas=second_membre, haut=second_membre)
+    return pl, x
+
+
+def expression_temps(x, graph, scenario):
+    """
+    Expression linéaire du temps de trajet du chemin x dans un scénario donné.
+    """
+    return quicksum(costs[scenario] * x[arc] for arc, costs in zip(graph.arcs, graph.couts))
+
+
+def _chemin_plus_rapide_mip(graph, start, end, scenario, threads=None, ctx=None, backend=None):
+    """
+    Resoudre le problème du chemin le plus rapide par un programme linéaire en nombres entiers.
+    """
+    backend = choisir_backend(backend)
+    if backend != "gurobi":
+        pl, x = programme_chemin(graph, start, end, "ShortestPath", obj=graph.couts_scenario(scenario))
+        sol = pl.resoudre(backend, ctx)
+        if not sol.optimal:
+            return {"message": "No optimal solution found."}
+        return {"path": [arc for arc, v in zip(graph.arcs, sol.valeurs[x]) if v > 0.5], "cost": sol.objectif}
 
     # initialiser le modèle
-    m = Model("ShortestPath")
-    m.setParam("OutputFlag", 0)  
+    m = nouveau_modele("ShortestPath", ctx)
+    if threads is not None:
+        m.setParam("Threads", threads)
 
     # declaration des variables de décision x_ij = 1 si l'arc (i, j) est sélectionné, 0 sinon
-    x = m.addVars(transitions.keys(), vtype=GRB.BINARY, name="x")
+    x = m.addVars(graph.arcs, vtype=GRB.BINARY, name="x")
 
     # definition de l'objectif (minimiser le coût total)
-    m.setObjective(quicksum(weights[arc] * x[arc] for arc in transitions), GRB.MINIMIZE)
+    m.setObjective(expression_temps(x, graph, scenario), GRB.MINIMIZE)
 
     # contraintes de flot
-    # sommet de départ
-    m.addConstr(
-        quicksum(x[(start, j)] for j in nodes if (start, j) in transitions) -
-        quicksum(x[(i, start)] for i in nodes if (i, start) in transitions) == 1,
-        "flow_source"
-    )
-
-    # sommet de destination
-    m.addConstr(
-        quicksum(x[(end, j)] for j in nodes if (end, j) in transitions) -
-        quicksum(x[(i, end)] for i in nodes if (i, end) in transitions) == -1,
-        "flow_destination"
-    )
-
-    # contraintes de flot pour les autres sommets
-    for v in nodes:
-        if v != start and v != end:
-            m.addConstr(
-                quicksum(x[(v, j)] for j in nodes if (v, j) in transitions) -
-                quicksum(x[(i, v)] for i in nodes if (i, v) in transitions) == 0,
-                f"flow_{v}"
-            )
+    ajouter_contraintes_flot(m, x, graph, start, end)
 
     # Resolution
     m.optimize()
 
     # extraire la solution
     if m.status == GRB.OPTIMAL:
-        selected_arcs = [arc for arc in transitions if x[arc].x > 0.5]
+        selected_arcs = [arc for arc in graph.arcs if x[arc].x > 0.5]
         solution = {
             "path": selected_arcs,
             "cost": m.objVal
         }
-        return solution
     else:
-        return {"message": "No optimal solution found."}
+        solution = {"message": "No optimal solution found."}
 
+    # libérer la mémoire du modèle
+    m.dispose()
+    return solution
@@ -1,8 +1,255 @@
-import gurobipy as gp
-from gurobipy import *
+import time
+import numpy as np
 from cheminPlusRapide import *
+from graphe import Graphe, graphe
+from functools import partial
+from parallele import executer_par_scenario, nb_workers, threads_par_worker
+from maxOWA import FORMULATIONS
+from solveur import (GRB, STATUTS_LIMITE, borne_gurobi, choisir_backend, ecart, nouveau_modele, optimiser,
+                     reinitialiser_limites, statut_gurobi)
+from programmeLineaire import ajouter_owa
+from cacheZStar import choisir_cache, empreinte
+from pretraitement import pretraiter_chemin
+from generationLignes import TOLERANCE, generer_lignes
+from cheminEtiquettes import SCENARIOS_MAX_AUTO, chemin_robuste_etiquettes
+
+# algorithmes de résolution : MIP, étiquetage (cheminEtiquettes.py) ou choix automatique
+ALGORITHMES = ("mip", "labels", "auto")
+
+# nombre maximal de modèles OWA gardés dans un dictionnaire de gabarits (voir gabarit_owa)
+MODELES_MAX = 8
+
+
+def z_star_chemins(graph, start, end, scenarios, engine="auto", n_jobs=1, mode="process", ctx=None, cache=True,
+                   backend=None):
+    """
+    Calculer le coût du chemin le plus rapide de chaque scénario (point idéal z*).
+
+    Les scénarios sont indépendants : avec n_jobs > 1 (None = tous les cœurs) ils sont
+    résolus en parallèle par un pool de processus ou de threads (mode), et les coûts
+    sont retournés dans l'ordre des scénarios.
+    ctx : ContexteSolveur transmis à chemin_plus_rapide (moteur "mip").
+    cache : True (cache par défaut de cacheZStar), False (pas de cache) ou un CacheZStar ;
+    la clé est l'empreinte du graphe (arcs et temps), des extrémités et du nombre de scénarios.
+    backend : solveur du moteur "mip" (voir chemin_plus_rapide).
+
+    Retourne la liste des z*_s, None si l'arrivée n'est pas atteignable.
+    """
+    cache = choisir_cache(cache)
+    if cache is not None:
+        cle = empreinte("z_star_chemins", graph.empreinte(), start, end, scenarios)
+        valeur = cache.get(cle)
+        if valeur is None:
+            valeur = z_star_chemins(graph, start, end, scenarios, engine, n_jobs, mode, ctx, cache=False,
+                                    backend=backend)
+            if valeur is None:
+                return None
+            valeur = np.asarray(valeur, dtype=np.float64)
+            cache.put(cle, valeur)
+        return np.asarray(valeur, dtype=float).tolist()
+
+    threads = threads_par_worker(n_jobs) if nb_workers(n_jobs) > 1 else None
+    resultats = executer_par_scenario(
+        partial(chemin_plus_rapide, None, None, start, end, engine=engine, graph=graph, threads=threads, ctx=ctx,
+                backend=backend),
+        range(scenarios), n_jobs=n_jobs, mode=mode)
+    couts = [result.get('cost') for result in resultats]
+    if any(cout is None for cout in couts):
+        return None
+    return couts
+
+
+def z_star_chemins_cibles(graph, start, ends, scenarios, engine="auto", n_jobs=1, mode="process", ctx=None, cache=True,
+                          backend=None):
+    """
+    Calculer z* pour plusieurs arrivées depuis un même départ.
+
+    Un arbre des chemins les plus rapides par scénario (cheminPlusRapide.distances_depuis)
+    donne z* pour toutes les arrivées ; les scénarios sont répartis entre n_jobs workers
+    comme dans z_star_chemins. Avec le moteur "mip", ou un circuit absorbant avec le moteur
+    "auto", z* est calculé arrivée par arrivée par chemin_plus_rapide. Les valeurs sont lues
+    et enregistrées dans le cache sous les mêmes clés que z_star_chemins.
+
+    Retourne {arrivée: liste des z*_s}, None pour une arrivée non atteignable.
+    """
+    cache = choisir_cache(cache)
+    resultats, manquantes = {}, []
+    for end in ends:
+        valeur = None
+        if cache is not None:
+            valeur = cache.get(empreinte("z_star_chemins", graph.empreinte(), start, end, scenarios))
+        if valeur is None:
+            manquantes.append(end)
+        else:
+            resultats[end] = list(valeur)
+    if not manquantes:
+        return resultats
+
+    arbres = None
+    if engine != "mip":
+        try:
+            arbres = executer_par_scenario(partial(distances_depuis, None, None, start, engine=engine, graph=graph),
+                                           range(scenarios), n_jobs=n_jobs, mode=mode)
+        except ValueError:
+            if engine != "auto":
+                raise
+
+    for end in manquantes:
+        if arbres is not None:
+            couts = [arbre.get(end) for arbre in arbres]
+        else:
+            couts = [chemin_plus_rapide(None, None, start, end, s, engine=engine, graph=graph, ctx=ctx,
+                                        backend=backend).get("cost")
+                     for s in range(scenarios)]
+        if any(cout is None for cout in couts):
+            resultats[end] = None
+            continue
+        resultats[end] = couts
+        if cache is not None:
+            cache.put(empreinte("z_star_chemins", graph.empreinte(), start, end, scenarios), tuple(couts))
+    return resultats
+
+
+def _pretraiter(nodes, transitions, start, end, scenarios, critere, graph):
+    """
+    Graphe et nombre de scénarios de l'instance prétraitée (voir pretraitement.pretraiter_chemin).
+    """
+    pre = pretraiter_chemin(nodes, transitions, start, end, scenarios, critere, graph)
+    return Graphe(pre.nodes, pre.transitions), len(pre.scenarios)
+
+
+def _matrice_temps(graph, scenarios):
+    """
+    Temps de trajet des arcs dans chaque scénario (tableau NumPy nb_arcs x scenarios).
+    """
+    # graphe sans arc (prétraitement d'une arrivée non atteignable) : reshape(0, -1) est ambigu
+    temps = np.asarray(graph.couts, dtype=float).reshape(graph.nb_arcs, -1 if graph.nb_arcs else scenarios)
+    return temps[:, :scenarios]
+
+
+def _valeurs_x(model, x, graph):
+    """
+    Valeurs 0/1 des variables d'arcs de la solution courante, dans l'ordre des arcs du graphe.
+    """
+    valeurs = model.getAttr("X", x)
+    return np.rint(np.fromiter((valeurs[arc] for arc in graph.arcs), dtype=float, count=graph.nb_arcs))
+
+
+def _decodeur_chemin(graph):
+    """
+    Conversion des valeurs des variables d'arcs (dans l'ordre des arcs du graphe) en arcs du
+    chemin, pour le callback de solveur.Limites.
+    """
+    return lambda valeurs: [arc for arc, v in zip(graph.arcs, valeurs) if v > 0.5]
+
+
+def _optimiser_chemin(model, x, graph, limites, debut):
+    """
+    Résoudre le modèle de chemin sous les limites de limites (voir solveur.optimiser).
+    """
+    optimiser(model, limites, debut, [x[arc] for arc in graph.arcs], _decodeur_chemin(graph))
+
+
+def _renseigner(infos, statut, borne=None, gap=None):
+    """
+    Compléter infos (s'il est fourni) par le statut, la borne et l'écart relatif de la résolution.
+    """
+    if infos is not None:
+        infos.update(statut=statut, borne=borne, gap=gap)
+
+
+def _chronometrer(infos, phase, debut):
+    """
+    Enregistrer dans infos (s'il est fourni) la durée de la phase ("z_star", "construction" ou
+    "resolution") depuis debut, sous la clé "temps_<phase>" ; retourne l'instant courant.
+    """
+    maintenant = time.perf_counter()
+    if infos is not None:
+        infos[f"temps_{phase}"] = maintenant - debut
+    return maintenant
+
+
+def _renseigner_etiquettes(infos, solution, debut):
+    """
+    Compléter infos pour une solution (arcs, valeur) de l'étiquetage commencé à debut :
+    optimale, ou pas de chemin (arrivée non atteignable, même statut que le MIP).
+    """
+    if infos is not None:
+        infos["temps_construction"] = 0.0
+    _chronometrer(infos, "resolution", debut)
+    if solution[0] is None:
+        _renseigner(infos, "INFEASIBLE")
+    else:
+        _renseigner(infos, "OPTIMAL", solution[1], 0.0)
+
 
-def robust_shortest_path_maxmin(nodes, arcs, start, end, scenarios):
+def _par_etiquettes(algorithm, graph, start, end, scenarios, critere, max_labels, z_star=None, weights=None):
+    """
+    Résoudre par étiquetage si algorithm le demande. Retourne (arcs, valeur), ou None si le
+    MIP doit être utilisé : algorithm="mip", ou "auto" avec plus de SCENARIOS_MAX_AUTO
+    scénarios ou un étiquetage impossible (temps négatifs, circuit pour maxOWA, limite
+    d'étiquettes atteinte). Avec algorithm="labels", ces cas lèvent ValueError.
+    """
+    if algorithm not in ALGORITHMES:
+        raise ValueError(f"Algorithme inconnu : {algorithm} (attendu : {', '.join(ALGORITHMES)})")
+    if algorithm == "mip" or (algorithm == "auto" and scenarios > SCENARIOS_MAX_AUTO):
+        return None
+    try:
+        return chemin_robuste_etiquettes(graph, start, end, scenarios, critere, z_star=z_star, weights=weights,
+                                         max_labels=max_labels)
+    except ValueError:
+        if algorithm == "labels":
+            raise
+        return None
+
+
+def _chemin_programme(graph, start, end, scenarios, critere, backend, ctx, z_star=None, weights=None,
+                      formulation="standard", limites=None, debut=None, infos=None):
+    """
+    Chemin robuste sous forme matricielle (programmeLineaire.py), pour les backends autres que
+    Gurobi : mêmes modèles que les fonctions robust_shortest_path_*.
+    Retourne (arcs sélectionnés, valeur, SolutionProgramme) ; arcs et valeur None sans solution
+    (meilleure solution trouvée si une limite de limites est atteinte). infos reçoit les temps
+    de construction et de résolution.
+    """
+    phase = time.perf_counter()
+    temps = _matrice_temps(graph, scenarios)
+    pl, x = programme_chemin(graph, start, end, critere, maximiser=critere == "maxOWA")
+    if critere in ("maxmin", "minmax_regret"):
+        # t >= z_s(x) - z*_s (z*_s = 0 pour maxmin)
+        t = pl.variables(1, obj=1.0)
+        bas = 0.0 if z_star is None else -np.asarray(z_star, dtype=float)
+        pl.contraintes([(np.ones((scenarios, 1)), t), (-temps.T, x)], bas=bas)
+    elif z_star is None:
+        ajouter_owa(pl, [(temps.T, x)], scenarios, _poids_transformes(weights), formulation)
+    else:
+        # regrets z_s(x) - z*_s
+        ajouter_owa(pl, [(temps.T, x)], scenarios, _poids_transformes(weights), formulation, regrets=True,
+                    constante=-np.asarray(z_star, dtype=float))
+
+    phase = _chronometrer(infos, "construction", phase)
+    sol = pl.resoudre(backend, ctx, limites=limites, debut=debut, variables=x, solution=_decodeur_chemin(graph))
+    if infos is not None:
+        # assemblage de la matrice (dans resoudre) compté dans la construction
+        infos["temps_construction"] += sol.temps_construction
+    _chronometrer(infos, "resolution", phase + sol.temps_construction)
+    if sol.valeurs is None:
+        return None, None, sol
+    return _decodeur_chemin(graph)(sol.valeurs[x]), sol.objectif, sol
+
+
+def _variables_temps(model, x, graph, scenarios):
+    """
+    Variables auxiliaires z_i = temps de trajet du chemin x dans le scénario i (formulation compacte des OWA).
+    """
+    z = [model.addVar(lb=-GRB.INFINITY, vtype=GRB.CONTINUOUS, name=f"z_{i}") for i in range(scenarios)]
+    for i in range(scenarios):
+        model.addConstr(z[i] == expression_temps(x, graph, i), name=f"Time_{i}")
+    return z
+
+def robust_shortest_path_maxmin(nodes, arcs, start, end, scenarios, graph=None, ctx=None, presolve=False,
+                                row_generation=False, infos=None, algorithm="mip", max_labels=None, backend=None,
+                                limites=None):
     """
     Résout le problème du chemin robuste en utilisant l'approche MaxMin.
 
@@ -12,16 +259,57 @@ def robust_shortest_path_maxmin(nodes, arcs, start, end, scenarios):
     - start : nœud de départ.
     - end : nœud d'arrivée.
     - scenarios : nombre de scénarios.
+    - graph : Graphe déjà construit pour ce graphe (listes d'adjacence), réutilisable entre plusieurs résolutions.
+    - ctx : ContexteSolveur (environnement Gurobi partagé) ; environnement par défaut si None.
+    - presolve : retirer les arcs et sommets qui ne sont sur aucun chemin du départ à l'arrivée
+      et les scénarios redondants (voir pretraitement.py).
+    - row_generation : ajouter les contraintes de scénario au fur et à mesure (scénario le
+      plus violé par la solution courante) au lieu de toutes les poser au départ.
+    - infos : dictionnaire optionnel, complété par les statistiques de la génération de
+      contraintes (clé "generation", voir generationLignes.generer_lignes) et les temps de
+      construction du modèle et de résolution ("temps_construction", "temps_resolution").
+    - algorithm : "mip", "labels" (étiquetage, voir cheminEtiquettes.py) ou "auto" (étiquetage
+      jusqu'à SCENARIOS_MAX_AUTO scénarios, MIP sinon ou si l'étiquetage échoue).
+    - max_labels : nombre maximal d'étiquettes créées par l'étiquetage.
+    - backend : "gurobi", "highs" (programme matriciel résolu par scipy.optimize.milp, voir
+      programmeLineaire.py) ou None (Gurobi s'il est installé).
+      row_generation requiert Gurobi.
+    - limites : solveur.Limites (temps de l'appel, gap, nombre de nœuds, callback recevant les
+      arcs de chaque nouveau meilleur chemin) ; à une limite atteinte, le meilleur chemin trouvé
+      est retourné et infos reçoit "statut", "borne" et "gap".
 
     Retourne :
     - Le chemin robuste optimal et sa durée maximale.
     """
+    debut = time.perf_counter()
+    if presolve:
+        graph, scenarios = _pretraiter(nodes, arcs, start, end, scenarios, "maxmin", graph)
+    else:
+        graph = graphe(nodes, arcs, graph)
+
+    phase = time.perf_counter()
+    solution = _par_etiquettes(algorithm, graph, start, end, scenarios, "maxmin", max_labels)
+    if solution is not None:
+        _renseigner_etiquettes(infos, solution, phase)
+        return solution
+
+    backend = choisir_backend(backend)
+    if backend != "gurobi":
+        if row_generation:
+            raise ValueError("La génération de contraintes requiert le backend gurobi.")
+        selected_arcs, valeur, sol = _chemin_programme(graph, start, end, scenarios, "maxmin", backend, ctx,
+                                                       limites=limites, debut=debut, infos=infos)
+        _renseigner(infos, sol.statut, sol.borne, sol.gap)
+        if selected_arcs is None:
+            print(f"Optimization was unsuccessful. Status: {sol.statut}")
+        return selected_arcs, valeur
+
     # Création du modèle
-    model = gp.Model("RobustShortestPath_MaxMin")
-    model.setParam('OutputFlag', 0)  # Désactiver les sorties de Gurobi
+    phase = time.perf_counter()
+    model = nouveau_modele("RobustShortestPath_MaxMin", ctx)
 
     # Variables de décision : x_ij = 1 si l'arc (i, j) est sélectionné, 0 sinon
-    x = model.addVars(arcs.keys(), vtype=GRB.BINARY, name="x")
+    x = model.addVars(graph.arcs, vtype=GRB.BINARY, name="x")
 
     # Variable t représentant la valeur minimale des temps de trajet négatifs
     z = model.addVar(vtype=GRB.CONTINUOUS, name="z")
@@ -31,41 +319,63 @@ def robust_shortest_path_maxmin(nodes, arcs, start, end, scenarios):
 
     # Flow constraints
     # Source node
-    for node in nodes:
-        inflow = quicksum(x[(i, node)] for i in nodes if (i, node) in arcs)
-        outflow = quicksum(x[(node, j)] for j in nodes if (node, j) in arcs)
-        if node == start:
-            model.addConstr(outflow - inflow == 1, name=f"flow_{node}")
-        elif node == end:
-            model.addConstr(inflow - outflow == 1, name=f"flow_{node}")
-        else:
-            model.addConstr(inflow - outflow == 0, name=f"flow_{node}")
+    ajouter_contraintes_flot(model, x, graph, start, end)
 
     # for i in range(nb_scenarios):
     #     m.addConstr(t <= quicksum(utilities[i][j] * x[j] for j in range(nb_projects)), "scenario_%d" % (i + 1))
 
     # Contraintes pour z
-    for s in range(scenarios):
-        # Extract weights for the selected scenario
-        weights = {arc: costs[s] for arc, costs in arcs.items()}
-        # weights_negative = {key: value * -1 for key, value in weights.items()}
-        model.addConstr(z >= quicksum(weights[arc] * x[arc] for arc in arcs), f"time_scenario_{s}")
+    def ajouter_scenario(s):
+        model.addConstr(z >= expression_temps(x, graph, s), f"time_scenario_{s}")
+
+    if row_generation:
+        # départ avec le scénario le plus lent en moyenne, puis ajout du scénario le plus violé
+        temps = _matrice_temps(graph, scenarios)
+        actifs = [int(np.argmax(temps.sum(axis=0)))]
+        ajouter_scenario(actifs[0])
+
+        def scenario_le_plus_viole():
+            temps_chemin = _valeurs_x(model, x, graph) @ temps
+            s = int(np.argmax(temps_chemin))
+            return s if temps_chemin[s] > z.X + TOLERANCE else None
+
+        phase = _chronometrer(infos, "construction", phase)
+        stats = generer_lignes(model, actifs, ajouter_scenario, scenario_le_plus_viole, limites=limites, debut=debut,
+                               nb_scenarios=scenarios)
+        if infos is not None:
+            infos["generation"] = stats
+    else:
+        for s in range(scenarios):
+            ajouter_scenario(s)
 
-    # Résolution du modèle
-    model.optimize()
+        # Résolution du modèle
+        phase = _chronometrer(infos, "construction", phase)
+        _optimiser_chemin(model, x, graph, limites, debut)
+    _chronometrer(infos, "resolution", phase)
 
-    # Extraction du chemin optimal
-    
-    if model.status == GRB.OPTIMAL:
+    # Extraction du chemin optimal (ou du meilleur chemin trouvé à une limite)
+    borne, gap = borne_gurobi(model)
+    if model.SolCount > 0:
     # Access variable values
-        selected_arcs = [arc for arc in arcs if x[arc].x > 0.5]
-        return selected_arcs, z.x  # Retourner la valeur positive du temps
+        selected_arcs = [arc for arc in graph.arcs if x[arc].x > 0.5]
+        valeur = z.x  # Retourner la valeur positive du temps
+        if row_generation and not stats["converge"]:
+            # génération interrompue : durée du chemin sur tous les scénarios
+            valeur = (_valeurs_x(model, x, graph) @ temps).max()
+            gap = ecart(valeur, borne)
     else:
         print(f"Optimization was unsuccessful. Status code: {model.status}")
-        return None, None
+        selected_arcs, valeur = None, None
+    _renseigner(infos, statut_gurobi(model), borne, gap)
+
+    # libérer la mémoire du modèle
+    model.dispose()
+    return selected_arcs, valeur
     
 
-def robust_shortest_path_minmax_regret(nodes, arcs, start, end, scenarios):
+def robust_shortest_path_minmax_regret(nodes, arcs, start, end, scenarios, engine="auto", graph=None, n_jobs=1, mode="process", ctx=None, cache=True, presolve=False,
+                                       row_generation=False, infos=None, algorithm="mip", max_labels=None, backend=None,
+                                       limites=None):
     """
     Résout le problème de chemin le plus court Min-Max Regret robuste.
 
@@ -75,84 +385,231 @@ def robust_shortest_path_minmax_regret(nodes, arcs, start, end, scenarios):
     - start : Nœud de départ.
     - end : Nœud de destination.
     - scenarios : Nombre de scénarios.
+    - engine : moteur utilisé par chemin_plus_rapide pour calculer z* ("auto", "dijkstra", "bellman_ford" ou "mip").
+    - graph : Graphe déjà construit pour ce graphe (listes d'adjacence), réutilisable entre plusieurs résolutions.
+    - n_jobs, mode : calcul parallèle de z* (voir z_star_chemins), dont la durée est dans
+      infos["temps_z_star"].
+    - ctx : ContexteSolveur (environnement Gurobi partagé) ; environnement par défaut si None.
+    - cache : cache des z* (True : cache par défaut, False : pas de cache), voir z_star_chemins.
+    - presolve : retirer les arcs et sommets qui ne sont sur aucun chemin du départ à l'arrivée
+      et les scénarios redondants (voir pretraitement.py).
+    - row_generation : ajouter les contraintes de regret au fur et à mesure (scénario de plus
+      grand regret pour la solution courante) au lieu de toutes les poser au départ.
+    - infos : dictionnaire optionnel, complété par les statistiques de la génération de
+      contraintes (clé "generation", voir generationLignes.generer_lignes) et les temps de
+      construction du modèle et de résolution ("temps_construction", "temps_resolution").
+    - algorithm : "mip", "labels" (étiquetage, voir cheminEtiquettes.py) ou "auto" (étiquetage
+      jusqu'à SCENARIOS_MAX_AUTO scénarios, MIP sinon ou si l'étiquetage échoue).
+    - max_labels : nombre maximal d'étiquettes créées par l'étiquetage.
+    - backend : "gurobi", "highs" (programme matriciel résolu par scipy.optimize.milp, voir
+      programmeLineaire.py) ou None (Gurobi s'il est installé).
+      aussi pour le calcul de z* ; row_generation requiert Gurobi.
+    - limites : solveur.Limites (temps de l'appel z* compris, gap, nombre de nœuds, callback recevant les
+      arcs de chaque nouveau meilleur chemin) ; à une limite atteinte, le meilleur chemin trouvé
+      est retourné et infos reçoit "statut", "borne" et "gap".
 
     Retourne :
-    - Le chemin optimal minimisant le regret maximal et la valeur de regret correspondante.
+    - Le chemin optimal minimisant le regret maximal et la valeur de regret correspondante ;
+      (None, None) si l'arrivée n'est pas atteignable ou si une limite est atteinte avant
+      qu'un chemin ne soit trouvé.
     """
+    debut = time.perf_counter()
+
+    if presolve:
+        graph, scenarios = _pretraiter(nodes, arcs, start, end, scenarios, "minmax_regret", graph)
+    else:
+        graph = graphe(nodes, arcs, graph)
+
+    backend = choisir_backend(backend)
+    if backend != "gurobi" and row_generation:
+        raise ValueError("La génération de contraintes requiert le backend gurobi.")
 
-    
     # Étape 1 : Calculer les coûts du chemin optimal pour chaque scénario
-    z_star = []
-    for s in range(scenarios):
-        result = chemin_plus_rapide(nodes, arcs, start, end, s)
-        cost = result['cost']
-        z_star.append(cost)
+    phase = time.perf_counter()
+    z_star = z_star_chemins(graph, start, end, scenarios, engine, n_jobs, mode, ctx, cache, backend=backend)
+    _chronometrer(infos, "z_star", phase)
+    if z_star is None:
+        # arrivée non atteignable : pas de chemin, comme pour les autres critères
+        _renseigner(infos, "INFEASIBLE")
+        return None, None
+
+    phase = time.perf_counter()
+    solution = _par_etiquettes(algorithm, graph, start, end, scenarios, "minmax_regret", max_labels, z_star=z_star)
+    if solution is not None:
+        _renseigner_etiquettes(infos, solution, phase)
+    elif backend != "gurobi":
+        selected_arcs, valeur, sol = _chemin_programme(graph, start, end, scenarios, "minmax_regret", backend, ctx,
+                                                       z_star=z_star, limites=limites, debut=debut, infos=infos)
+        _renseigner(infos, sol.statut, sol.borne, sol.gap)
+        if selected_arcs is None and sol.statut in STATUTS_LIMITE:
+            return None, None
+        solution = selected_arcs, valeur
+    if solution is not None:
+        if solution[0] is None:
+            raise ValueError("Chemin robuste optimal non trouvé.")
+        return solution
 
     # print("Les coûts des chemins les plus courts pour chaque scénario sont :")
     # print(z_star)
     # print()
     
     # Étape 2 : Résoudre le problème Min-Max Regret
-    model = gp.Model("MinMax_Regret_Shortest_Path")
-    model.setParam('OutputFlag', 0)
+    phase = time.perf_counter()
+    model = nouveau_modele("MinMax_Regret_Shortest_Path", ctx)
 
-    x = model.addVars(arcs.keys(), vtype=GRB.BINARY, name="x")
+    x = model.addVars(graph.arcs, vtype=GRB.BINARY, name="x")
     regret_max = model.addVar(vtype=GRB.CONTINUOUS, name="regret_max")
     model.setObjective(regret_max, GRB.MINIMIZE)
     
     # Contraintes de regret pour chaque scénario
-
-    for s in range(scenarios):
-        weights = {arc: costs[s] for arc, costs in arcs.items()}
-        regret = quicksum(weights[arc] * x[arc] for arc in arcs) - z_star[s]
+    def ajouter_scenario(s):
+        regret = expression_temps(x, graph, s) - z_star[s]
         model.addConstr(regret_max >= regret, name=f"regret_scenario_{s}")
+
+    if row_generation:
+        temps = _matrice_temps(graph, scenarios)
+        zs = np.asarray(z_star, dtype=float)
+        # départ avec le scénario dont le chemin optimal est le plus court (plus grand regret probable)
+        actifs = [int(np.argmin(zs))]
+        ajouter_scenario(actifs[0])
+    else:
+        for s in range(scenarios):
+            ajouter_scenario(s)
     
     # Contraintes de conservation du flux
-    for node in nodes:
-        inflow = quicksum(x[(i, node)] for i in nodes if (i, node) in arcs)
-        outflow = quicksum(x[(node, j)] for j in nodes if (node, j) in arcs)
-        if node == start:
-            model.addConstr(outflow - inflow == 1, name=f"flow_{node}")
-        elif node == end:
-            model.addConstr(inflow - outflow == 1, name=f"flow_{node}")
-        else:
-            model.addConstr(inflow - outflow == 0, name=f"flow_{node}")
-    
-    model.optimize()
-    
-    if model.status == GRB.OPTIMAL:
-        selected_arcs = [arc for arc in arcs if x[arc].x > 0.5]
-        return selected_arcs, model.objVal
+    ajouter_contraintes_flot(model, x, graph, start, end)
+
+    phase = _chronometrer(infos, "construction", phase)
+    if row_generation:
+        def scenario_le_plus_viole():
+            regrets = _valeurs_x(model, x, graph) @ temps - zs
+            s = int(np.argmax(regrets))
+            return s if regrets[s] > regret_max.X + TOLERANCE else None
+
+        stats = generer_lignes(model, actifs, ajouter_scenario, scenario_le_plus_viole, limites=limites, debut=debut,
+                               nb_scenarios=scenarios)
+        if infos is not None:
+            infos["generation"] = stats
     else:
+        _optimiser_chemin(model, x, graph, limites, debut)
+    _chronometrer(infos, "resolution", phase)
+    
+    statut = statut_gurobi(model)
+    borne, gap = borne_gurobi(model)
+    selected_arcs, valeur = None, None
+    if model.SolCount > 0:
+        selected_arcs = [arc for arc in graph.arcs if x[arc].x > 0.5]
+        valeur = model.objVal
+        if row_generation and not stats["converge"]:
+            # génération interrompue : regret du chemin sur tous les scénarios
+            valeur = (_valeurs_x(model, x, graph) @ temps - zs).max()
+            gap = ecart(valeur, borne)
+    _renseigner(infos, statut, borne, gap)
+
+    # libérer la mémoire du modèle
+    model.dispose()
+    if selected_arcs is None and statut not in STATUTS_LIMITE:
         raise ValueError("Chemin robuste optimal non trouvé.")
+    return selected_arcs, valeur
 
-def robust_shortest_path_maxOWA(nodes, transitions, start, end, scenarios, weights):
+def robust_shortest_path_minmax_regret_targets(nodes, arcs, start, ends, scenarios, engine="auto", graph=None, n_jobs=1, mode="process", ctx=None, cache=True,
+                                               algorithm="mip", max_labels=None, backend=None):
     """
-    Résoudre le problème de chemin robuste en utilisant MaxOWA.
+    Résout le problème Min-Max Regret du départ start vers plusieurs arrivées.
+
+    Les z* de toutes les arrivées sont obtenus par un seul arbre des chemins les plus
+    rapides par scénario (voir z_star_chemins_cibles). Un seul modèle est construit : d'une
+    arrivée à l'autre, seuls les seconds membres changent (conservation du flot de l'ancienne
+    et de la nouvelle arrivée, contraintes de regret).
 
     Paramètres :
-    - nodes : liste des nœuds du graphe.
-    - transitions : dictionnaire {(i, j): (t_s1, t_s2, ...)} représentant les temps de trajet pour chaque arc et chaque scénario.
-    - start : nœud de départ.
-    - end : nœud d'arrivée.
-    - scenarios : nombre de scénarios.
-    - weights : vecteur de pondération pour MaxOWA (e.g., [k, 1]).
+    - ends : arrivées (None : tous les sommets autres que start).
+    - Les autres paramètres sont ceux de robust_shortest_path_minmax_regret ; avec un backend
+      autre que Gurobi, chaque arrivée est résolue par un programme séparé.
 
     Retourne :
-    - Le chemin robuste optimal et sa valeur de fonction objectif.
+    - Un dictionnaire {arrivée: (chemin optimal, regret maximal)} dans l'ordre de ends ;
+      (None, None) pour une arrivée non atteignable ou sans solution optimale, ([], 0.0) pour start.
+    """
+    graph = graphe(nodes, arcs, graph)
+    if ends is None:
+        ends = [node for node in graph.noeuds if node != start]
+
+    # Étape 1 : z* de toutes les arrivées
+    backend = choisir_backend(backend)
+    z_stars = z_star_chemins_cibles(graph, start, ends, scenarios, engine, n_jobs, mode, ctx, cache, backend)
+
+    # Étape 2 : un modèle pour toutes les arrivées, construit à la première arrivée résolue par le MIP
+    resultats = {}
+    model = None
+    for end in ends:
+        z_star = z_stars[end]
+        if end == start:
+            resultats[end] = ([], 0.0)
+            continue
+        if z_star is None:
+            resultats[end] = (None, None)
+            continue
+
+        solution = _par_etiquettes(algorithm, graph, start, end, scenarios, "minmax_regret", max_labels, z_star=z_star)
+        if solution is None and backend != "gurobi":
+            solution = _chemin_programme(graph, start, end, scenarios, "minmax_regret", backend, ctx, z_star=z_star)[:2]
+        if solution is not None:
+            resultats[end] = solution
+            continue
+
+        if model is None:
+            model = nouveau_modele("MinMax_Regret_Shortest_Path_Targets", ctx)
+            x = model.addVars(graph.arcs, vtype=GRB.BINARY, name="x")
+            regret_max = model.addVar(vtype=GRB.CONTINUOUS, name="regret_max")
+            model.setObjective(regret_max, GRB.MINIMIZE)
+            # regret_max - z_s(x) >= -z*_s (second membre fixé pour chaque arrivée)
+            regrets = [model.addConstr(regret_max - expression_temps(x, graph, s) >= 0, name=f"regret_scenario_{s}")
+                       for s in range(scenarios)]
+            # pas d'arrivée au départ : elle est fixée par le second membre
+            flot = ajouter_contraintes_flot(model, x, graph, start, None)
+            puits = None
+
+        # changer d'arrivée
+        if puits is not None:
+            flot[puits].RHS = 0
+        puits = graph.index[end]
+        flot[puits].RHS = -1
+        model.setAttr("RHS", regrets, [-z for z in z_star])
+        model.optimize()
+
+        if model.status == GRB.OPTIMAL:
+            resultats[end] = ([arc for arc in graph.arcs if x[arc].x > 0.5], model.objVal)
+        else:
+            resultats[end] = (None, None)
+
+    # libérer la mémoire du modèle
+    if model is not None:
+        model.dispose()
+    return resultats
+
+
+def _poids_transformes(weights):
+    """
+    Poids w'_k = w_k - w_{k+1} (poids triés en ordre décroissant), w'_n = w_n.
     """
-    # Trier les poids en ordre décroissant
     sorted_weights = sorted(weights, reverse=True)
+    return [sorted_weights[i] - sorted_weights[i + 1] if i < len(weights) - 1 else sorted_weights[i]
+            for i in range(len(weights))]
 
-    # Transformer les poids w'_k = (w_k - w_{k+1}) pour k = 1 à n-1
-    w_prime = [sorted_weights[i] - sorted_weights[i + 1] if i < len(weights) - 1 else sorted_weights[i] for i in range(len(weights))]
 
-    # Initialisation du modèle
-    model = Model("RobustShortestPath_MaxOWA")
-    model.setParam('OutputFlag', 0)  # Désactiver les logs de Gurobi
+def _modele_owa(graph, start, end, scenarios, formulation, ctx, z_star=None):
+    """
+    Construire le modèle OWA du chemin robuste, sans objectif : maxOWA des temps si z_star
+    est None, minOWA des regrets z_i(x) - z*_i sinon. L'objectif ne dépend que des poids
+    (voir _objectif_owa) : un même modèle sert à plusieurs vecteurs de poids.
+    Retourne (model, x, rk, b).
+    """
+    regrets = z_star is not None
+    model = nouveau_modele("minOWA_of_regrets" if regrets else "RobustShortestPath_MaxOWA", ctx)
 
     # Variables de décision : x_ij = 1 si l'arc (i, j) est sélectionné, 0 sinon
-    x = model.addVars(transitions.keys(), vtype=GRB.BINARY, name="x")
+    x = model.addVars(graph.arcs, vtype=GRB.BINARY, name="x")
 
     # Variables rk (variables duales) (n variables)
     rk = [model.addVar(vtype=GRB.CONTINUOUS, name=f"r_{k}") for k in range(scenarios)]
@@ -163,55 +620,208 @@ def robust_shortest_path_maxOWA(nodes, transitions, start, end, scenarios, weigh
     # Mise à jour du modèle pour intégrer les nouvelles variables
     model.update()
 
-    # Définition de l'objectif : maximiser ∑(k=1 to n) w'_k * (k * r_k - ∑(i=1 to n) b_ik)
-    model.setObjective(
-        quicksum((w_prime[k] * ((k + 1) * rk[k] - quicksum(b[i][k] for i in range(scenarios))))
-                 for k in range(scenarios)),
-        GRB.MAXIMIZE
-    )
-
     # Contraintes de flux pour assurer un chemin valide
-    # Source node
-    for node in nodes:
-        inflow = quicksum(x[(i, node)] for i in nodes if (i, node) in transitions)
-        outflow = quicksum(x[(node, j)] for j in nodes if (node, j) in transitions)
-        if node == start:
-            model.addConstr(outflow - inflow == 1, name=f"flow_{node}")
-        elif node == end:
-            model.addConstr(inflow - outflow == 1, name=f"flow_{node}")
-        else:
-            model.addConstr(inflow - outflow == 0, name=f"flow_{node}")
+    ajouter_contraintes_flot(model, x, graph, start, end)
 
     # Contraintes pour les variables rk et b_ik
-    for k in range(scenarios):
-        for i in range(scenarios):
-            # rk - b_ik <= -z_i(x)
-            model.addConstr(
-                rk[k] - b[i][k] <= quicksum(transitions[arc][i] * x[arc] for arc in transitions),
-                name=f"AuxiliaryConstraint_{i}_{k}"
-            )
-            # b_ik >= 0
-            model.addConstr(b[i][k] >= 0, name=f"NonNeg_b_{i}_{k}")
+    # (regret du scénario i pour un chemin : z_i(x) - z*_i >= 0)
+    if formulation == "compact":
+        # z_i(x) est définie une seule fois par scénario (b_ik >= 0 est la borne inférieure des b_ik)
+        z = _variables_temps(model, x, graph, scenarios)
+        for k in range(scenarios):
+            for i in range(scenarios):
+                if regrets:
+                    model.addConstr(rk[k] - b[i][k] >= z[i] - z_star[i], name=f"AuxiliaryConstraint_{i}_{k}")
+                else:
+                    model.addConstr(rk[k] - b[i][k] <= z[i], name=f"AuxiliaryConstraint_{i}_{k}")
+    else:
+        for k in range(scenarios):
+            for i in range(scenarios):
+                if regrets:
+                    model.addConstr(
+                        rk[k] - b[i][k] >= expression_temps(x, graph, i) - z_star[i],
+                        name=f"AuxiliaryConstraint_{i}_{k}"
+                    )
+                    model.addConstr(b[i][k] >= 0, name=f"Neg_b_{i}_{k}")
+                else:
+                    # rk - b_ik <= z_i(x)
+                    model.addConstr(
+                        rk[k] - b[i][k] <= expression_temps(x, graph, i),
+                        name=f"AuxiliaryConstraint_{i}_{k}"
+                    )
+                    # b_ik >= 0
+                    model.addConstr(b[i][k] >= 0, name=f"NonNeg_b_{i}_{k}")
+
+    return model, x, rk, b
+
+
+def gabarit_owa(modeles, graph, start, end, scenarios, formulation, ctx, z_star=None, modeles_max=MODELES_MAX):
+    """
+    Modèle OWA (model, x, rk, b) de _modele_owa, conservé dans modeles : un dictionnaire par
+    graphe, dont l'appelant garde la propriété (voir liberer_modeles). Un modèle réutilisé
+    garde sa dernière solution comme point de départ et retrouve les paramètres de limite
+    par défaut. modeles None : modèle construit pour l'appel.
+
+    modeles est tenu dans l'ordre des utilisations (LRU) : au-delà de modeles_max modèles
+    (un par départ, arrivée, nombre de scénarios, formulation et z*), le moins récemment
+    utilisé est libéré.
+    """
+    if modeles is None:
+        return _modele_owa(graph, start, end, scenarios, formulation, ctx, z_star)
+    cle = (start, end, scenarios, formulation, None if z_star is None else tuple(z_star))
+    if cle in modeles:
+        # dernier utilisé en fin de dictionnaire
+        modeles[cle] = modeles.pop(cle)
+        reinitialiser_limites(modeles[cle][0])
+        return modeles[cle]
+    while modeles and len(modeles) >= modeles_max:
+        modeles.pop(next(iter(modeles)))[0].dispose()
+    modeles[cle] = _modele_owa(graph, start, end, scenarios, formulation, ctx, z_star)
+    return modeles[cle]
+
+
+def liberer_modeles(modeles):
+    """
+    Libérer les modèles Gurobi d'un dictionnaire de gabarits (voir gabarit_owa) et le vider.
+    """
+    for model, *_ in modeles.values():
+        model.dispose()
+    modeles.clear()
 
-    # Résolution
-    model.optimize()
 
-    if model.status == GRB.OPTIMAL:
-        selected_arcs = [arc for arc in transitions if x[arc].x > 0.5]
-        print("\nSolution optimale:")
+def _objectif_owa(model, rk, b, w_prime, regrets):
+    """
+    Définir ou remplacer l'objectif du modèle OWA en ne modifiant que les coefficients :
+    maxOWA : maximiser ∑_k w'_k * (k * r_k - ∑_i b_ik),
+    minOWA : minimiser ∑_k w'_k * (k * r_k + ∑_i b_ik).
+    """
+    n = len(rk)
+    signe = 1 if regrets else -1
+    model.setAttr("Obj", rk, [(k + 1) * w_prime[k] for k in range(n)])
+    model.setAttr("Obj", [b[i][k] for i in range(n) for k in range(n)],
+                  [signe * w_prime[k] for i in range(n) for k in range(n)])
+    model.ModelSense = GRB.MINIMIZE if regrets else GRB.MAXIMIZE
+
+
+def _solution_owa(model, x, rk, graph, verbose):
+    """
+    Extraire le chemin sélectionné et la valeur de l'objectif (None, None sans solution ; meilleure
+    solution trouvée si une limite est atteinte).
+    """
+    if model.SolCount == 0:
+        return None, None
+
+    selected_arcs = [arc for arc in graph.arcs if x[arc].x > 0.5]
+    if verbose:
+        print("\nSolution optimale:" if model.Status == GRB.OPTIMAL else f"\nMeilleure solution ({statut_gurobi(model)}):")
         print(f"Chemin sélectionné: {selected_arcs}")
         print(f"Valeur de la fonction objectif: {model.objVal}")
 
         # Valeurs des rk
-        r_values = [rk[k].x for k in range(scenarios)]
+        r_values = [rk[k].x for k in range(len(rk))]
         print("Valeurs des rk:", r_values)
+    return selected_arcs, model.objVal
+
+
+def _afficher_solution(solution, verbose):
+    """
+    Afficher la solution obtenue par étiquetage ou par un backend autre que Gurobi (sans les
+    valeurs r_k) et la retourner.
+    """
+    selected_arcs, valeur = solution
+    if verbose and selected_arcs is not None:
+        print("\nSolution optimale:")
+        print(f"Chemin sélectionné: {selected_arcs}")
+        print(f"Valeur de la fonction objectif: {valeur}")
+    return solution
+
+
+def robust_shortest_path_maxOWA(nodes, transitions, start, end, scenarios, weights, graph=None, formulation="standard", ctx=None, verbose=True, presolve=False,
+                                algorithm="mip", max_labels=None, backend=None, limites=None, infos=None, modeles=None):
+    """
+    Résoudre le problème de chemin robuste en utilisant MaxOWA.
+
+    Paramètres :
+    - nodes : liste des nœuds du graphe.
+    - transitions : dictionnaire {(i, j): (t_s1, t_s2, ...)} représentant les temps de trajet pour chaque arc et chaque scénario.
+    - start : nœud de départ.
+    - end : nœud d'arrivée.
+    - scenarios : nombre de scénarios.
+    - weights : vecteur de pondération pour MaxOWA (e.g., [k, 1]).
+    - graph : Graphe déjà construit pour ce graphe (listes d'adjacence), réutilisable entre plusieurs résolutions.
+    - formulation : "standard" ou "compact" (temps z_i(x) définis une seule fois par des variables auxiliaires).
+    - ctx : ContexteSolveur (environnement Gurobi partagé) ; environnement par défaut si None.
+    - verbose : afficher la solution.
+    - presolve : retirer les arcs et sommets qui ne sont sur aucun chemin du départ à l'arrivée
+      (voir pretraitement.py ; tous les scénarios comptent dans l'OWA).
+    - algorithm : "mip", "labels" (étiquetage, voir cheminEtiquettes.py) ou "auto" (étiquetage
+      jusqu'à SCENARIOS_MAX_AUTO scénarios, MIP sinon ou si l'étiquetage échoue) ; l'étiquetage
+      du critère maxOWA est réservé aux graphes sans circuit.
+    - max_labels : nombre maximal d'étiquettes créées par l'étiquetage.
+    - backend : "gurobi", "highs" (programme matriciel résolu par scipy.optimize.milp, voir
+      programmeLineaire.py) ou None (Gurobi s'il est installé).
+    - limites : solveur.Limites (temps de l'appel, gap, nombre de nœuds, callback recevant les
+      arcs de chaque nouveau meilleur chemin) ; à une limite atteinte, le meilleur chemin trouvé
+      est retourné et infos reçoit "statut", "borne" et "gap".
+    - infos : dictionnaire optionnel, complété par le statut, la borne, l'écart relatif et les
+      temps de construction du modèle et de résolution ("temps_construction", "temps_resolution").
+    - modeles : dictionnaire de modèles conservé par l'appelant entre les appels sur un même
+      graph (voir gabarit_owa) : le modèle Gurobi n'est construit qu'au premier appel, puis
+      seul l'objectif change avec les poids ; au plus MODELES_MAX modèles y sont gardés ;
+      ignoré avec presolve.
+
+    Retourne :
+    - Le chemin robuste optimal et sa valeur de fonction objectif.
+    """
+    if formulation not in FORMULATIONS:
+        raise ValueError(f"Formulation inconnue : {formulation} (attendu : {', '.join(FORMULATIONS)})")
 
-        return selected_arcs, model.objVal
+    debut = time.perf_counter()
+    if presolve:
+        graph, scenarios = _pretraiter(nodes, transitions, start, end, scenarios, "maxOWA", graph)
     else:
+        graph = graphe(nodes, transitions, graph)
+
+    phase = time.perf_counter()
+    solution = _par_etiquettes(algorithm, graph, start, end, scenarios, "maxOWA", max_labels, weights=weights)
+    backend = choisir_backend(backend)
+    if solution is not None:
+        _renseigner_etiquettes(infos, solution, phase)
+    elif backend != "gurobi":
+        selected_arcs, valeur, sol = _chemin_programme(graph, start, end, scenarios, "maxOWA", backend, ctx,
+                                                       weights=weights, formulation=formulation, limites=limites,
+                                                       debut=debut, infos=infos)
+        _renseigner(infos, sol.statut, sol.borne, sol.gap)
+        if selected_arcs is None:
+            print(f"Optimization was unsuccessful. Status: {sol.statut}")
+        solution = selected_arcs, valeur
+    if solution is not None:
+        return _afficher_solution(solution, verbose)
+
+    # Construction du modèle (ou gabarit de modeles) et de l'objectif (poids w'_k)
+    if presolve:
+        modeles = None
+    phase = time.perf_counter()
+    model, x, rk, b = gabarit_owa(modeles, graph, start, end, scenarios, formulation, ctx)
+    _objectif_owa(model, rk, b, _poids_transformes(weights), regrets=False)
+
+    # Résolution
+    phase = _chronometrer(infos, "construction", phase)
+    _optimiser_chemin(model, x, graph, limites, debut)
+    _chronometrer(infos, "resolution", phase)
+
+    selected_arcs, valeur = _solution_owa(model, x, rk, graph, verbose)
+    if selected_arcs is None:
         print(f"Optimization was unsuccessful. Status code: {model.status}")
-        return None, None
+    _renseigner(infos, statut_gurobi(model), *borne_gurobi(model))
 
-def robust_shortest_path_minOWA(nodes, transitions, start, end, scenarios, weights):
+    # libérer la mémoire du modèle (sauf gabarit conservé dans modeles)
+    if modeles is None:
+        model.dispose()
+    return selected_arcs, valeur
+
+def robust_shortest_path_minOWA(nodes, transitions, start, end, scenarios, weights, engine="auto", graph=None, n_jobs=1, mode="process", formulation="standard", ctx=None, verbose=True, cache=True, presolve=False,
+                                algorithm="mip", max_labels=None, backend=None, limites=None, infos=None, modeles=None):
     """
     Résoudre le problème de chemin robuste en utilisant minOWA pour les regrets.
 
@@ -222,79 +832,173 @@ def robust_shortest_path_minOWA(nodes, transitions, start, end, scenarios, weigh
     - end : nœud d'arrivée.
     - scenarios : nombre de scénarios.
     - weights : vecteur de pondération pour minOWA.
+    - engine : moteur utilisé par chemin_plus_rapide pour calculer z* ("auto", "dijkstra", "bellman_ford" ou "mip").
+    - graph : Graphe déjà construit pour ce graphe (listes d'adjacence), réutilisable entre plusieurs résolutions.
+    - n_jobs, mode : calcul parallèle de z* (voir z_star_chemins), dont la durée est dans
+      infos["temps_z_star"].
+    - formulation : "standard" ou "compact" (temps z_i(x) définis une seule fois par des variables auxiliaires).
+    - ctx : ContexteSolveur (environnement Gurobi partagé) ; environnement par défaut si None.
+    - verbose : afficher la solution.
+    - cache : cache des z* (True : cache par défaut, False : pas de cache), voir z_star_chemins.
+    - presolve : retirer les arcs et sommets qui ne sont sur aucun chemin du départ à l'arrivée
+      (voir pretraitement.py ; tous les scénarios comptent dans l'OWA).
+    - algorithm : "mip", "labels" (étiquetage, voir cheminEtiquettes.py) ou "auto" (étiquetage
+      jusqu'à SCENARIOS_MAX_AUTO scénarios, MIP sinon ou si l'étiquetage échoue) ; l'étiquetage
+      du critère maxOWA est réservé aux graphes sans circuit.
+    - max_labels : nombre maximal d'étiquettes créées par l'étiquetage.
+    - backend : "gurobi", "highs" (programme matriciel résolu par scipy.optimize.milp, voir
+      programmeLineaire.py) ou None (Gurobi s'il est installé).
+    - limites : solveur.Limites (temps de l'appel z* compris, gap, nombre de nœuds, callback recevant les
+      arcs de chaque nouveau meilleur chemin) ; à une limite atteinte, le meilleur chemin trouvé
+      est retourné et infos reçoit "statut", "borne" et "gap".
+    - infos : dictionnaire optionnel, complété par le statut, la borne, l'écart relatif et les
+      temps de construction du modèle et de résolution ("temps_construction", "temps_resolution").
+    - modeles : dictionnaire de modèles conservé par l'appelant entre les appels sur un même
+      graph (voir gabarit_owa) : le modèle Gurobi n'est construit qu'au premier appel, puis
+      seul l'objectif change avec les poids ; au plus MODELES_MAX modèles y sont gardés ;
+      ignoré avec presolve.
 
     Retourne :
     - Le chemin robuste optimal et sa valeur de fonction objectif.
     """
-    # Étape 1 : Calcul de z_star pour chaque scénario (chemin optimal par scénario)
-    z_star = []
-    paths = []
+    if formulation not in FORMULATIONS:
+        raise ValueError(f"Formulation inconnue : {formulation} (attendu : {', '.join(FORMULATIONS)})")
 
-    for s in range(scenarios):
-        result = chemin_plus_rapide(nodes, transitions, start, end, s)
-        cost = result['cost']
-        z_star.append(cost)
+    debut = time.perf_counter()
+    if presolve:
+        graph, scenarios = _pretraiter(nodes, transitions, start, end, scenarios, "minOWA", graph)
+    else:
+        graph = graphe(nodes, transitions, graph)
 
-    # Étape 2 : Résolution du problème minOWA des regrets
-    # Transformation des poids w'_k
-    sorted_weights = sorted(weights, reverse=True)
-    w_prime = [sorted_weights[i] - sorted_weights[i + 1] if i < len(weights) - 1 else sorted_weights[i]
-               for i in range(len(weights))]
+    # Étape 1 : Calcul de z_star pour chaque scénario (chemin optimal par scénario)
+    backend = choisir_backend(backend)
+    phase = time.perf_counter()
+    z_star = z_star_chemins(graph, start, end, scenarios, engine, n_jobs, mode, ctx, cache, backend=backend)
+    _chronometrer(infos, "z_star", phase)
+    if z_star is None:
+        # arrivée non atteignable : pas de chemin, comme pour les autres critères
+        _renseigner(infos, "INFEASIBLE")
+        return None, None
 
-    # Initialisation du modèle minOWA
-    model = Model("minOWA_of_regrets")
-    model.setParam('OutputFlag', 0)
+    phase = time.perf_counter()
+    solution = _par_etiquettes(algorithm, graph, start, end, scenarios, "minOWA", max_labels, z_star=z_star,
+                               weights=weights)
+    if solution is not None:
+        _renseigner_etiquettes(infos, solution, phase)
+    elif backend != "gurobi":
+        selected_arcs, valeur, sol = _chemin_programme(graph, start, end, scenarios, "minOWA", backend, ctx,
+                                                       z_star=z_star, weights=weights, formulation=formulation,
+                                                       limites=limites, debut=debut, infos=infos)
+        _renseigner(infos, sol.statut, sol.borne, sol.gap)
+        if selected_arcs is None:
+            print(f"Optimization failed. Status: {sol.statut}")
+        solution = selected_arcs, valeur
+    if solution is not None:
+        return _afficher_solution(solution, verbose)
+
+    # Étape 2 : Résolution du problème minOWA des regrets (poids w'_k)
+    if presolve:
+        modeles = None
+    phase = time.perf_counter()
+    model, x, rk, b = gabarit_owa(modeles, graph, start, end, scenarios, formulation, ctx, z_star)
+    _objectif_owa(model, rk, b, _poids_transformes(weights), regrets=True)
 
-    # Variables de décision : x_ij = 1 si l'arc (i, j) est sélectionné, 0 sinon
-    x = model.addVars(transitions.keys(), vtype=GRB.BINARY, name="x")
+    # Résolution
+    phase = _chronometrer(infos, "construction", phase)
+    _optimiser_chemin(model, x, graph, limites, debut)
+    _chronometrer(infos, "resolution", phase)
 
-    # Variables rk (variables duales) (n variables)
-    rk = [model.addVar(vtype=GRB.CONTINUOUS, name=f"r_{k}") for k in range(scenarios)]
+    selected_arcs, valeur = _solution_owa(model, x, rk, graph, verbose)
+    if selected_arcs is None:
+        print(f"Optimization failed. Status code: {model.status}")
+    _renseigner(infos, statut_gurobi(model), *borne_gurobi(model))
 
-    # Variables b_ik (variables de linéarisation) (n^2 variables)
-    b = [[model.addVar(vtype=GRB.CONTINUOUS, name=f"b_{i}_{k}") for k in range(scenarios)] for i in range(scenarios)]
+    # libérer la mémoire du modèle (sauf gabarit conservé dans modeles)
+    if modeles is None:
+        model.dispose()
+    return selected_arcs, valeur
 
-    # Définition de l'objectif : minimiser l'OWA des regrets
-    model.setObjective(
-        quicksum((w_prime[k] * ((k + 1) * rk[k] + quicksum(b[i][k] for i in range(scenarios))))
-                 for k in range(scenarios)),
-        GRB.MINIMIZE
-    )
 
-    # Contraintes de flux pour assurer un chemin valide
-    for node in nodes:
-        inflow = quicksum(x[(i, node)] for i in nodes if (i, node) in transitions)
-        outflow = quicksum(x[(node, j)] for j in nodes if (node, j) in transitions)
-        if node == start:
-            model.addConstr(outflow - inflow == 1, name=f"flow_{node}")
-        elif node == end:
-            model.addConstr(inflow - outflow == 1, name=f"flow_{node}")
-        else:
-            model.addConstr(inflow - outflow == 0, name=f"flow_{node}")
+def robust_shortest_path_maxOWA_sweep(nodes, transitions, start, end, scenarios, weights_list, graph=None, formulation="standard", ctx=None, presolve=False, backend=None):
+    """
+    Résoudre MaxOWA pour une suite de vecteurs de poids sur le même graphe.
 
-    # Contraintes sur les regrets et linéarisation
-    for k in range(scenarios):
-        for i in range(scenarios):
-            model.addConstr(
-                rk[k] - b[i][k] >= z_star[i] - quicksum(transitions[arc][i] * x[arc] for arc in transitions),
-                name=f"AuxiliaryConstraint_{i}_{k}"
-            )
-            model.addConstr(b[i][k] >= 0, name=f"Neg_b_{i}_{k}")
+    Le modèle est construit une seule fois : entre deux résolutions, seuls les coefficients
+    de l'objectif (w'_k) sont modifiés, et la solution précédente (toujours réalisable)
+    sert de point de départ. Les vecteurs de poids qui donnent les mêmes w'_k (mêmes
+    poids triés) ne sont résolus qu'une fois.
 
-    # Résolution
-    model.optimize()
+    Paramètres : voir robust_shortest_path_maxOWA ; weights_list est la liste des vecteurs de poids.
+    Avec un backend autre que Gurobi, chaque vecteur de poids distinct est résolu séparément.
 
-    if model.status == GRB.OPTIMAL:
-        selected_arcs = [arc for arc in transitions if x[arc].x > 0.5]
-        print("\nSolution optimale:")
-        print(f"Chemin sélectionné: {selected_arcs}")
-        print(f"Valeur de la fonction objectif: {model.objVal}")
+    Retourne :
+    - La liste des (poids, chemin, valeur) dans l'ordre de weights_list (chemin et valeur None sans solution optimale).
+    """
+    if formulation not in FORMULATIONS:
+        raise ValueError(f"Formulation inconnue : {formulation} (attendu : {', '.join(FORMULATIONS)})")
 
-        # Valeurs des rk
-        r_values = [rk[k].x for k in range(scenarios)]
-        print("Valeurs des rk:", r_values)
-        return selected_arcs, model.objVal
+    if presolve:
+        graph, scenarios = _pretraiter(nodes, transitions, start, end, scenarios, "maxOWA", graph)
     else:
-        print(f"Optimization failed. Status code: {model.status}")
-        return None, None
+        graph = graphe(nodes, transitions, graph)
+    return _balayage_owa(graph, start, end, scenarios, weights_list, formulation, ctx, backend=choisir_backend(backend))
+
+
+def robust_shortest_path_minOWA_sweep(nodes, transitions, start, end, scenarios, weights_list, engine="auto", graph=None, n_jobs=1, mode="process", formulation="standard", ctx=None, cache=True, presolve=False, backend=None):
+    """
+    Résoudre minOWA des regrets pour une suite de vecteurs de poids sur le même graphe.
+
+    z* est calculé une seule fois, puis le modèle est construit une seule fois et réutilisé
+    comme dans robust_shortest_path_maxOWA_sweep.
 
+    Paramètres : voir robust_shortest_path_minOWA ; weights_list est la liste des vecteurs de poids.
+
+    Retourne :
+    - La liste des (poids, chemin, valeur) dans l'ordre de weights_list (chemin et valeur None sans solution optimale).
+    """
+    if formulation not in FORMULATIONS:
+        raise ValueError(f"Formulation inconnue : {formulation} (attendu : {', '.join(FORMULATIONS)})")
+
+    if presolve:
+        graph, scenarios = _pretraiter(nodes, transitions, start, end, scenarios, "minOWA", graph)
+    else:
+        graph = graphe(nodes, transitions, graph)
+    backend = choisir_backend(backend)
+    z_star = z_star_chemins(graph, start, end, scenarios, engine, n_jobs, mode, ctx, cache, backend=backend)
+    if z_star is None:
+        return [(weights, None, None) for weights in weights_list]
+    return _balayage_owa(graph, start, end, scenarios, weights_list, formulation, ctx, z_star, backend)
+
+
+def _balayage_owa(graph, start, end, scenarios, weights_list, formulation, ctx, z_star=None, backend="gurobi"):
+    if backend != "gurobi":
+        critere = "maxOWA" if z_star is None else "minOWA"
+        deja_resolus = {}
+        for weights in weights_list:
+            w_prime = tuple(_poids_transformes(weights))
+            if w_prime not in deja_resolus:
+                deja_resolus[w_prime] = _chemin_programme(graph, start, end, scenarios, critere, backend, ctx,
+                                                          z_star, weights, formulation)[:2]
+        return [(list(weights), *deja_resolus[tuple(_poids_transformes(weights))]) for weights in weights_list]
+
+    regrets = z_star is not None
+    model, x, rk, b = _modele_owa(graph, start, end, scenarios, formulation, ctx, z_star)
+    variables = model.getVars()
+
+    resultats = []
+    deja_resolus = {}
+    for weights in weights_list:
+        w_prime = tuple(_poids_transformes(weights))
+        if w_prime not in deja_resolus:
+            _objectif_owa(model, rk, b, w_prime, regrets)
+            model.optimize()
+            deja_resolus[w_prime] = _solution_owa(model, x, rk, graph, verbose=False)
+            # démarrage à chaud : la solution courante reste réalisable pour les poids suivants
+            if model.SolCount > 0:
+                model.setAttr("Start", variables, model.getAttr("X", variables))
+        selected_arcs, valeur = deja_resolus[w_prime]
+        resultats.append((list(weights), selected_arcs, valeur))
+
+    # libérer la mémoire du modèle
+    model.dispose()
+    return resultats
@@ -0,0 +1,427 @@
+"""
+Interface en ligne de commande non interactive (traitements par lots, appels ponctuels).
+
+Les instances sont lues dans des fichiers JSON et les résultats écrits en JSON sur la sortie
+standard (ou dans --sortie) ; les affichages des solveurs sont redirigés vers la sortie
+d'erreur. Les modules lourds ne sont importés qu'à l'usage : NumPy et le solveur (gurobipy
+ou scipy) pour la commande solve, pandas pour la commande benchmark. Les temps de démarrage,
+de chargement de l'instance, d'import du solveur et de résolution sont dans le champ "temps".
+Les limites --time-limit, --gap et --node-limit (solveur.Limites) s'appliquent aux deux
+backends : à une limite atteinte, la meilleure solution trouvée est écrite avec sa borne et
+son gap (code de sortie 1) ; --incumbents écrit chaque nouvelle meilleure solution, en une
+ligne JSON, sur la sortie d'erreur. Pour la sélection de projets, --heuristic retourne la
+solution de heuristiques.py (statut "HEURISTIQUE", borne de la relaxation linéaire) et
+--warm-start la donne comme solution de départ au programme exact. La commande batch résout
+un lot d'instances dans un pool de processus (resolutionParLots.py) et écrit une ligne JSON
+par instance dans l'ordre de fin des résolutions.
+
+Formats d'instance :
+- sélection de projets : {"costs": [...], "utilities": [[...], ...], "budget": ..., "weights": [...]}
+- chemin robuste : {"nodes": [...], "arcs": [[i, j, [t_1, ..., t_n]], ...], "start": ..., "end": ...,
+  "scenarios": n, "weights": [...]} (scenarios : par défaut, nombre de temps par arc)
+weights n'est requis que pour les critères OWA. Un répertoire est lu comme une instance
+binaire (instancesBinaires.py, commande convertir).
+
+Exemples :
+    python -m cli exemple sac > sac.json
+    python -m cli solve --critere minOWA --instance sac.json --backend highs
+    python -m cli solve --criterion chemin_minmax_regret --instance chemin.json --algorithm auto
+    python -m cli solve --critere maxmin --instance sac.json --time-limit 5 --gap 0.01 --incumbents
+    python -m cli convertir chemin.json chemin/ && python -m cli solve --critere chemin_maxmin --instance chemin/
+    python -m cli batch --critere maxmin --instances lot/*.json --n-jobs 8 --threads 1 > resultats.jsonl
+    python -m cli benchmark --criteres maxmin --n 5 --p 10 --instances 3
+"""
+import time
+
+_DEBUT = time.perf_counter()
+
+import argparse
+import contextlib
+import json
+import os
+import sys
+
+# critères : nom -> (type d'instance, module, fonction de résolution)
+CRITERES = {
+    "maxmin": ("sac", "maxmin", "maxmin"),
+    "minmaxRegret": ("sac", "minmaxRegret", "minmaxRegret"),
+    "maxOWA": ("sac", "maxOWA", "maxOWA"),
+    "minOWA": ("sac", "minOWA", "minOWA"),
+    "chemin_maxmin": ("chemin", "cheminRobuste", "robust_shortest_path_maxmin"),
+    "chemin_minmax_regret": ("chemin", "cheminRobuste", "robust_shortest_path_minmax_regret"),
+    "chemin_maxOWA": ("chemin", "cheminRobuste", "robust_shortest_path_maxOWA"),
+    "chemin_minOWA": ("chemin", "cheminRobuste", "robust_shortest_path_minOWA"),
+}
+
+# instances d'exemple de myData.py
+EXEMPLES = ("sac", "chemin1", "chemin2")
+
+# codes de sortie : solution optimale, pas de solution optimale, erreur (instance, arguments ou solveur)
+SORTIE_OPTIMALE, SORTIE_NON_OPTIMALE, SORTIE_ERREUR = 0, 1, 2
+
+
+def charger_instance(chemin, critere):
+    """
+    Lire une instance JSON, ou binaire (répertoire, voir instancesBinaires.py), et retourner
+    les arguments positionnels et nommés de la fonction de résolution du critère.
+    """
+    genre = CRITERES[critere][0]
+    owa = critere.endswith("OWA")
+    if os.path.isdir(chemin):
+        from instancesBinaires import charger_instance as charger_binaire
+
+        instance = charger_binaire(chemin)
+        if instance["type"] != genre:
+            raise ValueError(f"Instance de type {instance['type']} pour le critère {critere}.")
+        if genre == "sac":
+            args = [instance["nb_projects"], instance["nb_scenarios"], instance["costs"], instance["utilities"],
+                    instance["budget"]]
+            options = {}
+        else:
+            args = [None, None, instance["start"], instance["end"], instance["scenarios"]]
+            options = {"graph": instance["graph"]}
+        if owa:
+            if instance["weights"] is None:
+                raise ValueError("Champ manquant dans l'instance : weights")
+            args.append(instance["weights"])
+        return args, options
+
+    return arguments_instance(_lire_json(chemin), critere), {}
+
+
+def arguments_instance(instance, critere):
+    """
+    Arguments positionnels de la fonction de résolution du critère pour une instance au
+    format JSON (dictionnaire).
+    """
+    genre = CRITERES[critere][0]
+    owa = critere.endswith("OWA")
+    try:
+        if genre == "sac":
+            utilities = instance["utilities"]
+            args = [len(instance["costs"]), len(utilities), instance["costs"], utilities, instance["budget"]]
+        else:
+            transitions = {(i, j): tuple(temps) for i, j, temps in instance["arcs"]}
+            scenarios = instance.get("scenarios", min(len(t) for t in transitions.values()) if transitions else 0)
+            args = [instance["nodes"], transitions, instance["start"], instance["end"], scenarios]
+        if owa:
+            args.append(instance["weights"])
+    except KeyError as e:
+        raise ValueError(f"Champ manquant dans l'instance : {e.args[0]}") from None
+    return args
+
+
+def convertir(source, repertoire):
+    """
+    Convertir une instance JSON de la commande solve au format binaire.
+    """
+    import instancesBinaires as ib
+
+    instance = _lire_json(source)
+    try:
+        if "arcs" in instance:
+            transitions = {(i, j): tuple(temps) for i, j, temps in instance["arcs"]}
+            ib.ecrire_instance_chemin(repertoire, instance["nodes"], transitions, instance["start"], instance["end"],
+                                      weights=instance.get("weights"))
+        else:
+            ib.ecrire_instance_sac(repertoire, instance["costs"], instance["utilities"], instance["budget"],
+                                   weights=instance.get("weights"))
+    except KeyError as e:
+        raise ValueError(f"Champ manquant dans l'instance : {e.args[0]}") from None
+
+
+def _lire_json(chemin):
+    with open(chemin, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def instance_exemple(nom):
+    """
+    Instance de myData.py au format JSON de la commande solve.
+    """
+    import myData as d
+
+    if nom == "sac":
+        return {"costs": d.costs, "utilities": d.utilities, "budget": d.budget, "weights": d.weights}
+    nodes, transitions, start, end = {
+        "chemin1": (d.nodes1, d.transitions1, d.start1, d.end1),
+        "chemin2": (d.nodes2, d.transitions2, d.start2, d.end2),
+    }[nom]
+    return {"nodes": nodes, "arcs": [[i, j, list(t)] for (i, j), t in transitions.items()],
+            "start": start, "end": end, "scenarios": 2, "weights": d.weights}
+
+
+def _options(args):
+    """
+    Arguments nommés de la fonction de résolution (seulement ceux que le critère accepte).
+    """
+    genre = CRITERES[args.critere][0]
+    owa = args.critere.endswith("OWA")
+    options = {"backend": args.backend, "presolve": args.presolve}
+    if owa:
+        options["verbose"] = False
+        if args.formulation is not None:
+            options["formulation"] = args.formulation
+    elif args.row_generation:
+        options["row_generation"] = True
+    if genre == "sac":
+        options["verbose"] = False
+    else:
+        options["algorithm"] = args.algorithm
+        if args.max_labels is not None:
+            options["max_labels"] = args.max_labels
+    return options
+
+
+def _limites(args):
+    """
+    solveur.Limites des options --time-limit, --gap, --node-limit et --incumbents (None sans limite).
+    """
+    incumbents = getattr(args, "incumbents", False)
+    if args.time_limit is None and args.gap is None and args.node_limit is None and not incumbents:
+        return None
+    from solveur import Limites
+
+    callback = None
+    if incumbents:
+        def callback(solution):
+            # vecteur de sélection des projets ou arcs du chemin
+            valeurs = [list(v) if isinstance(v, tuple) else _scalaire(v) for v in solution["solution"]]
+            ligne = {k: _scalaire(v) for k, v in solution.items() if k != "solution"}
+            print(json.dumps(dict(ligne, solution=valeurs), ensure_ascii=False), file=sys.stderr, flush=True)
+    return Limites(temps=args.time_limit, gap=args.gap, noeuds=args.node_limit, callback=callback)
+
+
+def _erreurs_resolution():
+    """
+    Exceptions écrites en JSON (statut "ERREUR", code SORTIE_ERREUR) : instance ou arguments
+    invalides, erreurs du solveur (GurobiError si gurobipy est importé, licence, mémoire).
+    """
+    erreurs = (OSError, ValueError, ImportError, RuntimeError, ArithmeticError, MemoryError)
+    gurobipy = sys.modules.get("gurobipy")
+    if gurobipy is not None:
+        erreurs += (gurobipy.GurobiError,)
+    return erreurs
+
+
+def _scalaire(v):
+    return v.item() if hasattr(v, "item") else v
+
+
+def resoudre(args):
+    """
+    Commande solve : retourne (dictionnaire du résultat, code de sortie).
+    """
+    temps = {"demarrage": time.perf_counter() - _DEBUT}
+
+    debut = time.perf_counter()
+    instance, options = charger_instance(args.instance, args.critere)
+    temps["chargement"] = time.perf_counter() - debut
+
+    debut = time.perf_counter()
+    genre, module, fonction = CRITERES[args.critere]
+    func = getattr(__import__(module), fonction)
+    from solveur import ContexteSolveur, choisir_backend
+    backend = choisir_backend(args.backend)
+    temps["import"] = time.perf_counter() - debut
+    if (args.heuristic or args.warm_start) and genre != "sac":
+        raise ValueError("--heuristic et --warm-start sont réservés aux critères de sélection de projets.")
+
+    ctx = None
+    if backend == "gurobi" and args.threads is not None:
+        ctx = ContexteSolveur(threads=args.threads)
+    limites = _limites(args)
+    if limites is not None:
+        options["limites"] = limites
+    infos = {}
+    if genre == "chemin":
+        options["infos"] = infos
+    debut = time.perf_counter()
+    try:
+        # la sortie standard est réservée au JSON
+        with contextlib.redirect_stdout(sys.stderr):
+            if args.heuristic or args.warm_start:
+                from heuristiques import heuristique
+                solution = heuristique(args.critere, *instance, backend=backend, ctx=ctx)
+                temps["heuristique"] = time.perf_counter() - debut
+                options["depart"] = solution.x
+                # temps["resolution"] : programme exact seul
+                debut = time.perf_counter()
+            if not args.heuristic:
+                solution = func(*instance, ctx=ctx, **options, **_options(args))
+    finally:
+        if ctx is not None:
+            ctx.dispose()
+    temps["resolution"] = time.perf_counter() - debut
+
+    sortie = en_dict(args.critere, solution, infos)
+    sortie["backend"] = backend
+    temps["total"] = time.perf_counter() - _DEBUT
+    sortie["temps"] = temps
+    return sortie, SORTIE_OPTIMALE if sortie["statut"] == "OPTIMAL" else SORTIE_NON_OPTIMALE
+
+
+def en_dict(critere, solution, infos=None):
+    """
+    Résultat d'une fonction de résolution du critère sous forme de dictionnaire JSON :
+    Resultat.en_dict() pour la sélection de projets ; statut, objectif, borne, gap et arcs
+    du chemin (infos : dictionnaire complété par la fonction) pour le chemin robuste.
+    """
+    if CRITERES[critere][0] == "sac":
+        sortie = solution.en_dict()
+    else:
+        infos = infos or {}
+        path, valeur = solution
+        sortie = {"statut": statut_solution(critere, solution, infos),
+                  "objectif": None if valeur is None else float(valeur),
+                  "borne": _scalaire(infos.get("borne")), "gap": _scalaire(infos.get("gap")),
+                  "chemin": None if path is None else [list(arc) for arc in path]}
+    sortie["critere"] = critere
+    return sortie
+
+
+def statut_solution(critere, solution, infos=None):
+    """
+    Statut d'un résultat d'une fonction de résolution du critère (voir en_dict).
+    """
+    if CRITERES[critere][0] == "sac":
+        return solution.statut
+    path = solution[0]
+    statut = (infos or {}).get("statut", "OPTIMAL")
+    return statut if path is not None or statut != "OPTIMAL" else "ECHEC"
+
+
+def resoudre_lot(args):
+    """
+    Commande batch : écrire une ligne JSON par instance, dans l'ordre de fin des résolutions
+    (resolutionParLots.py), et retourner le code de sortie le plus élevé des instances.
+    """
+    from resolutionParLots import resoudre_lots
+
+    options = _options(args)
+    limites = _limites(args)
+    if limites is not None:
+        options["limites"] = limites
+    code = SORTIE_OPTIMALE
+    with contextlib.ExitStack() as pile:
+        fichier = pile.enter_context(open(args.sortie, "w", encoding="utf-8")) if args.sortie else sys.stdout
+        pile.enter_context(contextlib.redirect_stdout(sys.stderr))
+        for res in resoudre_lots(args.critere, args.instances, n_jobs=args.n_jobs, threads=args.threads,
+                                 max_en_cours=args.max_en_cours, **options):
+            print(json.dumps(res.en_dict(), indent=args.indent, ensure_ascii=False), file=fichier, flush=True)
+            if res.erreur is not None:
+                code = SORTIE_ERREUR
+            elif not res.optimal:
+                code = max(code, SORTIE_NON_OPTIMALE)
+    return code
+
+
+def _ecrire(donnees, args):
+    texte = json.dumps(donnees, indent=args.indent, ensure_ascii=False)
+    if getattr(args, "sortie", None):
+        with open(args.sortie, "w", encoding="utf-8") as f:
+            f.write(texte + "\n")
+    else:
+        print(texte)
+
+
+def _parser():
+    parser = argparse.ArgumentParser(prog="python -m cli", description="Résolution non interactive des problèmes robustes.")
+    parser.add_argument("--indent", type=int, default=None, help="indentation du JSON (compact par défaut)")
+    commandes = parser.add_subparsers(dest="commande", required=True)
+
+    solve = commandes.add_parser("solve", help="résoudre une instance JSON")
+    solve.add_argument("--instance", required=True,
+                       help="fichier JSON de l'instance ou répertoire d'une instance binaire (instancesBinaires.py)")
+    _arguments_resolution(solve)
+    solve.add_argument("--heuristic", action="store_true",
+                       help="solution heuristique rapide (heuristiques.py), critères de sélection de projets")
+    solve.add_argument("--warm-start", action="store_true",
+                       help="solution heuristique comme solution de départ du programme exact")
+    solve.add_argument("--incumbents", action="store_true",
+                       help="écrire chaque nouvelle meilleure solution (JSON) sur la sortie d'erreur")
+    solve.add_argument("--sortie", default=None, help="fichier JSON du résultat (sortie standard par défaut)")
+
+    lots = commandes.add_parser("batch", help="résoudre un lot d'instances dans un pool de processus")
+    lots.add_argument("--instances", required=True, nargs="+",
+                      help="fichiers JSON ou répertoires d'instances binaires")
+    _arguments_resolution(lots)
+    lots.add_argument("--n-jobs", type=int, default=None, help="nombre de processus (tous les cœurs par défaut)")
+    lots.add_argument("--max-en-cours", type=int, default=None, help="nombre maximal d'instances en cours")
+    lots.add_argument("--sortie", default=None,
+                      help="fichier des résultats, une ligne JSON par instance (sortie standard par défaut)")
+
+    exemple = commandes.add_parser("exemple", help="écrire une instance de myData.py au format JSON")
+    exemple.add_argument("nom", choices=EXEMPLES)
+
+    conversion = commandes.add_parser("convertir", help="convertir une instance JSON au format binaire")
+    conversion.add_argument("source", help="fichier JSON de l'instance")
+    conversion.add_argument("repertoire", help="répertoire de l'instance binaire")
+
+    commandes.add_parser("criteres", help="lister les critères")
+
+    # arguments transmis tels quels à benchmark.py (voir main)
+    commandes.add_parser("benchmark", add_help=False, help="banc d'essai (arguments de benchmark.py)")
+    return parser
+
+
+def _arguments_resolution(parser):
+    """
+    Arguments communs aux commandes solve et batch.
+    """
+    parser.add_argument("--critere", "--criterion", required=True, choices=list(CRITERES))
+    parser.add_argument("--backend", default=None, choices=("gurobi", "highs"),
+                        help="solveur des programmes (par défaut : Gurobi s'il est installé)")
+    parser.add_argument("--formulation", default=None, choices=("standard", "compact"), help="critères OWA")
+    parser.add_argument("--presolve", action="store_true")
+    parser.add_argument("--row-generation", action="store_true", help="critères maxmin et minmax regret")
+    parser.add_argument("--algorithm", default="mip", choices=("mip", "labels", "auto"), help="critères de chemin")
+    parser.add_argument("--max-labels", type=int, default=None, help="critères de chemin")
+    parser.add_argument("--threads", type=int, default=None, help="threads de Gurobi (par instance pour batch)")
+    parser.add_argument("--time-limit", type=float, default=None,
+                        help="limite de temps de la résolution (s), calcul de z* compris")
+    parser.add_argument("--gap", type=float, default=None, help="écart relatif suffisant pour s'arrêter")
+    parser.add_argument("--node-limit", type=int, default=None, help="nombre maximal de nœuds de branchement")
+
+
+def main(argv=None):
+    """
+    Point d'entrée de la ligne de commande ; retourne le code de sortie.
+    """
+    argv = sys.argv[1:] if argv is None else list(argv)
+    if argv[:1] == ["benchmark"]:
+        from benchmark import main as benchmark
+        benchmark(argv[1:])
+        return SORTIE_OPTIMALE
+    args = _parser().parse_args(argv)
+
+    if args.commande == "criteres":
+        _ecrire(list(CRITERES), args)
+        return SORTIE_OPTIMALE
+    if args.commande == "exemple":
+        _ecrire(instance_exemple(args.nom), args)
+        return SORTIE_OPTIMALE
+    if args.commande == "convertir":
+        try:
+            convertir(args.source, args.repertoire)
+        except (OSError, ValueError) as e:
+            _ecrire({"statut": "ERREUR", "erreur": str(e)}, args)
+            return SORTIE_ERREUR
+        return SORTIE_OPTIMALE
+    if args.commande == "batch":
+        try:
+            return resoudre_lot(args)
+        except _erreurs_resolution() as e:
+            _ecrire({"critere": args.critere, "statut": "ERREUR", "erreur": str(e)}, args)
+            return SORTIE_ERREUR
+
+    try:
+        sortie, code = resoudre(args)
+    except _erreurs_resolution() as e:
+        sortie, code = {"critere": args.critere, "statut": "ERREUR", "erreur": str(e)}, SORTIE_ERREUR
+    _ecrire(sortie, args)
+    return code
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,129 @@
+import numpy as np
+
+# topologies disponibles pour generer_graphe
+TOPOLOGIES = ("layered", "grid", "dag", "cyclic")
+
+
+def generer_graphe(nb_noeuds, nb_scenarios, topologie="layered", degre=3, correlation=0.5, seed=None, rng=None):
+    """
+    Générer une instance aléatoire du problème du chemin robuste.
+
+    Paramètres :
+    - nb_noeuds : nombre de sommets souhaité (arrondi à une grille complète pour "grid").
+    - nb_scenarios : nombre de scénarios.
+    - topologie : "layered" (graphe en couches de taille ~ racine de nb_noeuds), "grid"
+      (grille, arcs vers la droite et vers le bas), "dag" (graphe sans circuit aléatoire)
+      ou "cyclic" (graphe aléatoire avec circuits).
+    - degre : nombre moyen d'arcs sortants par sommet.
+    - correlation : entre 0 (seul le temps de base de l'arc est commun aux scénarios) et 1
+      (tous les arcs ralentis ou accélérés ensemble par un facteur commun du scénario).
+    - seed, rng : graine ou numpy.random.Generator (rng est prioritaire).
+
+    Un chemin du sommet de départ au sommet d'arrivée existe toujours.
+    Retourne un dictionnaire {"nodes", "transitions", "start", "end"} au format de myData.py :
+    sommets entiers, start = 0, end = dernier sommet, temps entiers entre 1 et 200.
+    """
+    if topologie not in TOPOLOGIES:
+        raise ValueError(f"Topologie inconnue : {topologie} (attendu : {', '.join(TOPOLOGIES)})")
+    if nb_noeuds < 2:
+        raise ValueError("Le graphe doit contenir au moins deux sommets.")
+    if not 0 <= correlation <= 1:
+        raise ValueError("La corrélation doit être comprise entre 0 et 1.")
+    if rng is None:
+        rng = np.random.default_rng(seed)
+
+    if topologie == "layered":
+        nb_noeuds, arcs = _arcs_couches(rng, nb_noeuds, degre)
+    elif topologie == "grid":
+        nb_noeuds, arcs = _arcs_grille(nb_noeuds)
+    else:
+        arcs = _arcs_aleatoires(rng, nb_noeuds, degre, circuits=topologie == "cyclic")
+
+    temps = _temps_correles(rng, len(arcs), nb_scenarios, correlation)
+    return {
+        "nodes": list(range(nb_noeuds)),
+        "transitions": {arc: tuple(t) for arc, t in zip(arcs, temps.tolist())},
+        "start": 0,
+        "end": nb_noeuds - 1,
+    }
+
+
+def _arcs_couches(rng, nb_noeuds, degre):
+    """
+    Graphe en couches : départ -> couche 1 -> ... -> couche L -> arrivée. Chaque sommet a
+    au plus degre successeurs dans la couche suivante et au moins un prédécesseur dans la
+    couche précédente, donc tout sommet est sur un chemin du départ à l'arrivée.
+    """
+    internes = max(1, nb_noeuds - 2)
+    nb_couches = max(1, int(round(np.sqrt(internes))))
+    couches = np.array_split(np.arange(1, internes + 1), nb_couches)
+    fin = internes + 1
+
+    arcs = set((0, int(v)) for v in couches[0])
+    for avant, apres in zip(couches, couches[1:]):
+        for u in avant:
+            for v in rng.choice(apres, min(degre, len(apres)), replace=False):
+                arcs.add((int(u), int(v)))
+        # compléter les sommets sans prédécesseur
+        atteints = {j for _, j in arcs}
+        for v in apres:
+            if int(v) not in atteints:
+                arcs.add((int(rng.choice(avant)), int(v)))
+    arcs.update((int(u), fin) for u in couches[-1])
+    return fin + 1, sorted(arcs)
+
+
+def _arcs_grille(nb_noeuds):
+    """
+    Grille c x c (c = plus petit entier tel que c² >= nb_noeuds), arcs vers la droite et
+    vers le bas, du coin supérieur gauche (0) au coin inférieur droit (c² - 1).
+    """
+    c = max(2, int(np.ceil(np.sqrt(nb_noeuds))))
+    arcs = []
+    for ligne in range(c):
+        for col in range(c):
+            k = ligne * c + col
+            if col + 1 < c:
+                arcs.append((k, k + 1))
+            if ligne + 1 < c:
+                arcs.append((k, k + c))
+    return c * c, arcs
+
+
+def _arcs_aleatoires(rng, nb_noeuds, degre, circuits):
+    """
+    Graphe aléatoire sur un ordre topologique tiré au hasard : un chemin passant par tous
+    les sommets dans cet ordre (du départ à l'arrivée) assure la connexité, complété par
+    des arcs aléatoires vers l'avant, ou dans les deux sens si circuits est vrai.
+    """
+    ordre = np.concatenate(([0], rng.permutation(np.arange(1, nb_noeuds - 1)), [nb_noeuds - 1])).astype(int)
+    arcs = {(int(ordre[k]), int(ordre[k + 1])) for k in range(nb_noeuds - 1)}
+
+    cible = min(degre * nb_noeuds, nb_noeuds * (nb_noeuds - 1) // (1 if circuits else 2))
+    while len(arcs) < cible:
+        # tirage par blocs pour éviter une boucle Python arc par arc
+        i = rng.integers(0, nb_noeuds, 2 * (cible - len(arcs)))
+        j = rng.integers(0, nb_noeuds, len(i))
+        for a, b in zip(i.tolist(), j.tolist()):
+            if a == b:
+                continue
+            if not circuits:
+                a, b = sorted((a, b))
+                a, b = int(ordre[a]), int(ordre[b])
+            arcs.add((a, b))
+            if len(arcs) >= cible:
+                break
+    return sorted(arcs)
+
+
+def _temps_correles(rng, nb_arcs, nb_scenarios, correlation):
+    """
+    Temps de trajet des arcs dans chaque scénario (tableau nb_arcs x nb_scenarios d'entiers) :
+    temps de base de l'arc multiplié par un mélange d'un facteur commun au scénario
+    (poids correlation) et d'un bruit propre à l'arc et au scénario.
+    """
+    base = rng.integers(10, 101, nb_arcs)[:, None]
+    commun = rng.uniform(0.5, 2.0, nb_scenarios)[None, :]
+    bruit = rng.uniform(0.5, 2.0, (nb_arcs, nb_scenarios))
+    facteur = correlation * commun + (1 - correlation) * bruit
+    return np.clip(np.rint(base * facteur), 1, 200).astype(int)
@@ -0,0 +1,69 @@
+import time
+
+from solveur import GRB, optimiser
+
+# tolérance sur la violation d'une contrainte de scénario
+TOLERANCE = 1e-6
+
+
+def generer_lignes(model, actifs, ajouter_scenario, scenario_le_plus_viole, max_iterations=None, limites=None,
+                   debut=None, nb_scenarios=None):
+    """
+    Génération de contraintes (lignes) par scénario : résoudre le modèle restreint aux
+    scénarios actifs, chercher le scénario le plus violé par la solution courante (évaluation
+    vectorisée sur tous les scénarios), l'ajouter au modèle et recommencer jusqu'à ce
+    qu'aucun scénario ne soit violé. La solution précédente sert de point de départ. La boucle
+    s'arrête aussi si le scénario le plus violé est déjà actif (violation due aux tolérances
+    numériques, qu'un nouvel ajout ne corrigerait pas).
+
+    Paramètres :
+    - model : modèle Gurobi contenant déjà les contraintes des scénarios actifs.
+    - actifs : liste des scénarios déjà dans le modèle (complétée sur place).
+    - ajouter_scenario(i) : ajoute la contrainte du scénario i au modèle.
+    - scenario_le_plus_viole() : indice du scénario le plus violé par la solution courante,
+      None si aucun ne l'est.
+    - max_iterations : nombre maximal de résolutions (None : nb_scenarios, chaque itération
+      ajoutant un nouveau scénario ; pas de limite si nb_scenarios n'est pas donné).
+    - nb_scenarios : nombre total de scénarios.
+    - limites : solveur.Limites de l'appel commencé à debut ; la limite de temps porte sur
+      l'ensemble des résolutions. Le callback n'est pas appelé : les solutions des modèles
+      restreints ne sont pas évaluées sur tous les scénarios.
+
+    Retourne les statistiques {"iterations", "scenarios_actifs", "temps_iterations",
+    "converge"} (converge est faux si max_iterations a arrêté la boucle avant qu'aucun
+    scénario ne soit violé, si le scénario le plus violé est déjà actif, ou si une limite a
+    interrompu une résolution) ; le modèle
+    contient la dernière solution.
+    """
+    variables = model.getVars()
+    if max_iterations is None:
+        max_iterations = nb_scenarios
+    if debut is None:
+        debut = time.perf_counter()
+    temps_iterations = []
+    iterations = 0
+    converge = False
+    while True:
+        debut_iteration = time.perf_counter()
+        optimiser(model, limites, debut)
+        iterations += 1
+        temps_iterations.append(time.perf_counter() - debut_iteration)
+
+        if model.Status != GRB.OPTIMAL:
+            break
+        i = scenario_le_plus_viole()
+        if i is None:
+            converge = True
+            break
+        if i in actifs:
+            break
+        if max_iterations is not None and iterations >= max_iterations:
+            break
+
+        # démarrage à chaud depuis la solution courante
+        model.setAttr("Start", variables, model.getAttr("X", variables))
+        ajouter_scenario(i)
+        actifs.append(i)
+
+    return {"iterations": iterations, "scenarios_actifs": sorted(actifs), "temps_iterations": temps_iterations,
+            "converge": converge}
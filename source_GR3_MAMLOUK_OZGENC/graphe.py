@@ -0,0 +1,189 @@
+from collections.abc import Sequence
+
+import numpy as np
+
+from cacheZStar import empreinte
+
+
+class Graphe:
+    """
+    Représentation indexée d'un graphe orienté avec des temps de trajet par scénario.
+
+    Les sommets sont numérotés de 0 à nb_noeuds - 1 et les arcs de 0 à nb_arcs - 1,
+    dans l'ordre du dictionnaire de transitions. Les listes d'adjacence entrantes et
+    sortantes contiennent des indices d'arcs : la construction des contraintes de flot
+    se fait ainsi en O(|A|), et un même Graphe peut être réutilisé pour plusieurs
+    résolutions sur le même graphe.
+
+    Attributs :
+    - noeuds : liste des sommets (étiquettes d'origine).
+    - index : dictionnaire {sommet: indice entier}.
+    - arcs : liste des arcs (i, j) dans l'ordre des indices.
+    - couts : liste des temps de trajet (t_s1, t_s2, ...) de chaque arc.
+    - queue, tete : indices entiers des extrémités de chaque arc.
+    - sortants, entrants : pour chaque sommet, indices des arcs sortants / entrants.
+
+    Un Graphe construit par depuis_tableaux (grands graphes, instances binaires de
+    instancesBinaires.py) garde ses données dans des tableaux NumPy : queue et tete sont
+    des tableaux d'entiers, couts une vue (arcs x scénarios) de la matrice des temps, sans
+    copie d'un tableau projeté en mémoire, arcs une séquence calculée à la demande et
+    sortants, entrants des listes d'adjacence compressées (CSR).
+    """
+
+    def __init__(self, nodes, transitions):
+        # sommets dans l'ordre donné, complétés par ceux qui n'apparaissent que dans les arcs
+        self.noeuds = list(nodes)
+        self.index = {v: k for k, v in enumerate(self.noeuds)}
+        for i, j in transitions:
+            for v in (i, j):
+                if v not in self.index:
+                    self.index[v] = len(self.noeuds)
+                    self.noeuds.append(v)
+
+        self.arcs = list(transitions.keys())
+        self.couts = list(transitions.values())
+        self.queue = [self.index[i] for i, _ in self.arcs]
+        self.tete = [self.index[j] for _, j in self.arcs]
+
+        self.sortants = [[] for _ in self.noeuds]
+        self.entrants = [[] for _ in self.noeuds]
+        for a in range(len(self.arcs)):
+            self.sortants[self.queue[a]].append(a)
+            self.entrants[self.tete[a]].append(a)
+
+        self._empreinte = None
+
+    @classmethod
+    def depuis_tableaux(cls, queue, tete, temps, noeuds=None, nb_noeuds=None, sortants=None, entrants=None):
+        """
+        Construire un Graphe à partir de tableaux : queue et tete (indices entiers des
+        extrémités de chaque arc), temps (matrice scénarios x arcs, éventuellement projetée
+        en mémoire par numpy.memmap). noeuds : étiquettes des sommets (par défaut, les
+        entiers 0 à n - 1, n = nb_noeuds ou plus grand indice + 1). sortants, entrants :
+        listes d'adjacence compressées (ordre, debut) déjà calculées, sinon calculées au
+        premier accès.
+        """
+        g = cls.__new__(cls)
+        g.queue = np.asarray(queue)
+        g.tete = np.asarray(tete)
+        temps = np.asarray(temps)
+        if temps.ndim != 2 or temps.shape[1] != len(g.queue) or len(g.tete) != len(g.queue):
+            raise ValueError("queue, tete et temps (scénarios x arcs) doivent avoir un arc par colonne.")
+        if noeuds is None:
+            if nb_noeuds is None:
+                nb_noeuds = int(max(g.queue.max(), g.tete.max())) + 1 if len(g.queue) else 0
+            # range(n)[v] == v : les entiers servent d'index sans dictionnaire
+            g.noeuds = g.index = range(nb_noeuds)
+        else:
+            g.noeuds = list(noeuds)
+            g.index = {v: k for k, v in enumerate(g.noeuds)}
+        g.couts = temps.T
+        g.arcs = _Arcs(g.noeuds, g.queue, g.tete)
+        g.sortants = _Adjacence(g.queue, len(g.noeuds), *(sortants or ()))
+        g.entrants = _Adjacence(g.tete, len(g.noeuds), *(entrants or ()))
+        g._empreinte = None
+        return g
+
+    @property
+    def tableaux(self):
+        """
+        Vrai si le Graphe a été construit par depuis_tableaux.
+        """
+        return isinstance(self.couts, np.ndarray)
+
+    @property
+    def nb_noeuds(self):
+        return len(self.noeuds)
+
+    @property
+    def nb_arcs(self):
+        return len(self.arcs)
+
+    def empreinte(self):
+        """
+        Empreinte des sommets, des arcs et des temps de trajet (clé du cache de z*), calculée
+        une seule fois par Graphe.
+        """
+        if self._empreinte is None:
+            if self.tableaux:
+                self._empreinte = empreinte(self.noeuds, self.queue, self.tete, self.couts)
+            else:
+                self._empreinte = empreinte(self.noeuds, self.arcs, self.couts)
+        return self._empreinte
+
+    def couts_scenario(self, scenario):
+        """
+        Retourner la liste des temps de trajet des arcs pour un scénario donné.
+        """
+        if self.tableaux:
+            return self.couts[:, scenario].tolist()
+        return [costs[scenario] for costs in self.couts]
+
+
+def graphe(nodes, transitions, graph=None):
+    """
+    Retourner graph s'il est fourni, sinon construire le Graphe de (nodes, transitions).
+    """
+    if graph is not None:
+        return graph
+    return Graphe(nodes, transitions)
+
+
+class _Arcs(Sequence):
+    """
+    Arcs (i, j) d'un Graphe construit par depuis_tableaux, calculés à la demande à partir
+    des tableaux queue et tete.
+    """
+
+    def __init__(self, noeuds, queue, tete):
+        self.noeuds = noeuds
+        self.queue = queue
+        self.tete = tete
+
+    def __len__(self):
+        return len(self.queue)
+
+    def __getitem__(self, a):
+        if isinstance(a, slice):
+            return [self[k] for k in range(*a.indices(len(self)))]
+        return self.noeuds[self.queue[a]], self.noeuds[self.tete[a]]
+
+    def __iter__(self):
+        noeuds = self.noeuds
+        return ((noeuds[i], noeuds[j]) for i, j in zip(self.queue.tolist(), self.tete.tolist()))
+
+
+class _Adjacence(Sequence):
+    """
+    Listes d'adjacence compressées : pour chaque sommet v, indices des arcs dont
+    l'extrémité (queue ou tete) est v, dans l'ordre des arcs : ordre[debut[v]:debut[v + 1]].
+    Sans (ordre, debut) fournis, ils sont calculés au premier accès.
+    """
+
+    def __init__(self, extremites, nb_noeuds, ordre=None, debut=None):
+        self.extremites = extremites
+        self.nb_noeuds = nb_noeuds
+        # np.asarray : vue ndarray d'un numpy.memmap (indexation plus rapide, sans copie)
+        self._ordre = None if ordre is None else np.asarray(ordre)
+        self._debut = None if debut is None else np.asarray(debut)
+
+    @property
+    def ordre(self):
+        if self._ordre is None:
+            self._ordre = np.argsort(self.extremites, kind="stable")
+        return self._ordre
+
+    @property
+    def debut(self):
+        if self._debut is None:
+            self._debut = np.zeros(self.nb_noeuds + 1, dtype=np.int64)
+            np.cumsum(np.bincount(self.extremites, minlength=self.nb_noeuds), out=self._debut[1:])
+        return self._debut
+
+    def __len__(self):
+        return self.nb_noeuds
+
+    def __getitem__(self, v):
+        if isinstance(v, slice):
+            return [self[k] for k in range(*v.indices(len(self)))]
+        return self.ordre[self.debut[v]:self.debut[v + 1]].tolist()
@@ -0,0 +1,306 @@
+"""
+Heuristiques rapides pour les grandes instances de sélection de projets (maxmin,
+minmaxRegret, maxOWA et minOWA), lorsque les programmes exacts sont trop lents.
+
+1. Relaxation linéaire du modèle du critère (x_j dans [0, 1], programmeLineaire.py) : sa
+   valeur est une borne de l'optimum (supérieure pour maxmin et maxOWA, inférieure pour
+   minmaxRegret et minOWA) et sa solution fixe l'ordre d'arrondi.
+2. Arrondi et réparation gloutonne : projets pris par valeur fractionnaire décroissante
+   (puis efficacité utilité moyenne / coût) tant que le budget le permet.
+3. Recherche locale : à chaque itération, meilleur mouvement améliorant parmi les ajouts
+   de projets et les échanges (un projet retiré, un projet ajouté) entre les candidats les
+   plus prometteurs ; les valeurs de tous les scénarios de tous les mouvements sont
+   obtenues par une seule opération matricielle.
+
+Pour les critères de regret, z* n'est pas calculé exactement par défaut (un programme
+par scénario) : il est encadré par utils.z_star_bornes. La relaxation linéaire utilise la
+borne inférieure (sa valeur reste une borne inférieure de l'optimum) et la solution est
+évaluée avec la borne supérieure : l'objectif est alors un majorant du regret de la
+solution.
+
+La solution sert aussi de solution de départ des programmes exacts (argument depart de
+maxmin, minmaxRegret, maxOWA et minOWA).
+
+Utilisation :
+    res = heuristique("maxmin", nb_projects, nb_scenarios, costs, utilities, budget)
+    res.x, res.objectif, res.borne, res.gap
+    maxmin(nb_projects, nb_scenarios, costs, utilities, budget, depart=res.x)
+"""
+import time
+
+import numpy as np
+
+import utils as ut
+from programmeLineaire import ProgrammeLineaire, ajouter_owa
+from resultats import Resultat, afficher_resultat
+from solveur import choisir_backend, ecart
+
+# critères traités
+CRITERES = ("maxmin", "minmaxRegret", "maxOWA", "minOWA")
+
+# nombre de candidats au retrait et à l'ajout des échanges de la recherche locale
+CANDIDATS = 64
+
+# amélioration minimale d'un mouvement
+TOLERANCE = 1e-9
+
+
+def valeur_robuste(critere, valeurs, z_star=None, weights=None):
+    """
+    Valeur du critère pour des utilités par scénario valeurs (tableau ... x n, calcul
+    vectorisé sur les premières dimensions) :
+    - maxmin : utilité minimale ;
+    - minmaxRegret : regret maximal z*_i - z_i ;
+    - maxOWA : ∑_k w_k z_(k) (poids décroissants, utilités croissantes) ;
+    - minOWA : valeur du modèle de minOWA.py, dont les contraintes r_k - b_ik >= r_i imposent
+      r_k >= regret maximal, soit (∑_k w_k) x regret maximal.
+    """
+    valeurs = np.asarray(valeurs, dtype=float)
+    if critere == "maxmin":
+        return valeurs.min(axis=-1)
+    if critere == "maxOWA":
+        return np.sort(valeurs, axis=-1) @ np.sort(np.asarray(weights, dtype=float))[::-1]
+    regrets = np.asarray(z_star, dtype=float) - valeurs
+    if critere == "minmaxRegret":
+        return regrets.max(axis=-1)
+    return regrets.max(axis=-1) * float(np.sum(weights))
+
+
+def _score(critere, valeurs, z_star, weights):
+    """
+    Valeur du critère à maximiser (opposée pour les critères de regret).
+    """
+    valeur = valeur_robuste(critere, valeurs, z_star, weights)
+    return valeur if critere in ("maxmin", "maxOWA") else -valeur
+
+
+def relaxation_lineaire(critere, c, u, budget, z_star=None, weights=None, backend="highs", ctx=None):
+    """
+    Résoudre la relaxation linéaire du critère (formulation compacte pour les OWA).
+    Retourne (x fractionnaire, valeur de la relaxation), (None, None) sans solution.
+    """
+    n, p = u.shape
+    pl = ProgrammeLineaire(f"{critere}_relaxation", maximiser=critere in ("maxmin", "maxOWA"))
+    x = pl.variables(p, ub=1.0)
+    pl.contraintes([(c, x)], haut=budget)
+    if critere in ("maxmin", "minmaxRegret"):
+        t = pl.variables(1, lb=-np.inf, obj=1.0)
+        if critere == "maxmin":
+            # t <= z_i(x)
+            pl.contraintes([(np.ones((n, 1)), t), (-u, x)], haut=0.0)
+        else:
+            # t >= z*_i - z_i(x)
+            pl.contraintes([(np.ones((n, 1)), t), (u, x)], bas=np.asarray(z_star, dtype=float))
+    else:
+        w_prime = _poids_transformes(weights)
+        if critere == "maxOWA":
+            ajouter_owa(pl, [(u, x)], n, w_prime, "compact")
+        else:
+            ajouter_owa(pl, [(-u, x)], n, w_prime, "compact", regrets=True, constante=z_star)
+
+    sol = pl.resoudre(backend, ctx)
+    if sol.valeurs is None:
+        return None, None
+    return np.clip(sol.valeurs[x], 0.0, 1.0), sol.objectif
+
+
+def _poids_transformes(weights):
+    """
+    Poids w'_k = w_k - w_{k+1} (poids triés en ordre décroissant), w'_n = w_n.
+    """
+    w = np.sort(np.asarray(weights, dtype=float))[::-1]
+    return np.append(w[:-1] - w[1:], w[-1])
+
+
+def arrondi_glouton(c, budget, ordre):
+    """
+    Sélection gloutonne : projets pris dans l'ordre donné tant que le budget le permet (le
+    plus long préfixe réalisable d'un coup, puis chaque projet restant qui tient encore dans
+    le budget). Retourne le vecteur de sélection 0/1.
+    """
+    x = np.zeros(len(c), dtype=int)
+    cumul = np.cumsum(c[ordre])
+    prefixe = int(np.searchsorted(cumul, budget, side="right"))
+    x[ordre[:prefixe]] = 1
+    reste = budget - (cumul[prefixe - 1] if prefixe else 0.0)
+    suite = ordre[prefixe:]
+    while len(suite):
+        possibles = np.flatnonzero(c[suite] <= reste)
+        if len(possibles) == 0:
+            break
+        j = suite[possibles[0]]
+        x[j] = 1
+        reste -= c[j]
+        suite = suite[possibles[0] + 1:]
+    return x
+
+
+def _poids_scenarios(critere, valeurs, z_star, weights):
+    """
+    Importance de chaque scénario pour la solution courante (sous-gradient du score) :
+    scénario critique pour maxmin, minmaxRegret et minOWA, poids OWA selon le rang (w_1 sur
+    l'utilité la plus faible) pour maxOWA.
+    """
+    n = len(valeurs)
+    g = np.zeros(n)
+    if critere == "maxmin":
+        g[np.argmin(valeurs)] = 1.0
+    elif critere == "maxOWA":
+        g[np.argsort(valeurs)] = np.sort(np.asarray(weights, dtype=float))[::-1]
+    else:
+        g[np.argmax(np.asarray(z_star) - valeurs)] = 1.0
+    return g
+
+
+def recherche_locale(critere, c, u, budget, x, z_star=None, weights=None, max_iterations=1000,
+                     candidats=CANDIDATS):
+    """
+    Améliorer la sélection x (0/1) par ajouts et échanges, meilleur mouvement d'abord,
+    jusqu'à ce qu'aucun mouvement n'améliore le critère ou max_iterations ; à valeur égale
+    du critère, un mouvement qui augmente l'utilité totale ∑_i z_i est accepté (sortie des
+    plateaux de maxmin et des critères de regret). Les échanges
+    portent sur les candidats projets sélectionnés de plus faible contribution par unité de
+    coût et non sélectionnés de plus forte contribution (contributions pondérées par
+    _poids_scenarios). Retourne (x, nombre d'itérations).
+    """
+    # utilités par projet (p x n) : colonnes[j] = u[:, j]
+    colonnes = np.ascontiguousarray(u.T)
+    x = np.asarray(x, dtype=int).copy()
+    valeurs = u @ x
+    cout = float(c @ x)
+    courant = _score(critere, valeurs, z_star, weights), valeurs.sum()
+    couts = np.maximum(c, 1e-12)
+
+    iterations = 0
+    while iterations < max_iterations:
+        iterations += 1
+        meilleur, mouvement = courant, None
+
+        # ajouts : tous les projets non sélectionnés qui tiennent dans le budget
+        ajouts = np.flatnonzero((x == 0) & (c <= budget - cout))
+        if len(ajouts):
+            nouvelles = valeurs + colonnes[ajouts]
+            k, cle = _meilleur_mouvement(_score(critere, nouvelles, z_star, weights), nouvelles.sum(axis=-1), meilleur)
+            if k is not None:
+                meilleur, mouvement = cle, (None, ajouts[k])
+
+        # échanges entre candidats (retrait i, ajout j) : tenseur candidats x candidats x scénarios
+        selection, hors = np.flatnonzero(x == 1), np.flatnonzero(x == 0)
+        if len(selection) and len(hors):
+            contribution = (u.T @ _poids_scenarios(critere, valeurs, z_star, weights)) / couts
+            retraits = selection[np.argsort(contribution[selection])[:candidats]]
+            entrees = hors[np.argsort(-contribution[hors])[:candidats]]
+            tenseur = valeurs - colonnes[retraits][:, None, :] + colonnes[entrees][None, :, :]
+            realisable = cout - c[retraits][:, None] + c[entrees][None, :] <= budget + TOLERANCE
+            scores = np.where(realisable, _score(critere, tenseur, z_star, weights), -np.inf)
+            k, cle = _meilleur_mouvement(scores.ravel(), tenseur.sum(axis=-1).ravel(), meilleur)
+            if k is not None:
+                a, b = np.unravel_index(k, scores.shape)
+                meilleur, mouvement = cle, (retraits[a], entrees[b])
+
+        if mouvement is None:
+            break
+        retrait, entree = mouvement
+        if retrait is not None:
+            x[retrait] = 0
+            valeurs = valeurs - colonnes[retrait]
+            cout -= c[retrait]
+        x[entree] = 1
+        valeurs = valeurs + colonnes[entree]
+        cout += c[entree]
+        courant = meilleur
+    return x, iterations
+
+
+def _meilleur_mouvement(scores, totaux, reference):
+    """
+    Indice du meilleur mouvement (plus grand score, puis plus grande utilité totale) et sa
+    clé (score, total), s'il améliore reference ; (None, None) sinon.
+    """
+    maximum = scores.max()
+    if maximum == -np.inf:
+        return None, None
+    egaux = np.flatnonzero(scores >= maximum - TOLERANCE)
+    k = int(egaux[np.argmax(totaux[egaux])])
+    score, total = reference
+    if scores[k] > score + TOLERANCE or (scores[k] >= score - TOLERANCE and totaux[k] > total + TOLERANCE):
+        return k, (scores[k], totaux[k])
+    return None, None
+
+
+def heuristique(critere, nb_projects, nb_scenarios, costs, utilities, budget, weights=None, z_star=None,
+                relaxation=True, max_iterations=1000, candidats=CANDIDATS, backend=None, ctx=None, cache=True,
+                z_star_exact=False, engine="auto", n_jobs=1, verbose=False):
+    """
+    Solution réalisable rapide du critère (maxmin, minmaxRegret, maxOWA ou minOWA) par
+    arrondi de la relaxation linéaire, réparation gloutonne et recherche locale.
+
+    weights : poids OWA (maxOWA, minOWA).
+    z_star : valeurs z*_i des critères de regret ; None : encadrées par utils.z_star_bornes
+    (l'objectif et res.regrets sont alors des majorants des regrets, voir le module), ou calculées
+    par utils.z_star (cache, backend, engine, n_jobs) si z_star_exact est vrai. Le calcul
+    exact est l'étape la plus longue pour les grandes instances.
+    relaxation : False pour ne pas résoudre la relaxation linéaire (pas de borne, ordre
+    d'arrondi par efficacité utilité moyenne / coût).
+    max_iterations, candidats : limites de la recherche locale (voir recherche_locale).
+    backend, ctx : solveur de la relaxation linéaire (voir programmeLineaire.py).
+
+    Retourne un Resultat de statut "HEURISTIQUE" ("OPTIMAL" si la solution atteint la borne
+    de la relaxation), avec la borne de la relaxation dans res.borne et l'écart relatif dans
+    res.gap ; res.infos contient la solution fractionnaire ("x_lp"), le nombre d'itérations
+    de la recherche locale, les temps des étapes et, si z* est encadré, ses bornes
+    ("z_star_inf", "z_star_sup").
+    """
+    if critere not in CRITERES:
+        raise ValueError(f"Critère inconnu : {critere} (attendu : {', '.join(CRITERES)})")
+    if critere in ("maxOWA", "minOWA") and weights is None:
+        raise ValueError(f"Le critère {critere} requiert des poids (weights).")
+    backend = choisir_backend(backend)
+
+    debut = time.perf_counter()
+    c, u = ut.en_matrices(nb_projects, nb_scenarios, costs, utilities)
+    infos = {"backend": backend}
+    if weights is not None:
+        infos["w_prime"] = _poids_transformes(weights).tolist()
+    # z* de la relaxation (borne inférieure de l'optimum) et de l'évaluation des solutions
+    z_relaxation = z_star
+    if critere in ("minmaxRegret", "minOWA") and z_star is None:
+        if z_star_exact:
+            z_star, infos["x_star"] = ut.z_star(nb_projects, nb_scenarios, costs, utilities, budget, engine=engine,
+                                                n_jobs=n_jobs, ctx=ctx, cache=cache, backend=backend)
+            z_relaxation = z_star
+        else:
+            z_relaxation, z_star = ut.z_star_bornes(nb_projects, nb_scenarios, costs, utilities, budget)
+            infos["z_star_inf"], infos["z_star_sup"] = z_relaxation.tolist(), z_star.tolist()
+        infos["temps_z_star"] = time.perf_counter() - debut
+
+    # 1. relaxation linéaire
+    debut_relaxation = time.perf_counter()
+    efficacite = u.mean(axis=0) / np.maximum(c, 1e-12)
+    x_lp, borne = None, None
+    if relaxation:
+        x_lp, borne = relaxation_lineaire(critere, c, u, budget, z_relaxation, weights, backend, ctx)
+    infos["x_lp"] = x_lp
+    infos["temps_relaxation"] = time.perf_counter() - debut_relaxation
+
+    # 2. arrondi et réparation gloutonne, 3. recherche locale
+    debut_recherche = time.perf_counter()
+    ordre = np.lexsort((-efficacite, -np.round(x_lp, 6))) if x_lp is not None else np.argsort(-efficacite)
+    x = arrondi_glouton(c, budget, ordre)
+    x, infos["iterations"] = recherche_locale(critere, c, u, budget, x, z_star, weights, max_iterations, candidats)
+    infos["temps_recherche"] = time.perf_counter() - debut_recherche
+
+    z_exact = z_star is not None and "z_star_sup" not in infos
+    res = Resultat(critere, "HEURISTIQUE", x=x, valeurs=u @ x, z_star=list(z_star) if z_exact else None,
+                   temps_construction=debut_relaxation - debut, temps_resolution=time.perf_counter() - debut_relaxation,
+                   infos=infos, borne=borne)
+    res.objectif = float(valeur_robuste(critere, res.valeurs, z_star, weights))
+    if z_star is not None:
+        res.regrets = np.asarray(z_star, dtype=float) - res.valeurs
+    res.gap = ecart(res.objectif, borne)
+    if res.gap is not None and res.gap <= TOLERANCE:
+        res.statut = "OPTIMAL"
+
+    if verbose:
+        afficher_resultat(res)
+    return res
@@ -0,0 +1,147 @@
+"""
+Format binaire des instances, chargé par projection en mémoire (numpy.memmap).
+
+Une instance est un répertoire :
+- instance.json : type ("sac" ou "chemin"), version du format et paramètres scalaires
+  (budget ; départ, arrivée, nombre de sommets et étiquettes des sommets s'ils ne sont
+  pas les entiers 0 à n - 1) et poids OWA éventuels ;
+- sélection de projets : costs.npy (vecteur des coûts, p) et utilities.npy (matrice
+  scénarios x projets) ;
+- chemin robuste : queue.npy et tete.npy (indices des extrémités de chaque arc), temps.npy
+  (matrice scénarios x arcs) et les listes d'adjacence compressées du Graphe
+  (sortants_ordre.npy, sortants_debut.npy, entrants_ordre.npy, entrants_debut.npy), qui ne
+  sont donc pas recalculées au chargement.
+
+Les tableaux sont des fichiers .npy ouverts avec mmap_mode="r" : le chargement ne lit que
+les en-têtes, les pages sont lues à la demande et partagées (cache du système) entre les
+processus qui ouvrent la même instance. Dans un pool de processus, transmettre le
+répertoire et charger l'instance dans chaque worker plutôt que de sérialiser les tableaux.
+
+Les convertisseurs ecrire_instance_sac et ecrire_instance_chemin acceptent les formes de
+myData.py (listes, dictionnaire de transitions) comme des tableaux NumPy.
+"""
+import json
+import os
+
+import numpy as np
+
+from graphe import Graphe
+
+# version du format (champ "version" de instance.json)
+VERSION = 1
+
+_META = "instance.json"
+
+
+def ecrire_instance_sac(repertoire, costs, utilities, budget, weights=None):
+    """
+    Écrire une instance de sélection de projets (coûts p, utilités n x p, budget, poids OWA).
+    """
+    costs = np.asarray(costs)
+    utilities = np.atleast_2d(np.asarray(utilities))
+    if utilities.shape[1] != len(costs):
+        raise ValueError("La matrice des utilités doit avoir une colonne par projet.")
+    os.makedirs(repertoire, exist_ok=True)
+    np.save(os.path.join(repertoire, "costs.npy"), costs)
+    np.save(os.path.join(repertoire, "utilities.npy"), np.ascontiguousarray(utilities))
+    _ecrire_meta(repertoire, {"type": "sac", "budget": _scalaire(budget), "weights": _liste(weights)})
+
+
+def ecrire_instance_chemin(repertoire, nodes, transitions, start, end, weights=None):
+    """
+    Écrire une instance de chemin robuste donnée au format de myData.py (sommets,
+    dictionnaire {(i, j): (t_1, ..., t_n)}).
+    """
+    graph = Graphe(nodes, transitions)
+    # sans arc, le nombre de scénarios est celui des poids (1 par défaut)
+    scenarios = -1 if graph.nb_arcs else (len(weights) if weights is not None else 1)
+    temps = np.asarray(graph.couts).reshape(graph.nb_arcs, scenarios).T
+    ecrire_graphe(repertoire, graph.queue, graph.tete, temps, graph.index[start], graph.index[end],
+                  noeuds=graph.noeuds, weights=weights)
+
+
+def ecrire_graphe(repertoire, queue, tete, temps, start, end, noeuds=None, weights=None):
+    """
+    Écrire une instance de chemin robuste donnée par tableaux : queue et tete (indices des
+    extrémités des arcs), temps (scénarios x arcs), start et end (indices des sommets),
+    noeuds (étiquettes des sommets, None pour les entiers 0 à n - 1).
+    """
+    queue, tete = np.asarray(queue), np.asarray(tete)
+    if len(queue) == 0:
+        # np.asarray([]) est un tableau de flottants
+        queue, tete = queue.astype(np.int64), tete.astype(np.int64)
+    temps = np.atleast_2d(np.asarray(temps))
+    if temps.shape[1] != len(queue) or len(tete) != len(queue):
+        raise ValueError("queue, tete et temps (scénarios x arcs) doivent avoir un arc par colonne.")
+    if noeuds is not None:
+        nb_noeuds = len(noeuds)
+    else:
+        # graphe sans arc : seuls le départ et l'arrivée fixent le nombre de sommets
+        extremites = [start, end] + ([queue.max(), tete.max()] if len(queue) else [])
+        nb_noeuds = int(max(extremites)) + 1
+    indices = np.int32 if max(nb_noeuds, len(queue)) < 2 ** 31 else np.int64
+    graph = Graphe.depuis_tableaux(queue, tete, temps, nb_noeuds=nb_noeuds)
+
+    meta = {"type": "chemin", "nb_noeuds": nb_noeuds, "start": int(start), "end": int(end),
+            "weights": _liste(weights)}
+    if noeuds is not None and list(noeuds) != list(range(nb_noeuds)):
+        meta["noeuds"] = list(noeuds)
+    os.makedirs(repertoire, exist_ok=True)
+    np.save(os.path.join(repertoire, "queue.npy"), queue.astype(indices))
+    np.save(os.path.join(repertoire, "tete.npy"), tete.astype(indices))
+    np.save(os.path.join(repertoire, "temps.npy"), np.ascontiguousarray(temps))
+    for nom, adjacence in (("sortants", graph.sortants), ("entrants", graph.entrants)):
+        np.save(os.path.join(repertoire, f"{nom}_ordre.npy"), adjacence.ordre.astype(indices))
+        np.save(os.path.join(repertoire, f"{nom}_debut.npy"), adjacence.debut)
+    _ecrire_meta(repertoire, meta)
+
+
+def charger_instance(repertoire, mmap=True):
+    """
+    Charger une instance binaire (mmap=False : lire les tableaux en mémoire).
+
+    Retourne un dictionnaire :
+    - sélection de projets : {"type", "nb_projects", "nb_scenarios", "costs", "utilities",
+      "budget", "weights"}, arguments de maxmin, minmaxRegret, maxOWA et minOWA ;
+    - chemin robuste : {"type", "graph", "nodes", "start", "end", "scenarios", "weights"},
+      graph étant un Graphe construit par Graphe.depuis_tableaux, à passer aux fonctions
+      de cheminRobuste.py (nodes et transitions None) ; start et end sont les étiquettes
+      des sommets.
+    """
+    with open(os.path.join(repertoire, _META), encoding="utf-8") as f:
+        meta = json.load(f)
+    if meta.get("version", VERSION) > VERSION:
+        raise ValueError(f"Version du format non prise en charge : {meta['version']} (attendu : {VERSION})")
+    mode = "r" if mmap else None
+
+    def tableau(nom):
+        return np.load(os.path.join(repertoire, nom), mmap_mode=mode)
+
+    if meta["type"] == "sac":
+        costs, utilities = tableau("costs.npy"), tableau("utilities.npy")
+        return {"type": "sac", "nb_projects": len(costs), "nb_scenarios": utilities.shape[0], "costs": costs,
+                "utilities": utilities, "budget": meta["budget"], "weights": meta.get("weights")}
+    if meta["type"] != "chemin":
+        raise ValueError(f"Type d'instance inconnu : {meta['type']} (attendu : sac, chemin)")
+
+    temps = tableau("temps.npy")
+    graph = Graphe.depuis_tableaux(tableau("queue.npy"), tableau("tete.npy"), temps, noeuds=meta.get("noeuds"),
+                                   nb_noeuds=meta["nb_noeuds"],
+                                   sortants=(tableau("sortants_ordre.npy"), tableau("sortants_debut.npy")),
+                                   entrants=(tableau("entrants_ordre.npy"), tableau("entrants_debut.npy")))
+    return {"type": "chemin", "graph": graph, "nodes": graph.noeuds, "start": graph.noeuds[meta["start"]],
+            "end": graph.noeuds[meta["end"]], "scenarios": temps.shape[0], "weights": meta.get("weights")}
+
+
+def _ecrire_meta(repertoire, meta):
+    meta = dict(meta, version=VERSION)
+    with open(os.path.join(repertoire, _META), "w", encoding="utf-8") as f:
+        json.dump(meta, f, ensure_ascii=False)
+
+
+def _scalaire(v):
+    return v.item() if hasattr(v, "item") else v
+
+
+def _liste(v):
+    return None if v is None else [_scalaire(e) for e in v]
@@ -1,10 +1,4 @@
-from maxmin import maxmin
-from minmaxRegret import minmaxRegret
-from utils import calcul_tps_resol
-from maxOWA import maxOWA
-from minOWA import minOWA
-from cheminPlusRapide import chemin_plus_rapide
-from cheminRobuste import robust_shortest_path_maxmin, robust_shortest_path_minmax_regret, robust_shortest_path_maxOWA, robust_shortest_path_minOWA
+import sys
 from myData import *
 
 def main():
@@ -24,9 +18,20 @@ def main():
     print("12. Chemin robuste (MinMax Regret)")
     print("13. Chemin robuste (MaxOWA)")
     print("14. Chemin robuste (MinOWA)")
+    print("15. Chemins robustes : Calculer le temps de résolution sur des graphes aléatoires")
 
     # Demander à l'utilisateur de choisir un problème
-    choix = input("Entrez le numéro de votre choix (1-14) : ")
+    choix = input("Entrez le numéro de votre choix (1-15) : ")
+
+    # imports des solveurs différés : le menu s'affiche sans attendre gurobipy et NumPy
+    from maxmin import maxmin
+    from minmaxRegret import minmaxRegret
+    from utils import calcul_tps_resol
+    from maxOWA import maxOWA
+    from minOWA import minOWA
+    from cheminPlusRapide import chemin_plus_rapide
+    from cheminRobuste import robust_shortest_path_maxmin, robust_shortest_path_minmax_regret, robust_shortest_path_maxOWA, robust_shortest_path_minOWA
+    from cheminRobuste import robust_shortest_path_maxOWA_sweep, robust_shortest_path_minOWA_sweep
 
     # Vérifier le choix et appeler la fonction correspondante
     if choix == "1":
@@ -83,26 +88,44 @@ def main():
         print(f"Regret maximal sur le chemin : {max_regret}")
     elif choix == "13":
         print("Test Chemin robuste (MaxOWA) :")
-        for k in [2, 4, 8, 16]:
-            w = [k, 1]
-            print(f"\nRésultats pour k = {k}:")
-            robust_shortest_path_maxOWA(nodes1, transitions1, start1, end1, 2, w)
-        for k in [2, 4, 8, 16]:
-            w = [k, 1]
-            print(f"\nRésultats pour k = {k}:")
-            robust_shortest_path_maxOWA(nodes2, transitions2, start2, end2, 2, w)
+        # un seul modèle par instance, seuls les poids changent d'une résolution à l'autre
+        for w, path, valeur in robust_shortest_path_maxOWA_sweep(nodes1, transitions1, start1, end1, 2,
+                                                                  [[k, 1] for k in [2, 4, 8, 16]]):
+            print(f"\nRésultats pour k = {w[0]}:")
+            print(f"Chemin sélectionné: {path}")
+            print(f"Valeur de la fonction objectif: {valeur}")
+        # un seul modèle par instance, seuls les poids changent d'une résolution à l'autre
+        for w, path, valeur in robust_shortest_path_maxOWA_sweep(nodes2, transitions2, start2, end2, 2,
+                                                                  [[k, 1] for k in [2, 4, 8, 16]]):
+            print(f"\nRésultats pour k = {w[0]}:")
+            print(f"Chemin sélectionné: {path}")
+            print(f"Valeur de la fonction objectif: {valeur}")
     elif choix == "14":
         print("Test Chemin robuste (MinOWA) :")
-        for k in [2, 4, 8, 16]:
-            w = [k, 1]
-            print(f"\nRésultats pour k = {k}:")
-            robust_shortest_path_minOWA(nodes1, transitions1, start1, end1, 2, w)
-        for k in [2, 4, 8, 16]:
-            w = [k, 1]
-            print(f"\nRésultats pour k = {k}:")
-            robust_shortest_path_minOWA(nodes2, transitions2, start2, end2, 2, w)
+        # un seul modèle par instance, seuls les poids changent d'une résolution à l'autre
+        for w, path, valeur in robust_shortest_path_minOWA_sweep(nodes1, transitions1, start1, end1, 2,
+                                                                  [[k, 1] for k in [2, 4, 8, 16]]):
+            print(f"\nRésultats pour k = {w[0]}:")
+            print(f"Chemin sélectionné: {path}")
+            print(f"Valeur de la fonction objectif: {valeur}")
+        # un seul modèle par instance, seuls les poids changent d'une résolution à l'autre
+        for w, path, valeur in robust_shortest_path_minOWA_sweep(nodes2, transitions2, start2, end2, 2,
+                                                                  [[k, 1] for k in [2, 4, 8, 16]]):
+            print(f"\nRésultats pour k = {w[0]}:")
+            print(f"Chemin sélectionné: {path}")
+            print(f"Valeur de la fonction objectif: {valeur}")
+    elif choix == "15":
+        for func in [robust_shortest_path_maxmin, robust_shortest_path_minmax_regret,
+                     robust_shortest_path_maxOWA, robust_shortest_path_minOWA]:
+            print(f"{func.__name__} (graphes {topologie_chemins}) :")
+            calcul_tps_resol(func, n_values_chemins, nb_noeuds_values, nb_instances,
+                             generation={"topologie": topologie_chemins})
     else:
-        print("Choix invalide ! Veuillez entrer un numéro entre 1 et 14.")
+        print("Choix invalide ! Veuillez entrer un numéro entre 1 et 15.")
 
 if __name__ == "__main__":
+    # avec des arguments (python main.py solve ...), ligne de commande non interactive de cli.py
+    if len(sys.argv) > 1:
+        from cli import main as cli
+        sys.exit(cli())
     main()
@@ -1,9 +1,47 @@
-from gurobipy import Model, GRB, quicksum
+import time
+import numpy as np
+import utils as ut
+from solveur import GRB, borne_gurobi, choisir_backend, nouveau_modele, optimiser, statut_gurobi
+from programmeLineaire import ProgrammeLineaire, ajouter_owa
+from pretraitement import resoudre_pretraite
+from resultats import Resultat, afficher_resultat
 
-def maxOWA(nb_projects, nb_scenarios, costs, utilities, budget, weights, verbose=True):
+# formulations disponibles pour les problèmes OWA
+FORMULATIONS = ("standard", "compact")
+
+def maxOWA(nb_projects, nb_scenarios, costs, utilities, budget, weights, verbose=True, formulation="standard", ctx=None,
+           presolve=False, backend=None, limites=None, depart=None):
     """
     Résoudre le problème de maxOWA
+
+    formulation : "standard" (z_i(x) réécrite dans chacune des n^2 contraintes auxiliaires,
+    contraintes b_ik >= 0 explicites) ou "compact" (z_i(x) définie une seule fois par une
+    variable auxiliaire, b_ik >= 0 porté par les bornes des variables).
+    costs et utilities : listes ou tableaux NumPy (p et n x p), contraintes construites sous forme matricielle.
+    ctx : ContexteSolveur (environnement Gurobi partagé) ; environnement par défaut si None.
+    presolve : retirer les projets plus chers que le budget avant de construire le modèle
+    (voir pretraitement.py ; tous les scénarios comptent dans l'OWA).
+    backend : "gurobi", "highs" (programme matriciel résolu par scipy.optimize.milp, voir
+    programmeLineaire.py) ou None (Gurobi s'il est installé).
+    limites : solveur.Limites (temps, gap, nombre de nœuds, callback des solutions) ; à une limite
+    atteinte, la meilleure solution trouvée est retournée avec res.borne et res.gap.
+    depart : vecteur de sélection 0/1 de départ (démarrage à chaud de Gurobi, par exemple
+    heuristiques.heuristique(...).x) ; ignoré par le backend highs.
+
+    Retourne un Resultat (sélection, valeur OWA, utilités par scénario, r_k, b_ik, statut, temps) ;
+    verbose=True l'affiche avec afficher_resultat.
     """
+    if formulation not in FORMULATIONS:
+        raise ValueError(f"Formulation inconnue : {formulation} (attendu : {', '.join(FORMULATIONS)})")
+
+    if presolve:
+        return resoudre_pretraite(maxOWA, "maxOWA", nb_projects, nb_scenarios, costs, utilities, budget, weights,
+                                  verbose=verbose, formulation=formulation, ctx=ctx, backend=backend,
+                                  limites=limites, depart=depart)
+    backend = choisir_backend(backend)
+
+    debut = time.perf_counter()
+    c, u = ut.en_matrices(nb_projects, nb_scenarios, costs, utilities)
 
     # trier les poids en ordre décroissant
     sorted_weights = sorted(weights, reverse=True)
@@ -11,55 +49,103 @@ def maxOWA(nb_projects, nb_scenarios, costs, utilities, budget, weights, verbose
     # transformer les poids w'_k = (w_k - w_{k+1}) pour k = 1 à n-1 (linéarisation)
     w_prime = [sorted_weights[i] - sorted_weights[i + 1] if i < len(weights) - 1 else sorted_weights[i]
                for i in range(len(weights))]
+    if backend != "gurobi":
+        return resoudre_owa_programme("maxOWA", c, u, budget, w_prime, formulation, debut, verbose, ctx, backend,
+                                      limites=limites)
    
     # initialisation du modèle
-    m = Model("maxOWA")
-    m.setParam('OutputFlag', 0)  # Désactiver les logs de Gurobi
+    m = nouveau_modele("maxOWA", ctx)
 
     # declaration des variables de decision, x_j = 1 si le projet j est sélectionné, 0 sinon
-    x = [m.addVar(vtype=GRB.BINARY, name=f"x_{j}") for j in range(nb_projects)]
+    x = m.addMVar(nb_projects, vtype=GRB.BINARY, name="x")
+    # solution de départ (démarrage à chaud)
+    if depart is not None:
+        x.Start = np.asarray(depart, dtype=float)
 
     # variable rk (variables duales) (n variables)
-    rk = [m.addVar(vtype=GRB.CONTINUOUS, name=f"r_{k}") for k in range(nb_scenarios)]
-
-    # variable b_ik (variables de linéarisation) (n^2 variables)
-    b = [[m.addVar(vtype=GRB.CONTINUOUS, name=f"b_{i}_{k}") for k in range(nb_scenarios)] for i in range(nb_scenarios)]
+    rk = m.addMVar(nb_scenarios, vtype=GRB.CONTINUOUS, name="r")
 
-    # maj du modèle pour intégrer les nouvelles variables
-    m.update()
+    # variable b_ik (variables de linéarisation) (n^2 variables), b[i, k]
+    b = m.addMVar((nb_scenarios, nb_scenarios), vtype=GRB.CONTINUOUS, name="b")
 
     # definition de l'ojectif (maximiser ∑(k=1 to n) w'_k * (k * r_k - ∑(i=1 to n) b_ik))
     # on fait k+1 car quand on multiplie k ne doit pas etre 0 !!!!!!!!!!!
-    m.setObjective(
-        quicksum((w_prime[k] * (((k+1) * rk[k]) - (quicksum(b[i][k] for i in range(nb_scenarios))))) for k in range(nb_scenarios)),
-        GRB.MAXIMIZE
-    )
+    wp = np.asarray(w_prime, dtype=float)
+    m.setObjective((wp * np.arange(1, nb_scenarios + 1)) @ rk - (b @ wp).sum(), GRB.MAXIMIZE)
 
     # contraintes de budget
-    m.addConstr(quicksum(costs[j] * x[j] for j in range(nb_projects)) <= budget, "Budget")
+    m.addConstr(c @ x <= budget, name="Budget")
 
     # Contraintes pour les variables duales r_k et les variables de linéarisation b_ik
-    for k in range(nb_scenarios):
-        for i in range(nb_scenarios):
-            # r_k - b_ik <= z_i(x)
-            m.addConstr(
-                rk[k] - b[i][k] <= quicksum(utilities[i][j] * x[j] for j in range(nb_projects)), name=f"AuxiliaryConstraint_{i}_{k}")
-            # b_ik >= 0 
-            m.addConstr(b[i][k] >= 0, name=f"NonNeg_b_{i}_{k}")
+    if formulation == "compact":
+        # z_i(x) est définie une seule fois par scénario (b_ik >= 0 est la borne inférieure des b_ik)
+        z = m.addMVar(nb_scenarios, lb=-GRB.INFINITY, vtype=GRB.CONTINUOUS, name="z")
+        m.addConstr(z == u @ x, name="Utility")
+        # r_k - b_ik <= z_i pour tout (i, k)
+        m.addConstr(rk - b <= z[:, None], name="AuxiliaryConstraint")
+    else:
+        for k in range(nb_scenarios):
+            # r_k - b_ik <= z_i(x) pour tout i
+            m.addConstr(rk[k] - b[:, k] <= u @ x, name=f"AuxiliaryConstraint_{k}")
+        # b_ik >= 0 
+        m.addConstr(b >= 0, name="NonNeg_b")
 
     # Resolution 
-    m.optimize()
+    construit = time.perf_counter()
+    optimiser(m, limites, debut, x, ut.vecteur_selection)
+
+    res = Resultat("maxOWA", statut_gurobi(m), temps_construction=construit - debut,
+                   temps_resolution=time.perf_counter() - construit, infos={"w_prime": w_prime})
+    res.borne, res.gap = borne_gurobi(m)
+    if m.SolCount > 0:
+        res.x = np.rint(x.X).astype(int)
+        res.objectif = m.objVal
+        res.valeurs = u @ res.x
+        # valeurs des r_k dans chaque scénario et des b_ik
+        res.infos["r"] = rk.X.tolist()
+        res.infos["b"] = b.X.tolist()
+
+    # libérer la mémoire du modèle
+    m.dispose()
+    res.temps_extraction = time.perf_counter() - construit - res.temps_resolution
+
+    if verbose:
+        afficher_resultat(res)
+    return res
+
+
+def resoudre_owa_programme(critere, c, u, budget, w_prime, formulation, debut, verbose, ctx, backend, z_star=None,
+                   infos=None, limites=None, debut_appel=None):
+    """
+    maxOWA (ou minOWA des regrets avec z_star) sous forme matricielle (programmeLineaire.py),
+    pour les backends autres que Gurobi ; debut est l'instant de début de la construction,
+    debut_appel celui de l'appel pour la limite de temps de limites (debut par défaut).
+    """
+    pl = ProgrammeLineaire(critere, maximiser=z_star is None)
+    x = pl.binaires(len(c))
+    pl.contraintes([(c, x)], haut=budget)
+    if z_star is None:
+        r, b = ajouter_owa(pl, [(u, x)], len(w_prime), w_prime, formulation)
+    else:
+        # regrets z*_i - z_i(x)
+        r, b = ajouter_owa(pl, [(-u, x)], len(w_prime), w_prime, formulation, regrets=True, constante=z_star)
+
+    construit = time.perf_counter()
+    sol = pl.resoudre(backend, ctx, limites=limites, debut=debut if debut_appel is None else debut_appel,
+                      variables=x, solution=ut.vecteur_selection)
+    infos = dict(infos or {}, w_prime=w_prime, backend=backend)
+    res = Resultat(critere, sol.statut, z_star=z_star, temps_construction=construit - debut + sol.temps_construction,
+                   temps_resolution=sol.temps, infos=infos, borne=sol.borne, gap=sol.gap)
+    if sol.valeurs is not None:
+        res.x = np.rint(sol.valeurs[x]).astype(int)
+        res.objectif = sol.objectif
+        res.valeurs = u @ res.x
+        if z_star is not None:
+            res.regrets = np.asarray(z_star, dtype=float) - res.valeurs
+        res.infos["r"] = sol.valeurs[r].tolist()
+        res.infos["b"] = sol.valeurs[b].reshape(len(w_prime), len(w_prime)).tolist()
+    res.temps_extraction = time.perf_counter() - construit - sol.temps_construction - res.temps_resolution
 
     if verbose:
-        print("\nSolution optimale:")
-        for j in range(nb_projects):
-            print(f"x{j + 1} = {x[j].x}")
-        print("\nValeur de la fonction objectif:", m.objVal)
-
-        # valeurs des r_k dans chaque scénario
-        r_values = [rk[k].x for k in range(nb_scenarios)]
-        print("Valeurs des r_k dans chaque scénario:", r_values)
-        
-        print("w'_k:", w_prime)
-        print("b_ik:", [[b[i][k].x for k in range(nb_scenarios)] for i in range(nb_scenarios)])
-    return
+        afficher_resultat(res)
+    return res
@@ -2,52 +2,189 @@
 
 # Copyright 2024, Gurobi Optimization, Inc.
 
-from gurobipy import *
+import time
+import numpy as np
+from solveur import GRB, borne_gurobi, choisir_backend, ecart, nouveau_modele, optimiser, statut_gurobi
+from programmeLineaire import ProgrammeLineaire
+from generationLignes import TOLERANCE, generer_lignes
+from pretraitement import resoudre_pretraite
+from resultats import Resultat, afficher_resultat, afficher_frontiere
+import utils as ut
 
-def maxmin(nb_projects, nb_scenarios, costs, utilities, budget, verbose=True) :
+def maxmin(nb_projects, nb_scenarios, costs, utilities, budget, verbose=True, ctx=None, presolve=False,
+           row_generation=False, backend=None, limites=None, depart=None) :
     """
     Résoudre le problème de maxmin
+
+    costs et utilities peuvent être des listes ou des tableaux NumPy (p et n x p) ;
+    les contraintes sont construites sous forme matricielle.
+    ctx : ContexteSolveur (environnement Gurobi partagé) ; environnement par défaut si None.
+    presolve : retirer les projets plus chers que le budget et les scénarios dominés avant
+    de construire le modèle (voir pretraitement.py).
+    row_generation : ajouter les contraintes de scénario au fur et à mesure (scénario de plus
+    petite utilité pour la solution courante) au lieu de toutes les poser au départ ;
+    statistiques dans res.infos["generation"] (voir generationLignes.generer_lignes).
+    backend : "gurobi", "highs" (programme matriciel résolu par scipy.optimize.milp, voir
+    programmeLineaire.py) ou None (Gurobi s'il est installé) ; row_generation requiert Gurobi.
+    limites : solveur.Limites (temps, gap, nombre de nœuds, callback des solutions) ; à une
+    limite atteinte, la meilleure solution trouvée est retournée avec res.borne et res.gap.
+    depart : vecteur de sélection 0/1 de départ (démarrage à chaud de Gurobi, par exemple
+    heuristiques.heuristique(...).x) ; ignoré par le backend highs.
+
+    Retourne un Resultat (sélection, valeur t, utilités par scénario, statut, temps) ;
+    verbose=True l'affiche avec afficher_resultat.
     """
+    if presolve:
+        return resoudre_pretraite(maxmin, "maxmin", nb_projects, nb_scenarios, costs, utilities, budget,
+                                  verbose=verbose, ctx=ctx, row_generation=row_generation, backend=backend,
+                                  limites=limites, depart=depart)
+
+    backend = choisir_backend(backend)
+    if backend != "gurobi":
+        if row_generation:
+            raise ValueError("La génération de contraintes requiert le backend gurobi.")
+        return _maxmin_programme(nb_projects, nb_scenarios, costs, utilities, budget, verbose, ctx, backend, limites)
+
+    debut = time.perf_counter()
+    c, u = ut.en_matrices(nb_projects, nb_scenarios, costs, utilities)
+
     # initialisation du modèle
-    m = Model("maxmin")
-    m.setParam('OutputFlag', 0)  # Désactiver les logs de Gurobi
+    m = nouveau_modele("maxmin", ctx)
 
     # declaration des variables de decision, x_j = 1 si le projet j est sélectionné, 0 sinon
-    x = []
-    for j in range(nb_projects):
-        x.append(m.addVar(vtype=GRB.BINARY, name="x%d" % (j + 1)))
+    x = m.addMVar(nb_projects, vtype=GRB.BINARY, name="x")
+    # solution de départ (démarrage à chaud)
+    if depart is not None:
+        x.Start = np.asarray(depart, dtype=float)
 
     # variable t pour représenter la valeur minimale de z_i(x) 
     t = m.addVar(vtype=GRB.CONTINUOUS, name="t")
 
-    # maj du modele pour integrer les nouvelles variables
-    m.update()
-
     # definition de l'ojectif (maximiser t)
     m.setObjective(t, GRB.MAXIMIZE)
 
     # definition des contraintes
-    # contrainte t est la valeur minimale de z_i(x) pour tous les scénarios i
-    for i in range(nb_scenarios):
-        m.addConstr(t <= quicksum(utilities[i][j] * x[j] for j in range(nb_projects)), 
-                    "scenario_%d" % (i + 1))
+    # contrainte t est la valeur minimale de z_i(x) pour tous les scénarios i (U x >= t)
+    if row_generation:
+        # départ avec le scénario de plus petite utilité totale, les autres sont ajoutés s'ils sont violés
+        actifs = [int(np.argmin(u.sum(axis=1)))]
+        m.addConstr(u[actifs[0]] @ x >= t, name=f"scenario_{actifs[0]}")
+    else:
+        m.addConstr(u @ x >= t, name="scenario")
 
     # contrainte de budget
-    m.addConstr(quicksum(costs[j] * x[j] for j in range(nb_projects)) <= budget, "budget")
+    m.addConstr(c @ x <= budget, name="budget")
 
     # Resolution
-    m.optimize()
+    construit = time.perf_counter()
+    infos = {}
+    if row_generation:
+        def ajouter_scenario(i):
+            m.addConstr(u[i] @ x >= t, name=f"scenario_{i}")
 
-    if verbose:
-        print("")
-        print("Solution optimale:")
-        for j in range(nb_projects):
-            print("x%d = %d" % (j + 1, x[j].x))
-        print("")
-        print("Valeur de la fonction objective (t) :", t.x)
+        def scenario_le_plus_viole():
+            valeurs = u @ np.rint(x.X)
+            i = int(np.argmin(valeurs))
+            return i if valeurs[i] < t.X - TOLERANCE else None
+
+        infos["generation"] = generer_lignes(m, actifs, ajouter_scenario, scenario_le_plus_viole,
+                                             limites=limites, debut=debut, nb_scenarios=nb_scenarios)
+    else:
+        optimiser(m, limites, debut, x, ut.vecteur_selection)
 
+    res = Resultat("maxmin", statut_gurobi(m), temps_construction=construit - debut,
+                   temps_resolution=time.perf_counter() - construit, infos=infos)
+    res.borne, res.gap = borne_gurobi(m)
+    if m.SolCount > 0:
+        res.x = np.rint(x.X).astype(int)
+        res.objectif = t.X
         # Utilités dans les scénarios
-        z = [sum(utilities[i][j] * x[j].x for j in range(nb_projects)) for i in range(nb_scenarios)]
-        print("Utilités dans les scénarios:", z)
+        res.valeurs = u @ res.x
+        if row_generation and not infos["generation"]["converge"]:
+            # génération interrompue par une limite : valeur sur tous les scénarios, borne du modèle restreint
+            res.objectif = res.valeurs.min()
+            res.gap = ecart(res.objectif, res.borne)
+
+    # libérer la mémoire du modèle
+    m.dispose()
+    res.temps_extraction = time.perf_counter() - construit - res.temps_resolution
+
+    if verbose:
+        afficher_resultat(res)
+    return res
+
+def _maxmin_programme(nb_projects, nb_scenarios, costs, utilities, budget, verbose, ctx, backend, limites=None):
+    """
+    maxmin sous forme matricielle (programmeLineaire.py), pour les backends autres que Gurobi.
+    """
+    debut = time.perf_counter()
+    c, u = ut.en_matrices(nb_projects, nb_scenarios, costs, utilities)
+
+    # maximiser t sous U x >= t et c x <= budget
+    pl = ProgrammeLineaire("maxmin", maximiser=True)
+    x = pl.binaires(nb_projects)
+    t = pl.variables(1, obj=1.0)
+    pl.contraintes([(u, x), (-np.ones((nb_scenarios, 1)), t)], bas=0.0)
+    pl.contraintes([(c, x)], haut=budget)
 
-    return
+    construit = time.perf_counter()
+    sol = pl.resoudre(backend, ctx, limites=limites, debut=debut, variables=x, solution=ut.vecteur_selection)
+    res = Resultat("maxmin", sol.statut, temps_construction=construit - debut + sol.temps_construction,
+                   temps_resolution=sol.temps, infos={"backend": backend}, borne=sol.borne, gap=sol.gap)
+    if sol.valeurs is not None:
+        res.x = np.rint(sol.valeurs[x]).astype(int)
+        res.objectif = sol.objectif
+        res.valeurs = u @ res.x
+    res.temps_extraction = time.perf_counter() - construit - sol.temps_construction - res.temps_resolution
+
+    if verbose:
+        afficher_resultat(res)
+    return res
+
+def maxmin_budgets(nb_projects, nb_scenarios, costs, utilities, budgets, verbose=True, ctx=None):
+    """
+    Résoudre le problème de maxmin pour plusieurs budgets (frontière budget -> valeur maxmin).
+
+    Le modèle est construit une seule fois : d'un budget à l'autre, seul le second membre
+    de la contrainte de budget change. Les budgets sont résolus par ordre croissant, la
+    sélection précédente (réalisable pour un budget plus grand) servant de point de départ.
+
+    Retourne la liste des Resultat dans l'ordre de budgets (budget dans res.infos["budget"]) ;
+    verbose=True affiche la frontière.
+    """
+    debut = time.perf_counter()
+    c, u = ut.en_matrices(nb_projects, nb_scenarios, costs, utilities)
+
+    m = nouveau_modele("maxmin_budgets", ctx)
+    x = m.addMVar(nb_projects, vtype=GRB.BINARY, name="x")
+    t = m.addVar(vtype=GRB.CONTINUOUS, name="t")
+    m.setObjective(t, GRB.MAXIMIZE)
+    m.addConstr(u @ x >= t, name="scenario")
+    budget_constr = m.addConstr(c @ x <= 0, name="budget")
+    temps_construction = time.perf_counter() - debut
+
+    resultats = {}
+    for budget in sorted(set(budgets)):
+        debut = time.perf_counter()
+        budget_constr.RHS = budget
+        m.optimize()
+        fin = time.perf_counter()
+
+        res = Resultat("maxmin", statut_gurobi(m), temps_construction=temps_construction,
+                       temps_resolution=fin - debut, infos={"budget": budget})
+        if m.SolCount > 0:
+            res.x = np.rint(x.X).astype(int)
+            res.objectif = t.X
+            res.valeurs = u @ res.x
+            # démarrage à chaud pour le budget suivant (plus grand)
+            x.Start = res.x
+        res.temps_extraction = time.perf_counter() - fin
+        resultats[budget] = res
+        temps_construction = 0.0
+
+    # libérer la mémoire du modèle
+    m.dispose()
+
+    if verbose:
+        afficher_frontiere([resultats[b] for b in sorted(resultats)])
+    return [resultats[b] for b in budgets]
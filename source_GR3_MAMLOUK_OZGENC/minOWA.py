@@ -1,63 +1,117 @@
-from gurobipy import Model, GRB, quicksum
+import time
+import numpy as np
 import utils as ut
+from solveur import GRB, borne_gurobi, choisir_backend, nouveau_modele, optimiser, statut_gurobi
+from pretraitement import resoudre_pretraite
+from resultats import Resultat, afficher_resultat
+from maxOWA import FORMULATIONS, resoudre_owa_programme
 
-def minOWA(nb_projects, nb_scenarios, costs, utilities, budget, weights, verbose=True):
+def minOWA(nb_projects, nb_scenarios, costs, utilities, budget, weights, verbose=True, formulation="standard", ctx=None,
+           cache=True, presolve=False, backend=None, limites=None, depart=None):
     """
     Résoudre le problème de minOWA des regrets en retournant les projets sélectionnés dans l'ordre initial.
+
+    formulation : "standard" ou "compact" (z_i(x) définie une seule fois par une variable
+    auxiliaire, b_ik >= 0 porté par les bornes des variables), voir maxOWA.
+    costs et utilities : listes ou tableaux NumPy (p et n x p), contraintes construites sous forme matricielle.
+    ctx : ContexteSolveur (environnement Gurobi partagé) ; environnement par défaut si None.
+    cache : cache des z* (True : cache par défaut, False : pas de cache), voir utils.z_star.
+    presolve : retirer les projets plus chers que le budget avant de construire le modèle
+    (voir pretraitement.py ; tous les scénarios comptent dans l'OWA).
+    backend : "gurobi", "highs" (scipy.optimize.milp, voir programmeLineaire.py) ou None (Gurobi
+    s'il est installé), aussi pour le calcul de z*.
+    limites : solveur.Limites (temps de l'appel z* compris, gap, nombre de nœuds, callback des
+    solutions) ; à une limite atteinte, la meilleure solution trouvée est retournée avec res.borne
+    et res.gap.
+    depart : vecteur de sélection 0/1 de départ (démarrage à chaud de Gurobi, par exemple
+    heuristiques.heuristique(...).x) ; ignoré par le backend highs.
+
+    Retourne un Resultat (sélection, valeur OWA, utilités et regrets par scénario, z*, r_k, b_ik,
+    statut, temps) ; verbose=True l'affiche avec afficher_resultat.
     """
+    if formulation not in FORMULATIONS:
+        raise ValueError(f"Formulation inconnue : {formulation} (attendu : {', '.join(FORMULATIONS)})")
+
+    if presolve:
+        return resoudre_pretraite(minOWA, "minOWA", nb_projects, nb_scenarios, costs, utilities, budget, weights,
+                                  verbose=verbose, formulation=formulation, ctx=ctx, cache=cache, backend=backend,
+                                  limites=limites, depart=depart)
+    debut_appel = time.perf_counter()
+    backend = choisir_backend(backend)
+
+    c, u = ut.en_matrices(nb_projects, nb_scenarios, costs, utilities)
+
     # etape 1 : Calcul de z_star
-    z_star, x_values = ut.z_star(nb_projects, nb_scenarios, costs, utilities, budget)
+    debut = time.perf_counter()
+    z_star, x_values = ut.z_star(nb_projects, nb_scenarios, costs, utilities, budget, ctx=ctx, cache=cache,
+                                 backend=backend)
+    temps_z_star = time.perf_counter() - debut
 
     # etape 2 : Résolution du problème minOWA des regrets
     sorted_weights = sorted(weights, reverse=True)
     w_prime = [sorted_weights[i] - sorted_weights[i + 1] if i < len(weights) - 1 else sorted_weights[i]
             for i in range(len(weights))]
 
-    m = Model("minOWA_of_regrets")
-    m.setParam('OutputFlag', 0)
+    debut = time.perf_counter()
+    if backend != "gurobi":
+        return resoudre_owa_programme("minOWA", c, u, budget, w_prime, formulation, debut, verbose, ctx, backend,
+                              z_star=z_star, infos={"x_star": x_values, "temps_z_star": temps_z_star},
+                              limites=limites, debut_appel=debut_appel)
+    m = nouveau_modele("minOWA_of_regrets", ctx)
     
     # declaration des variables de decision, x_j = 1 si le projet j est sélectionné, 0 sinon
-    x = [m.addVar(vtype=GRB.BINARY, name=f"x_{j}") for j in range(nb_projects)]
+    x = m.addMVar(nb_projects, vtype=GRB.BINARY, name="x")
+    # solution de départ (démarrage à chaud)
+    if depart is not None:
+        x.Start = np.asarray(depart, dtype=float)
 
     # variable rk (variables duales) (n variables)
-    rk = [m.addVar(vtype=GRB.CONTINUOUS, name=f"r_{k}") for k in range(nb_scenarios)]
-
-    # variable b_ik (variables de linéarisation) (n^2 variables)
-    b = [[m.addVar(vtype=GRB.CONTINUOUS, name=f"b_{i}_{k}") for k in range(nb_scenarios)] for i in range(nb_scenarios)]
+    rk = m.addMVar(nb_scenarios, vtype=GRB.CONTINUOUS, name="r")
 
+    # variable b_ik (variables de linéarisation) (n^2 variables), b[i, k]
+    b = m.addMVar((nb_scenarios, nb_scenarios), vtype=GRB.CONTINUOUS, name="b")
 
     # definition de l'objectif
-    m.setObjective(
-        quicksum((w_prime[k] * (((k+1) * rk[k]) + (quicksum(b[i][k] for i in range(nb_scenarios))))) 
-                for k in range(nb_scenarios)), GRB.MINIMIZE
-    )
+    wp = np.asarray(w_prime, dtype=float)
+    m.setObjective((wp * np.arange(1, nb_scenarios + 1)) @ rk + (b @ wp).sum(), GRB.MINIMIZE)
 
     # contrainte du budget
-    m.addConstr(quicksum(costs[j] * x[j] for j in range(nb_projects)) <= budget, "Budget")
-
-    
+    m.addConstr(c @ x <= budget, name="Budget")
 
     # contraintes sur les regrets et linéarisation
-    for k in range(nb_scenarios):
-        for i in range(nb_scenarios):
-            m.addConstr(rk[k] - b[i][k] >= (z_star[i] - quicksum(utilities[i][j] * x[j] for j in range(nb_projects))), name=f"AuxiliaryConstraint_{i}_{k}")
-            m.addConstr(b[i][k] >= 0, name=f"Neg_b_{i}_{k}")
+    zs = np.asarray(z_star, dtype=float)
+    if formulation == "compact":
+        # z_i(x) est définie une seule fois par scénario (b_ik >= 0 est la borne inférieure des b_ik)
+        z = m.addMVar(nb_scenarios, lb=-GRB.INFINITY, vtype=GRB.CONTINUOUS, name="z")
+        m.addConstr(z == u @ x, name="Utility")
+        # r_k - b_ik >= z*_i - z_i pour tout (i, k)
+        m.addConstr(rk - b >= (zs - z)[:, None], name="AuxiliaryConstraint")
+    else:
+        for k in range(nb_scenarios):
+            m.addConstr(rk[k] - b[:, k] >= zs - u @ x, name=f"AuxiliaryConstraint_{k}")
+        m.addConstr(b >= 0, name="Neg_b")
 
     # Resolution
-    m.optimize()
+    construit = time.perf_counter()
+    optimiser(m, limites, debut_appel, x, ut.vecteur_selection)
+
+    res = Resultat("minOWA", statut_gurobi(m), z_star=z_star, temps_construction=construit - debut,
+                   temps_resolution=time.perf_counter() - construit,
+                   infos={"w_prime": w_prime, "x_star": x_values, "temps_z_star": temps_z_star})
+    res.borne, res.gap = borne_gurobi(m)
+    if m.SolCount > 0:
+        res.x = np.rint(x.X).astype(int)
+        res.objectif = m.objVal
+        res.valeurs = u @ res.x
+        res.regrets = zs - res.valeurs
+        res.infos["r"] = rk.X.tolist()
+        res.infos["b"] = b.X.tolist()
+
+    # libérer la mémoire du modèle
+    m.dispose()
+    res.temps_extraction = time.perf_counter() - construit - res.temps_resolution
 
     # affichage des resultats
     if verbose:
-        print("Solution optimale:")
-        for j in range(nb_projects):
-            print(f"x{j + 1} = {x[j].x}")
-        print ("regrets:") 
-        for i in range(nb_scenarios):
-            print("z_star_", i + 1, "=", z_star[i])
-            print(f"regret_{i + 1} = {z_star[i] - quicksum(utilities[i][j] * x[j].x for j in range(nb_projects))}") 
-        print("\nValeur de la fonction objectif:", m.objVal)
-        r_values = [rk[k].x for k in range(nb_scenarios)]
-        print("Valeurs des r_k dans chaque scénario:", r_values)
-        print("w'_k:", w_prime)
-        print("b_ik:", [[b[i][k].x for k in range(nb_scenarios)] for i in range(nb_scenarios)])
-
+        afficher_resultat(res)
+    return res
@@ -1,20 +1,58 @@
 #!/usr/bin/python
 
-from gurobipy import *
+import time
+import numpy as np
 import utils as ut
+from solveur import GRB, borne_gurobi, choisir_backend, ecart, nouveau_modele, optimiser, statut_gurobi
+from programmeLineaire import ProgrammeLineaire
+from generationLignes import TOLERANCE, generer_lignes
+from pretraitement import resoudre_pretraite
+from resultats import Resultat, afficher_resultat, afficher_frontiere
+
+def minmaxRegret(nb_projects, nb_scenarios, costs, utilities, budget, verbose=True, ctx=None, cache=True, presolve=False,
+                 row_generation=False, backend=None, limites=None, depart=None) :
+    # costs et utilities : listes ou tableaux NumPy (p et n x p), contraintes construites sous forme matricielle
+    # ctx : ContexteSolveur (environnement Gurobi partagé) ; environnement par défaut si None
+    # cache : cache des z* (True : cache par défaut, False : pas de cache), voir utils.z_star
+    # presolve : retirer les projets plus chers que le budget et fusionner les scénarios identiques (voir pretraitement.py)
+    # row_generation : ajouter les contraintes de regret au fur et à mesure (scénario de plus grand regret
+    # pour la solution courante) ; statistiques dans res.infos["generation"]
+    # backend : "gurobi", "highs" (scipy.optimize.milp, voir programmeLineaire.py) ou None (Gurobi s'il est
+    # installé), aussi pour le calcul de z* ; row_generation requiert Gurobi
+    # limites : solveur.Limites (temps de l'appel z* compris, gap, nombre de nœuds, callback des solutions) ;
+    # à une limite atteinte, la meilleure solution trouvée est retournée avec res.borne et res.gap
+    # depart : vecteur de sélection 0/1 de départ (démarrage à chaud de Gurobi, par exemple
+    # heuristiques.heuristique(...).x) ; ignoré par le backend highs
+    # retourne un Resultat (sélection, regret maximal, utilités et regrets par scénario, z*, statut, temps)
+    if presolve:
+        return resoudre_pretraite(minmaxRegret, "minmaxRegret", nb_projects, nb_scenarios, costs, utilities, budget,
+                                  verbose=verbose, ctx=ctx, cache=cache, row_generation=row_generation,
+                                  backend=backend, limites=limites, depart=depart)
+    debut_appel = time.perf_counter()
+    backend = choisir_backend(backend)
+    if backend != "gurobi" and row_generation:
+        raise ValueError("La génération de contraintes requiert le backend gurobi.")
+
+    c, u = ut.en_matrices(nb_projects, nb_scenarios, costs, utilities)
 
-def minmaxRegret(nb_projects, nb_scenarios, costs, utilities, budget, verbose=True) :
     # Etape 1: trouver z*_i pour chaque scénario i
-    z_star, x_values = ut.z_star(nb_projects, nb_scenarios, costs, utilities, budget)
+    debut = time.perf_counter()
+    z_star, x_values = ut.z_star(nb_projects, nb_scenarios, costs, utilities, budget, ctx=ctx, cache=cache,
+                                 backend=backend)
+    temps_z_star = time.perf_counter() - debut
+    if backend != "gurobi":
+        return _minmaxRegret_programme(c, u, budget, z_star, x_values, temps_z_star, verbose, ctx, backend, limites,
+                                       debut_appel)
 
     # etape 2: résoudre le problème de minimisation du regret
-    m = Model("minmax_regret")
-    m.setParam('OutputFlag', 0)  # Désactiver les logs de
+    debut = time.perf_counter()
+    m = nouveau_modele("minmax_regret", ctx)
 
     # declaration des variables de decision
-    x = []
-    for j in range(nb_projects):
-        x.append(m.addVar(vtype=GRB.BINARY, name="x%d" % (j + 1)))
+    x = m.addMVar(nb_projects, vtype=GRB.BINARY, name="x")
+    # solution de départ (démarrage à chaud)
+    if depart is not None:
+        x.Start = np.asarray(depart, dtype=float)
 
     # variable t pour représenter le regret maximal
     t = m.addVar(vtype=GRB.CONTINUOUS, name="max_regret")
@@ -23,35 +61,145 @@ def minmaxRegret(nb_projects, nb_scenarios, costs, utilities, budget, verbose=Tr
     m.setObjective(t, GRB.MINIMIZE)
 
     # definition des contraintes
-    # contrainte t est la valeur maximale de z*_i - z_i(x) pour tous les scénarios i
-    for i in range(nb_scenarios):
-        regret = z_star[i] - quicksum(utilities[i][j] * x[j] for j in range(nb_projects))
-        m.addConstr(t >= regret, "regret_constraint_%d" % (i + 1))
+    # contrainte t est la valeur maximale de z*_i - z_i(x) pour tous les scénarios i (t + U x >= z*)
+    zs = np.asarray(z_star, dtype=float)
+    if row_generation:
+        # départ avec le scénario de plus grand z*, les autres sont ajoutés s'ils sont violés
+        actifs = [int(np.argmax(zs))]
+        m.addConstr(u[actifs[0]] @ x + t >= zs[actifs[0]], name=f"regret_constraint_{actifs[0]}")
+    else:
+        m.addConstr(u @ x + t >= zs, name="regret_constraint")
 
     # contrainte de budget
-    m.addConstr(quicksum(costs[j] * x[j] for j in range(nb_projects)) <= budget, "budget_constraint")
+    m.addConstr(c @ x <= budget, name="budget_constraint")
 
     # Resolution
-    m.optimize()
+    construit = time.perf_counter()
+    infos = {"x_star": x_values, "temps_z_star": temps_z_star}
+    if row_generation:
+        def ajouter_scenario(i):
+            m.addConstr(u[i] @ x + t >= zs[i], name=f"regret_constraint_{i}")
+
+        def scenario_le_plus_viole():
+            regrets = zs - u @ np.rint(x.X)
+            i = int(np.argmax(regrets))
+            return i if regrets[i] > t.X + TOLERANCE else None
+
+        infos["generation"] = generer_lignes(m, actifs, ajouter_scenario, scenario_le_plus_viole,
+                                             limites=limites, debut=debut_appel, nb_scenarios=nb_scenarios)
+    else:
+        optimiser(m, limites, debut_appel, x, ut.vecteur_selection)
+
+    res = Resultat("minmaxRegret", statut_gurobi(m), z_star=z_star, temps_construction=construit - debut,
+                   temps_resolution=time.perf_counter() - construit, infos=infos)
+    res.borne, res.gap = borne_gurobi(m)
+    if m.SolCount > 0:
+        res.x = np.rint(x.X).astype(int)
+        res.objectif = t.X
+        # utilités et regrets dans les scénarios
+        res.valeurs = u @ res.x
+        res.regrets = np.asarray(z_star) - res.valeurs
+        if row_generation and not infos["generation"]["converge"]:
+            # génération interrompue par une limite : regret sur tous les scénarios, borne du modèle restreint
+            res.objectif = res.regrets.max()
+            res.gap = ecart(res.objectif, res.borne)
+
+    # libérer la mémoire du modèle
+    m.dispose()
+    res.temps_extraction = time.perf_counter() - construit - res.temps_resolution
+
+    if verbose:
+        afficher_resultat(res)
+    return res
+
+def _minmaxRegret_programme(c, u, budget, z_star, x_values, temps_z_star, verbose, ctx, backend, limites=None,
+                            debut_appel=None):
+    """
+    minmaxRegret sous forme matricielle (programmeLineaire.py), pour les backends autres que Gurobi.
+    """
+    debut = time.perf_counter()
+    zs = np.asarray(z_star, dtype=float)
+
+    # minimiser t sous U x + t >= z* et c x <= budget
+    pl = ProgrammeLineaire("minmax_regret")
+    x = pl.binaires(len(c))
+    t = pl.variables(1, obj=1.0)
+    pl.contraintes([(u, x), (np.ones((len(zs), 1)), t)], bas=zs)
+    pl.contraintes([(c, x)], haut=budget)
+
+    construit = time.perf_counter()
+    sol = pl.resoudre(backend, ctx, limites=limites, debut=debut_appel, variables=x, solution=ut.vecteur_selection)
+    res = Resultat("minmaxRegret", sol.statut, z_star=z_star,
+                   temps_construction=construit - debut + sol.temps_construction,
+                   temps_resolution=sol.temps,
+                   infos={"x_star": x_values, "temps_z_star": temps_z_star, "backend": backend},
+                   borne=sol.borne, gap=sol.gap)
+    if sol.valeurs is not None:
+        res.x = np.rint(sol.valeurs[x]).astype(int)
+        res.objectif = sol.objectif
+        res.valeurs = u @ res.x
+        res.regrets = zs - res.valeurs
+    res.temps_extraction = time.perf_counter() - construit - sol.temps_construction - res.temps_resolution
 
     if verbose:
-        print("")
-        print("z*_i pour chaque scénario i:", z_star)
-        print("Valeurs des variables x dans chaque scénario:", x_values)
+        afficher_resultat(res)
+    return res
+
+def minmaxRegret_budgets(nb_projects, nb_scenarios, costs, utilities, budgets, verbose=True, ctx=None, cache=True):
+    """
+    Résoudre le problème de minmax regret pour plusieurs budgets (frontière budget -> regret maximal).
 
-        print("Solution optimale:")
-        for j in range(nb_projects):
-            print("x%d = %d" % (j + 1, x[j].x))
+    z* est calculé pour tous les budgets par utils.z_star_budgets (calculs partagés entre
+    budgets), puis le modèle est construit une seule fois : d'un budget à l'autre, seuls
+    les seconds membres des contraintes de budget et de regret changent. Les budgets sont
+    résolus par ordre croissant, la sélection précédente servant de point de départ.
 
-        print("")
-        print("Valeur de la fonction objective (minmax regret) :", t.x)
+    Retourne la liste des Resultat dans l'ordre de budgets (budget dans res.infos["budget"]) ;
+    verbose=True affiche la frontière.
+    """
+    c, u = ut.en_matrices(nb_projects, nb_scenarios, costs, utilities)
 
-        # calcule des utilités dans les scénarios
-        z = [sum(utilities[i][j] * x[j].x for j in range(nb_projects)) for i in range(nb_scenarios)]
-        print("Utilités dans les scénarios:", z)
+    # Etape 1: z*_i pour chaque scénario i et chaque budget
+    debut = time.perf_counter()
+    z_stars = ut.z_star_budgets(nb_projects, nb_scenarios, costs, utilities, budgets, ctx=ctx, cache=cache)
+    temps_z_star = time.perf_counter() - debut
 
-        # calcule des regrets dans les scénarios
-        regrets = [z_star[i] - z[i] for i in range(nb_scenarios)]
-        print("Regrets dans les scénarios:", regrets)
+    # etape 2: un seul modèle pour tous les budgets
+    debut = time.perf_counter()
+    m = nouveau_modele("minmax_regret_budgets", ctx)
+    x = m.addMVar(nb_projects, vtype=GRB.BINARY, name="x")
+    t = m.addVar(vtype=GRB.CONTINUOUS, name="max_regret")
+    m.setObjective(t, GRB.MINIMIZE)
+    regret_constr = m.addConstr(u @ x + t >= np.zeros(nb_scenarios), name="regret_constraint")
+    budget_constr = m.addConstr(c @ x <= 0, name="budget_constraint")
+    temps_construction = time.perf_counter() - debut
 
-    return 
+    resultats = {}
+    for budget in sorted(z_stars):
+        z_star, x_values = z_stars[budget]
+        debut = time.perf_counter()
+        budget_constr.RHS = budget
+        regret_constr.RHS = np.asarray(z_star)
+        m.optimize()
+        fin = time.perf_counter()
+
+        res = Resultat("minmaxRegret", statut_gurobi(m), z_star=z_star, temps_construction=temps_construction,
+                       temps_resolution=fin - debut,
+                       infos={"budget": budget, "x_star": x_values, "temps_z_star": temps_z_star})
+        if m.SolCount > 0:
+            res.x = np.rint(x.X).astype(int)
+            res.objectif = t.X
+            res.valeurs = u @ res.x
+            res.regrets = np.asarray(z_star) - res.valeurs
+            # démarrage à chaud pour le budget suivant (plus grand)
+            x.Start = res.x
+        res.temps_extraction = time.perf_counter() - fin
+        resultats[budget] = res
+        temps_construction = temps_z_star = 0.0
+
+    # libérer la mémoire du modèle
+    m.dispose()
+
+    if verbose:
+        afficher_frontiere([resultats[b] for b in sorted(resultats)])
+    return [resultats[b] for b in budgets]
@@ -25,6 +25,11 @@ n_values = [5, 10, 15]  # nombre de scénarios
 p_values = [10, 15, 20] # nombre de projets
 nb_instances = 10      # nombre d'instances à génére
 
+# données pour l'evaluation du temps de résolution des chemins robustes (graphes aléatoires)
+n_values_chemins = [2, 5, 10]        # nombre de scénarios
+nb_noeuds_values = [50, 100, 200]    # nombre de sommets
+topologie_chemins = "layered"        # "layered", "grid", "dag" ou "cyclic"
+
 ##############################################################################################
 
 # poids des objectifs pour OWA
@@ -0,0 +1,48 @@
+import os
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+# modes d'exécution parallèle
+MODES = ("process", "thread")
+
+
+def nb_workers(n_jobs):
+    """
+    Nombre de workers effectif : n_jobs=None ou n_jobs<=0 utilise tous les cœurs.
+    """
+    if n_jobs is None or n_jobs <= 0:
+        return os.cpu_count() or 1
+    return n_jobs
+
+
+def threads_par_worker(n_jobs):
+    """
+    Nombre de threads Gurobi par worker pour ne pas dépasser le nombre de cœurs.
+    """
+    return max(1, (os.cpu_count() or 1) // nb_workers(n_jobs))
+
+
+def executer_par_scenario(func, *iterables, n_jobs=1, mode="process"):
+    """
+    Appliquer func à chaque élément (un par scénario) et retourner la liste des résultats
+    dans l'ordre des scénarios, quel que soit l'ordre de fin des workers.
+
+    Paramètres :
+    - func : fonction de niveau module (sérialisable pour le mode "process").
+    - iterables : arguments de func, comme pour map.
+    - n_jobs : nombre de workers (1 = exécution séquentielle, None = tous les cœurs).
+    - mode : "process" (ProcessPoolExecutor) ou "thread" (ThreadPoolExecutor).
+    """
+    if mode not in MODES:
+        raise ValueError(f"Mode inconnu : {mode} (attendu : {', '.join(MODES)})")
+
+    taches = list(zip(*iterables))
+    n = min(nb_workers(n_jobs), len(taches))
+    if n <= 1:
+        return [func(*args) for args in taches]
+
+    if mode == "process":
+        # regrouper les tâches pour limiter le coût de sérialisation
+        with ProcessPoolExecutor(max_workers=n) as executor:
+            return list(executor.map(func, *zip(*taches), chunksize=max(1, len(taches) // (4 * n))))
+    with ThreadPoolExecutor(max_workers=n) as executor:
+        return list(executor.map(func, *zip(*taches)))
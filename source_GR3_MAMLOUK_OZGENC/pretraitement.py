@@ -0,0 +1,294 @@
+"""
+Prétraitement des instances avant la construction des modèles.
+
+Sélection de projets :
+- les projets dont le coût dépasse le budget sont fixés à 0 et retirés ;
+- maxmin : un scénario dont les utilités dominent (>= composante par composante) celles
+  d'un autre scénario n'est jamais le minimum et est retiré ;
+- minmaxRegret : les scénarios identiques (mêmes utilités, donc même z*) sont fusionnés ;
+- maxOWA, minOWA : les scénarios sont conservés (chaque valeur compte dans l'OWA).
+
+Chemin robuste :
+- les arcs qui ne sont sur aucun chemin du départ à l'arrivée (origine non atteignable
+  depuis le départ ou extrémité qui n'atteint pas l'arrivée) sont retirés, ainsi que les
+  sommets qui n'ont plus d'arcs ;
+- maxmin : un scénario dont les temps sont dominés (<= composante par composante) par ceux
+  d'un autre scénario n'est jamais le maximum et est retiré ;
+- minmax regret : les scénarios identiques sont fusionnés ;
+- maxOWA, minOWA : les scénarios sont conservés.
+
+Les résultats calculés sur l'instance réduite sont ramenés aux indices d'origine
+(etendre_resultat pour les projets ; les arcs d'un chemin gardent leurs étiquettes).
+"""
+import numpy as np
+
+from graphe import graphe
+from resultats import afficher_resultat
+from solveur import Limites
+
+# critères reconnus
+CRITERES_SAC = ("maxmin", "minmaxRegret", "maxOWA", "minOWA")
+CRITERES_CHEMIN = ("maxmin", "minmax_regret", "maxOWA", "minOWA")
+
+
+class Pretraitement:
+    """
+    Résultat du prétraitement d'une instance de sélection de projets.
+
+    Attributs :
+    - projets : indices (dans l'instance d'origine) des projets conservés.
+    - scenarios : indices des scénarios conservés.
+    - costs, utilities : coûts et utilités de l'instance réduite (tableaux NumPy).
+    - scenario_reduit : pour chaque scénario d'origine, indice du scénario réduit identique
+      (lui-même ou son doublon conservé), -1 s'il a été retiré par dominance.
+    - retraits : liste des (type, indice d'origine, raison) des éléments retirés.
+    """
+
+    def __init__(self, nb_projects, nb_scenarios, projets, scenarios, costs, utilities, scenario_reduit, retraits):
+        self.nb_projects = nb_projects
+        self.nb_scenarios = nb_scenarios
+        self.projets = projets
+        self.scenarios = scenarios
+        self.costs = costs
+        self.utilities = utilities
+        self.scenario_reduit = scenario_reduit
+        self.retraits = retraits
+
+    def etendre_x(self, x_reduit):
+        """
+        Vecteur de sélection dans les indices d'origine (projets retirés à 0).
+        """
+        x = np.zeros(self.nb_projects, dtype=np.asarray(x_reduit).dtype)
+        x[self.projets] = x_reduit
+        return x
+
+    def rapport(self):
+        """
+        Texte résumant les éléments retirés.
+        """
+        lignes = [f"Projets conservés : {len(self.projets)}/{self.nb_projects}, "
+                  f"scénarios conservés : {len(self.scenarios)}/{self.nb_scenarios}"]
+        for genre, indice, raison in self.retraits:
+            lignes.append(f"- {genre} {indice + 1} retiré : {raison}")
+        return "\n".join(lignes)
+
+
+def pretraiter_sac(nb_projects, nb_scenarios, costs, utilities, budget, critere="maxmin"):
+    """
+    Prétraiter une instance de sélection de projets pour le critère donné.
+    Retourne un Pretraitement.
+    """
+    if critere not in CRITERES_SAC:
+        raise ValueError(f"Critère inconnu : {critere} (attendu : {', '.join(CRITERES_SAC)})")
+
+    c = np.asarray(costs, dtype=float)[:nb_projects]
+    u = np.asarray(utilities, dtype=float)[:nb_scenarios, :nb_projects]
+    retraits = []
+
+    # projets trop chers pour le budget (x_j = 0 dans toute solution réalisable)
+    projets = np.flatnonzero(c <= budget)
+    for j in np.flatnonzero(c > budget):
+        retraits.append(("projet", int(j), f"coût {c[j]:g} > budget {budget:g}"))
+
+    # dominance et doublons de scénarios, sur les projets conservés (chaque scénario compte dans l'OWA)
+    ur = u[:, projets]
+    if critere in ("maxOWA", "minOWA"):
+        gardes, representant = list(range(nb_scenarios)), {}
+    else:
+        gardes, representant, raisons = _reduire_scenarios(ur, dominance=critere == "maxmin", plus_grand=True,
+                                                           decalage=1)
+        retraits += [("scénario", i, raison) for i, raison in raisons]
+
+    scenarios = np.asarray(gardes, dtype=int)
+    position = {i: k for k, i in enumerate(gardes)}
+    scenario_reduit = np.asarray([position.get(representant.get(i, i), -1) for i in range(nb_scenarios)])
+    return Pretraitement(nb_projects, nb_scenarios, projets, scenarios, c[projets], ur[scenarios],
+                         scenario_reduit, retraits)
+
+
+def _reduire_scenarios(valeurs, dominance, plus_grand, decalage):
+    """
+    Scénarios à conserver (lignes de valeurs). Un scénario identique à un scénario d'indice
+    plus petit est fusionné avec lui ; avec dominance, un scénario est aussi retiré si un
+    autre scénario a des valeurs <= (plus_grand) ou >= (sinon) partout, différentes quelque
+    part. Par transitivité, tout scénario retiré est dominé par un scénario conservé.
+
+    Retourne (indices conservés, {doublon: scénario conservé}, [(indice retiré, raison)]) ;
+    decalage est ajouté aux numéros de scénarios des raisons.
+    """
+    valeurs = np.asarray(valeurs)
+    nb = len(valeurs)
+    # doublons : premier[i] est le plus petit indice d'un scénario identique à i
+    _, premiers, inverse = np.unique(valeurs, axis=0, return_index=True, return_inverse=True)
+    premier = premiers[np.ravel(inverse)]
+    doublons = np.flatnonzero(premier != np.arange(nb))
+    retire = np.zeros(nb, dtype=bool)
+    retire[doublons] = True
+    raisons = {int(i): f"identique au scénario {premier[i] + decalage}" for i in doublons}
+
+    if dominance:
+        # scénarios distincts triés par somme : un scénario dominant précède ceux qu'il domine ;
+        # chaque scénario non retiré retire d'un coup tous les suivants qu'il domine
+        distincts = premiers[np.argsort(valeurs[premiers].sum(axis=1) * (1 if plus_grand else -1), kind="stable")]
+        lignes = valeurs[distincts]
+        vivant = np.ones(len(distincts), dtype=bool)
+        for a in range(len(distincts)):
+            if not vivant[a]:
+                continue
+            suivants = lignes[a + 1:]
+            domines = (suivants >= lignes[a]) if plus_grand else (suivants <= lignes[a])
+            domines = vivant[a + 1:] & domines.all(axis=1)
+            for b in np.flatnonzero(domines) + a + 1:
+                raisons[int(distincts[b])] = f"dominé par le scénario {distincts[a] + decalage}"
+            vivant[a + 1:] &= ~domines
+        retire[distincts[~vivant]] = True
+
+    gardes = np.flatnonzero(~retire).tolist()
+    # un doublon d'un scénario dominé est lui aussi dominé (pas de représentant conservé)
+    representant = {int(i): int(premier[i]) for i in doublons if not retire[premier[i]]}
+    return gardes, representant, sorted(raisons.items())
+
+
+def resoudre_pretraite(func, critere, nb_projects, nb_scenarios, costs, utilities, budget, *args, **kwargs):
+    """
+    Prétraiter l'instance, résoudre l'instance réduite avec func (maxmin, minmaxRegret,
+    maxOWA ou minOWA, appelée avec verbose=False et presolve=False), puis ramener le
+    Resultat aux indices d'origine. Le Pretraitement est dans res.infos["pretraitement"].
+    """
+    verbose = kwargs.pop("verbose", True)
+    pre = pretraiter_sac(nb_projects, nb_scenarios, costs, utilities, budget, critere)
+    if len(pre.projets) == 0:
+        # aucun projet réalisable : on résout l'instance d'origine
+        res = func(nb_projects, nb_scenarios, costs, utilities, budget, *args, verbose=verbose,
+                   presolve=False, **kwargs)
+        res.infos["pretraitement"] = pre
+        return res
+
+    limites = kwargs.get("limites")
+    if limites is not None and limites.callback is not None:
+        # solutions signalées aux indices d'origine
+        def callback(solution, rappel=limites.callback):
+            rappel(dict(solution, solution=pre.etendre_x(solution["solution"])))
+
+        kwargs["limites"] = Limites(limites.temps, limites.gap, limites.noeuds, callback)
+    if kwargs.get("depart") is not None:
+        # solution de départ restreinte aux projets conservés
+        kwargs["depart"] = np.asarray(kwargs["depart"])[pre.projets]
+    res = func(len(pre.projets), len(pre.scenarios), pre.costs, pre.utilities, budget, *args,
+               verbose=False, presolve=False, **kwargs)
+    etendre_resultat(res, pre, utilities)
+
+    if verbose:
+        print(pre.rapport())
+        afficher_resultat(res)
+    return res
+
+
+def etendre_resultat(res, pre, utilities):
+    """
+    Ramener un Resultat calculé sur l'instance réduite aux projets et scénarios d'origine.
+    """
+    u = np.asarray(utilities, dtype=float)[:pre.nb_scenarios, :pre.nb_projects]
+    if res.z_star is not None:
+        res.z_star = np.asarray(res.z_star, dtype=float)[pre.scenario_reduit]
+    if "x_star" in res.infos:
+        x_star = np.zeros((pre.nb_scenarios, pre.nb_projects))
+        x_star[:, pre.projets] = np.asarray(res.infos["x_star"], dtype=float)[pre.scenario_reduit]
+        res.infos["x_star"] = x_star
+    if res.x is not None:
+        res.x = pre.etendre_x(res.x)
+        res.valeurs = u @ res.x
+        if res.z_star is not None:
+            res.regrets = np.asarray(res.z_star) - res.valeurs
+    res.infos["pretraitement"] = pre
+
+
+class PretraitementChemin:
+    """
+    Résultat du prétraitement d'une instance de chemin robuste.
+
+    Attributs :
+    - nodes, transitions : sommets et arcs conservés (temps restreints aux scénarios conservés).
+    - scenarios : indices des scénarios conservés.
+    - retraits : liste des (type, élément, raison) des éléments retirés.
+    """
+
+    def __init__(self, nb_noeuds, nb_arcs, nb_scenarios, nodes, transitions, scenarios, retraits):
+        self.nb_noeuds = nb_noeuds
+        self.nb_arcs = nb_arcs
+        self.nb_scenarios = nb_scenarios
+        self.nodes = nodes
+        self.transitions = transitions
+        self.scenarios = scenarios
+        self.retraits = retraits
+
+    def rapport(self):
+        """
+        Texte résumant les éléments retirés.
+        """
+        lignes = [f"Sommets conservés : {len(self.nodes)}/{self.nb_noeuds}, "
+                  f"arcs conservés : {len(self.transitions)}/{self.nb_arcs}, "
+                  f"scénarios conservés : {len(self.scenarios)}/{self.nb_scenarios}"]
+        for genre, element, raison in self.retraits:
+            lignes.append(f"- {genre} {element} retiré : {raison}")
+        return "\n".join(lignes)
+
+
+def pretraiter_chemin(nodes, transitions, start, end, scenarios, critere="maxmin", graph=None):
+    """
+    Prétraiter une instance de chemin robuste pour le critère donné ("maxmin",
+    "minmax_regret", "maxOWA" ou "minOWA"). Retourne un PretraitementChemin.
+
+    Les transitions étant un dictionnaire indexé par (i, j), il n'y a pas d'arcs parallèles :
+    la dominance entre arcs de mêmes extrémités ne s'applique pas.
+    """
+    if critere not in CRITERES_CHEMIN:
+        raise ValueError(f"Critère inconnu : {critere} (attendu : {', '.join(CRITERES_CHEMIN)})")
+
+    graph = graphe(nodes, transitions, graph)
+    avant = _atteints(graph, graph.index[start], graph.sortants, graph.tete)
+    arriere = _atteints(graph, graph.index[end], graph.entrants, graph.queue)
+
+    retraits = []
+    arcs = []
+    for a, arc in enumerate(graph.arcs):
+        if avant[graph.queue[a]] and arriere[graph.tete[a]]:
+            arcs.append(a)
+        else:
+            retraits.append(("arc", arc, "sur aucun chemin du départ à l'arrivée"))
+
+    gardes_noeuds = set(graph.queue[a] for a in arcs) | set(graph.tete[a] for a in arcs)
+    gardes_noeuds |= {graph.index[start], graph.index[end]}
+    for k, node in enumerate(graph.noeuds):
+        if k not in gardes_noeuds:
+            retraits.append(("sommet", node, "sur aucun chemin du départ à l'arrivée"))
+
+    # scénarios, sur les arcs conservés (chaque scénario compte dans l'OWA : pas de réduction)
+    temps = np.asarray([graph.couts[a][:scenarios] for a in arcs], dtype=float).reshape(len(arcs), scenarios).T
+    if critere in ("maxOWA", "minOWA"):
+        gardes = list(range(scenarios))
+    else:
+        gardes, _, raisons = _reduire_scenarios(temps, dominance=critere == "maxmin", plus_grand=False, decalage=0)
+        retraits += [("scénario", s, raison) for s, raison in raisons]
+
+    nodes_reduits = [node for k, node in enumerate(graph.noeuds) if k in gardes_noeuds]
+    transitions_reduites = {graph.arcs[a]: tuple(graph.couts[a][s] for s in gardes) for a in arcs}
+    return PretraitementChemin(graph.nb_noeuds, graph.nb_arcs, scenarios, nodes_reduits, transitions_reduites,
+                               gardes, retraits)
+
+
+def _atteints(graph, source, adjacence, extremite):
+    """
+    Sommets atteignables depuis source en suivant les listes d'adjacence (parcours en profondeur).
+    """
+    vus = [False] * graph.nb_noeuds
+    vus[source] = True
+    pile = [source]
+    while pile:
+        v = pile.pop()
+        for a in adjacence[v]:
+            w = extremite[a]
+            if not vus[w]:
+                vus[w] = True
+                pile.append(w)
+    return vus
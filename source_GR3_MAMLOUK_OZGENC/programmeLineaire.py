@@ -0,0 +1,278 @@
+"""
+Programmes linéaires en nombres entiers sous forme matricielle, résolus par Gurobi ou par
+HiGHS (scipy.optimize.milp, sans licence).
+
+Un ProgrammeLineaire décrit : optimiser obj @ v sous bas <= A @ v <= haut, lb <= v <= ub,
+v_j entier pour les variables entières. Les variables sont créées par blocs (tableaux
+d'indices) et les contraintes ajoutées par blocs de lignes, stockés sous forme de triplets
+(ligne, colonne, coefficient) ; la matrice creuse n'est construite qu'à la résolution.
+
+Les critères (maxmin, minmaxRegret, maxOWA, minOWA, z_star et les chemins robustes)
+construisent leur programme ici lorsque le backend n'est pas Gurobi ; le backend "gurobi"
+d'un ProgrammeLineaire permet de comparer les deux solveurs sur le même programme.
+"""
+import time
+
+import numpy as np
+
+from solveur import BACKENDS, GRB, borne_gurobi, ecart, nouveau_modele, optimiser, statut_gurobi
+
+# statuts de scipy.optimize.milp, nommés comme ceux de Gurobi
+_STATUTS_HIGHS = {0: "OPTIMAL", 1: "TIME_LIMIT", 2: "INFEASIBLE", 3: "UNBOUNDED", 4: "NUMERIC"}
+
+
+class SolutionProgramme:
+    """
+    Solution d'un ProgrammeLineaire.
+
+    Attributs :
+    - statut : "OPTIMAL", "INFEASIBLE", "TIME_LIMIT", ... (noms des statuts de Gurobi).
+    - valeurs : valeurs des variables (tableau NumPy), None sans solution.
+    - objectif : valeur de l'objectif, None sans solution.
+    - temps : durée de la résolution (s), appel du solveur seul.
+    - temps_construction : durée de l'assemblage du programme dans resoudre (matrice creuse,
+      contraintes scipy ou modèle Gurobi), à compter dans la construction.
+    - borne, gap : meilleure borne de l'objectif et écart relatif (None si inconnus).
+    """
+
+    def __init__(self, statut, valeurs=None, objectif=None, temps=0.0, borne=None, gap=None, temps_construction=0.0):
+        self.statut = statut
+        self.valeurs = valeurs
+        self.objectif = objectif
+        self.temps = temps
+        self.temps_construction = temps_construction
+        self.borne = borne
+        self.gap = gap
+
+    @property
+    def optimal(self):
+        return self.statut == "OPTIMAL"
+
+
+class ProgrammeLineaire:
+    """
+    Programme linéaire en nombres entiers sous forme matricielle.
+
+    Utilisation :
+        pl = ProgrammeLineaire("maxmin", maximiser=True)
+        x = pl.binaires(p)
+        t = pl.variables(1, obj=1.0)
+        pl.contraintes([(u, x), (-np.ones((n, 1)), t)], bas=0.0)
+        sol = pl.resoudre("highs")
+        sol.valeurs[x]
+    """
+
+    def __init__(self, nom, maximiser=False):
+        self.nom = nom
+        self.maximiser = maximiser
+        self.nb_variables = 0
+        self.nb_contraintes = 0
+        self._obj, self._lb, self._ub, self._entier = [], [], [], []
+        self._lignes, self._colonnes, self._coefficients = [], [], []
+        self._bas, self._haut = [], []
+
+    def variables(self, n, lb=0.0, ub=np.inf, entier=False, obj=0.0):
+        """
+        Ajouter n variables (bornes, intégrité et coefficients d'objectif scalaires ou par
+        variable ; bornes par défaut [0, inf[ comme dans Gurobi). Retourne leurs indices.
+        """
+        indices = np.arange(self.nb_variables, self.nb_variables + n)
+        self.nb_variables += n
+        for liste, valeur in ((self._obj, obj), (self._lb, lb), (self._ub, ub), (self._entier, entier)):
+            liste.append(np.broadcast_to(np.asarray(valeur, dtype=float), (n,)))
+        return indices
+
+    def binaires(self, n, obj=0.0):
+        return self.variables(n, lb=0.0, ub=1.0, entier=True, obj=obj)
+
+    def contraintes(self, termes, bas=-np.inf, haut=np.inf):
+        """
+        Ajouter les lignes bas <= ∑ M @ v[indices] <= haut pour les termes (M, indices),
+        M étant une matrice NumPy (nb_lignes x len(indices)) ; bas et haut sont des scalaires
+        ou des vecteurs. Retourne les indices des lignes.
+        """
+        nb_lignes = None
+        lignes, colonnes, coefficients = [], [], []
+        for matrice, indices in termes:
+            matrice = np.atleast_2d(np.asarray(matrice, dtype=float))
+            if nb_lignes is not None and matrice.shape[0] != nb_lignes:
+                raise ValueError("Les termes d'un bloc de contraintes doivent avoir le même nombre de lignes.")
+            nb_lignes = matrice.shape[0]
+            i, j = np.nonzero(matrice)
+            lignes.append(i)
+            colonnes.append(np.asarray(indices)[j])
+            coefficients.append(matrice[i, j])
+        return self.contraintes_creuses(nb_lignes, np.concatenate(lignes), np.concatenate(colonnes),
+                                        np.concatenate(coefficients), bas, haut)
+
+    def contraintes_creuses(self, nb_lignes, lignes, colonnes, coefficients, bas=-np.inf, haut=np.inf):
+        """
+        Ajouter nb_lignes contraintes données par triplets (ligne du bloc, indice de variable,
+        coefficient), pour les grandes matrices creuses (contraintes de flot d'un graphe).
+        Retourne les indices des lignes.
+        """
+        indices = np.arange(self.nb_contraintes, self.nb_contraintes + nb_lignes)
+        self._lignes.append(np.asarray(lignes) + self.nb_contraintes)
+        self._colonnes.append(np.asarray(colonnes))
+        self._coefficients.append(np.asarray(coefficients, dtype=float))
+        self._bas.append(np.broadcast_to(np.asarray(bas, dtype=float), (nb_lignes,)))
+        self._haut.append(np.broadcast_to(np.asarray(haut, dtype=float), (nb_lignes,)))
+        self.nb_contraintes += nb_lignes
+        return indices
+
+    def matrice(self):
+        """
+        Matrice des contraintes (scipy.sparse, format CSR).
+        """
+        from scipy import sparse
+
+        if not self._lignes:
+            return sparse.csr_matrix((0, self.nb_variables))
+        return sparse.csr_matrix((np.concatenate(self._coefficients),
+                                  (np.concatenate(self._lignes), np.concatenate(self._colonnes))),
+                                 shape=(self.nb_contraintes, self.nb_variables))
+
+    def resoudre(self, backend="highs", ctx=None, time_limit=None, limites=None, debut=None, variables=None,
+                 solution=None):
+        """
+        Résoudre le programme avec le backend "highs" ou "gurobi" (ctx : ContexteSolveur
+        du backend Gurobi). time_limit : limite de temps (s) ; pour HiGHS, la limite
+        TimeLimit de ctx est utilisée à défaut. limites : solveur.Limites de l'appel commencé
+        à debut ; le callback reçoit solution(valeurs des variables d'indices variables).
+        Retourne une SolutionProgramme.
+        """
+        if backend not in BACKENDS:
+            raise ValueError(f"Backend inconnu : {backend} (attendu : {', '.join(BACKENDS)})")
+        assemblage = time.perf_counter()
+        obj = np.concatenate(self._obj) if self._obj else np.zeros(0)
+        lb = np.concatenate(self._lb) if self._lb else np.zeros(0)
+        ub = np.concatenate(self._ub) if self._ub else np.zeros(0)
+        entier = np.concatenate(self._entier).astype(bool) if self._entier else np.zeros(0, dtype=bool)
+        bas = np.concatenate(self._bas) if self._bas else np.zeros(0)
+        haut = np.concatenate(self._haut) if self._haut else np.zeros(0)
+        suivi = None
+        if limites is not None and variables is not None:
+            suivi = limites, debut, variables, solution
+        if backend == "gurobi":
+            return self._resoudre_gurobi(obj, lb, ub, entier, bas, haut, ctx, time_limit, limites, debut, suivi,
+                                         assemblage)
+        if time_limit is None and ctx is not None:
+            time_limit = ctx.params.get("TimeLimit")
+        sol = self._resoudre_highs(obj, lb, ub, entier, bas, haut, time_limit, limites, debut, assemblage)
+        if suivi is not None and sol.valeurs is not None:
+            # pas de callback dans scipy.optimize.milp : seule la solution finale est signalée
+            temps = sol.temps if debut is None else time.perf_counter() - debut
+            limites.signaler(sol.objectif, sol.borne, temps,
+                             sol.valeurs[variables] if solution is None else solution(sol.valeurs[variables]))
+        return sol
+
+    def _resoudre_highs(self, obj, lb, ub, entier, bas, haut, time_limit, limites=None, debut=None, assemblage=None):
+        from scipy.optimize import Bounds, LinearConstraint, milp
+
+        signe = -1.0 if self.maximiser else 1.0
+        options = {"disp": False}
+        if limites is not None:
+            if limites.temps is not None:
+                restant = limites.temps_restant(debut)
+                time_limit = restant if time_limit is None else min(time_limit, restant)
+            if limites.gap is not None:
+                options["mip_rel_gap"] = limites.gap
+            if limites.noeuds is not None:
+                options["node_limit"] = limites.noeuds
+        if time_limit is not None:
+            options["time_limit"] = time_limit
+        contraintes = LinearConstraint(self.matrice(), bas, haut) if self.nb_contraintes else None
+
+        debut = time.perf_counter()
+        res = milp(signe * obj, integrality=entier.astype(int), bounds=Bounds(lb, ub), constraints=contraintes,
+                   options=options)
+        temps = time.perf_counter() - debut
+        temps_construction = 0.0 if assemblage is None else debut - assemblage
+
+        statut = _STATUTS_HIGHS.get(res.status, str(res.status))
+        if res.status == 4 and limites is not None and limites.noeuds is not None and "limit reached" in res.message:
+            # limite de nœuds : statut de HiGHS non reconnu par scipy (voir res.message)
+            statut = "NODE_LIMIT"
+        borne = getattr(res, "mip_dual_bound", None)
+        borne = None if borne is None or not np.isfinite(borne) else signe * borne
+        if res.x is None:
+            return SolutionProgramme(statut, temps=temps, borne=borne, temps_construction=temps_construction)
+        objectif = signe * res.fun
+        if borne is None and statut == "OPTIMAL":
+            borne = objectif
+        return SolutionProgramme(statut, np.asarray(res.x), objectif, temps, borne, ecart(objectif, borne),
+                                 temps_construction)
+
+    def _resoudre_gurobi(self, obj, lb, ub, entier, bas, haut, ctx, time_limit, limites=None, debut=None,
+                         suivi=None, assemblage=None):
+        m = nouveau_modele(self.nom, ctx)
+        if time_limit is not None:
+            m.setParam("TimeLimit", time_limit)
+        v = m.addMVar(self.nb_variables, lb=lb, ub=ub, obj=obj,
+                      vtype=np.where(entier, GRB.INTEGER, GRB.CONTINUOUS))
+        m.ModelSense = GRB.MAXIMIZE if self.maximiser else GRB.MINIMIZE
+
+        A = self.matrice()
+        egal = bas == haut
+        for lignes, sens, rhs in ((np.flatnonzero(egal), "=", bas),
+                                  (np.flatnonzero(~egal & np.isfinite(haut)), "<", haut),
+                                  (np.flatnonzero(~egal & np.isfinite(bas)), ">", bas)):
+            if len(lignes):
+                m.addMConstr(A[lignes], v, sens, rhs[lignes])
+
+        debut_resolution = time.perf_counter()
+        if suivi is None:
+            optimiser(m, limites, debut)
+        else:
+            _, _, variables, conversion = suivi
+            optimiser(m, limites, debut, v[variables], conversion)
+        temps = time.perf_counter() - debut_resolution
+
+        solution = SolutionProgramme(statut_gurobi(m), temps=temps,
+                                     temps_construction=0.0 if assemblage is None else debut_resolution - assemblage)
+        solution.borne, solution.gap = borne_gurobi(m)
+        if m.SolCount > 0:
+            solution.valeurs = v.X
+            solution.objectif = m.objVal
+        m.dispose()
+        return solution
+
+
+def ajouter_owa(pl, termes, n, w_prime, formulation="standard", regrets=False, constante=0.0):
+    """
+    Ajouter au programme la linéarisation OWA des modèles du dépôt, pour des valeurs
+    v_i = ∑ M @ v[indices] + constante_i (termes (M, indices), M ayant n lignes) et des
+    poids transformés w'_k :
+    - regrets=False (maxOWA) : objectif ∑_k w'_k * (k * r_k - ∑_i b_ik), r_k - b_ik <= v_i ;
+    - regrets=True (minOWA) : objectif ∑_k w'_k * (k * r_k + ∑_i b_ik), r_k - b_ik >= v_i.
+    formulation "compact" : ∑ M @ v[indices] définies une seule fois par des variables
+    auxiliaires. Les b_ik >= 0 sont portés par les bornes. Retourne les indices (r, b),
+    b[i * n + k] = b_ik.
+    """
+    wp = np.asarray(w_prime, dtype=float)
+    r = pl.variables(n, obj=wp * np.arange(1, n + 1))
+    b = pl.variables(n * n, obj=(1.0 if regrets else -1.0) * np.tile(wp, n))
+
+    if formulation == "compact":
+        z = pl.variables(n, lb=-np.inf)
+        pl.contraintes(list(termes) + [(-np.eye(n), z)], bas=0.0, haut=0.0)
+        termes = [(np.eye(n), z)]
+
+    # ligne i * n + k : r_k - b_ik - (v_i - constante_i), construite par triplets (les blocs
+    # denses correspondants auraient n² lignes et n² colonnes)
+    rang = np.arange(n * n)
+    lignes, colonnes, coefficients = [rang, rang], [r[rang % n], b], [np.ones(n * n), -np.ones(n * n)]
+    for M, indices in termes:
+        # chaque coefficient de la ligne i de M est répété sur les lignes i * n + k
+        M = np.atleast_2d(np.asarray(M, dtype=float))
+        i, j = np.nonzero(M)
+        lignes.append((i[:, None] * n + np.arange(n)).ravel())
+        colonnes.append(np.repeat(np.asarray(indices)[j], n))
+        coefficients.append(np.repeat(-M[i, j], n))
+    limite = np.repeat(np.broadcast_to(np.asarray(constante, dtype=float), (n,)), n)
+    lignes, colonnes, coefficients = np.concatenate(lignes), np.concatenate(colonnes), np.concatenate(coefficients)
+    if regrets:
+        pl.contraintes_creuses(n * n, lignes, colonnes, coefficients, bas=limite)
+    else:
+        pl.contraintes_creuses(n * n, lignes, colonnes, coefficients, haut=limite)
+    return r, b
@@ -0,0 +1,380 @@
+"""
+Grands ensembles de scénarios (tirages Monte-Carlo) : source de scénarios parcourue par
+blocs, réduction à k scénarios représentatifs pondérés et évaluation hors échantillon.
+
+Les scénarios ne sont jamais tous en mémoire : une SourceScenarios produit des blocs de
+taille_bloc scénarios, lus dans un tableau projeté en mémoire (numpy.memmap, instances
+binaires de instancesBinaires.py) ou tirés par un générateur rejoué à l'identique à chaque
+parcours. reduire_scenarios choisit k médoïdes (scénarios de la source) et leurs
+probabilités en deux parcours ; les critères sont résolus sur ces k scénarios et la
+solution est évaluée sur toute la source (evaluer_hors_echantillon).
+
+Utilisation :
+    source = SourceScenarios.monte_carlo(tirage, 100_000, nb_projects)
+    res = resoudre_reduit("minmaxRegret", costs, budget, source, k=50, verbose=False)
+    res.infos["hors_echantillon"]["pire"], res.infos["reduction"].probabilites
+"""
+import time
+
+import numpy as np
+
+# nombre de scénarios par bloc
+TAILLE_BLOC = 4096
+
+# taille et nombre des échantillons sur lesquels les k-médoïdes sont calculés (méthode CLARA)
+TAILLE_ECHANTILLON = 1000
+ECHANTILLONS = 3
+
+# quantiles des valeurs hors échantillon
+QUANTILES = (0.05, 0.5, 0.95)
+
+
+class SourceScenarios:
+    """
+    Source de scénarios parcourue par blocs : l'itération produit des triplets
+    (debut, bloc, poids), bloc étant le tableau (scénarios x dimension) des scénarios
+    debut à debut + len(bloc) - 1 et poids leurs poids (None : scénarios équiprobables).
+
+    Attributs :
+    - nb_scenarios : nombre de scénarios.
+    - dimension : nombre de valeurs par scénario (utilités des projets, ou temps des arcs
+      dans l'ordre de Graphe.arcs).
+    - poids : poids positifs des scénarios (tableau, éventuellement projeté en mémoire),
+      None pour des scénarios équiprobables.
+    """
+
+    def __init__(self, blocs, nb_scenarios, dimension, poids=None):
+        # blocs : fonction sans argument retournant un nouvel itérateur de blocs
+        self._blocs = blocs
+        self.nb_scenarios = nb_scenarios
+        self.dimension = dimension
+        if poids is not None and len(poids) != nb_scenarios:
+            raise ValueError("poids doit avoir un élément par scénario.")
+        self.poids = poids
+
+    def __len__(self):
+        return self.nb_scenarios
+
+    def __iter__(self):
+        debut = 0
+        for bloc in self._blocs():
+            bloc = np.asarray(bloc, dtype=float)
+            if bloc.ndim != 2 or bloc.shape[1] != self.dimension:
+                raise ValueError(f"Bloc de forme {bloc.shape} (attendu : scénarios x {self.dimension}).")
+            fin = debut + len(bloc)
+            yield debut, bloc, None if self.poids is None else np.asarray(self.poids[debut:fin], dtype=float)
+            debut = fin
+
+    @classmethod
+    def depuis_tableau(cls, scenarios, taille_bloc=TAILLE_BLOC, poids=None):
+        """
+        Source d'un tableau scénarios x dimension (liste de listes, tableau NumPy ou
+        numpy.memmap, dont seuls les blocs parcourus sont lus).
+        """
+        if not isinstance(scenarios, np.ndarray):
+            scenarios = np.asarray(scenarios, dtype=float)
+        if scenarios.ndim != 2:
+            raise ValueError("Les scénarios doivent former un tableau scénarios x dimension.")
+        return cls(lambda: (scenarios[k:k + taille_bloc] for k in range(0, len(scenarios), taille_bloc)),
+                   len(scenarios), scenarios.shape[1], poids)
+
+    @classmethod
+    def depuis_fichier(cls, chemin, taille_bloc=TAILLE_BLOC, poids=None):
+        """
+        Source d'un fichier .npy (scénarios x dimension) projeté en mémoire.
+        """
+        return cls.depuis_tableau(np.load(chemin, mmap_mode="r"), taille_bloc, poids)
+
+    @classmethod
+    def depuis_instance(cls, repertoire, taille_bloc=TAILLE_BLOC, poids=None):
+        """
+        Source des scénarios d'une instance binaire (instancesBinaires.py) : utilités des
+        projets, ou temps des arcs d'une instance de chemin.
+        """
+        from instancesBinaires import charger_instance
+
+        instance = charger_instance(repertoire)
+        scenarios = instance["utilities"] if instance["type"] == "sac" else instance["graph"].couts.T
+        return cls.depuis_tableau(scenarios, taille_bloc, poids)
+
+    @classmethod
+    def monte_carlo(cls, tirage, nb_scenarios, dimension, taille_bloc=TAILLE_BLOC, graine=0):
+        """
+        Source de nb_scenarios tirages : tirage(rng, n) retourne un tableau n x dimension
+        (rng : numpy.random.Generator). Le générateur repart de graine à chaque parcours :
+        tous les parcours voient les mêmes scénarios.
+        """
+        def blocs():
+            rng = np.random.default_rng(graine)
+            for k in range(0, nb_scenarios, taille_bloc):
+                yield tirage(rng, min(taille_bloc, nb_scenarios - k))
+
+        return cls(blocs, nb_scenarios, dimension)
+
+    def ecrire(self, chemin):
+        """
+        Écrire les scénarios dans un fichier .npy, bloc par bloc (voir depuis_fichier).
+        """
+        tableau = np.lib.format.open_memmap(chemin, mode="w+", dtype=float, shape=(self.nb_scenarios, self.dimension))
+        for debut, bloc, _ in self:
+            tableau[debut:debut + len(bloc)] = bloc
+        tableau.flush()
+        del tableau
+
+
+class ReductionScenarios:
+    """
+    Résultat de reduire_scenarios.
+
+    Attributs :
+    - scenarios : tableau k x dimension des scénarios représentatifs (médoïdes).
+    - probabilites : masse (poids normalisés) des scénarios de la source les plus proches de
+      chaque médoïde (somme 1).
+    - indices : positions des médoïdes dans la source.
+    - distance_moyenne : distance euclidienne moyenne (pondérée) d'un scénario à son médoïde.
+    - nb_scenarios : nombre de scénarios de la source.
+    """
+
+    __slots__ = ("scenarios", "probabilites", "indices", "distance_moyenne", "nb_scenarios")
+
+    def __init__(self, scenarios, probabilites, indices, distance_moyenne, nb_scenarios):
+        self.scenarios = scenarios
+        self.probabilites = probabilites
+        self.indices = indices
+        self.distance_moyenne = distance_moyenne
+        self.nb_scenarios = nb_scenarios
+
+    def __repr__(self):
+        return (f"ReductionScenarios(k={len(self.indices)}, nb_scenarios={self.nb_scenarios}, "
+                f"distance_moyenne={self.distance_moyenne!r})")
+
+
+def reduire_scenarios(source, k, taille_echantillon=TAILLE_ECHANTILLON, echantillons=ECHANTILLONS, graine=0,
+                      max_iterations=100):
+    """
+    Réduire la source à k scénarios représentatifs pondérés (k-médoïdes, méthode CLARA) :
+    1. un parcours tire echantillons échantillons de taille_echantillon scénarios, sans
+       remise et proportionnellement aux poids (échantillonnage par réservoir A-Res) ;
+    2. les k-médoïdes de chaque échantillon sont calculés sur sa matrice des distances
+       (initialisation k-médoïdes++, puis chaque médoïde est remplacé par le scénario de son
+       groupe de plus petite somme des distances, jusqu'à stabilité) ;
+    3. un parcours affecte chaque scénario au médoïde le plus proche, pour tous les
+       échantillons à la fois : les médoïdes de plus petite distance moyenne sont gardés,
+       avec pour probabilités les poids des scénarios qui leur sont affectés.
+
+    Retourne un ReductionScenarios (médoïdes dans l'ordre de la source).
+    """
+    if k < 1:
+        raise ValueError("k doit être au moins 1.")
+    rng = np.random.default_rng(graine)
+    candidats = []
+    for indices, valeurs in _echantillons(source, max(taille_echantillon, k), echantillons, rng):
+        if len(indices) < k:
+            raise ValueError(f"La source a moins de {k} scénarios de poids non nul.")
+        medoides = _k_medoides(_distances(valeurs, valeurs), k, rng, max_iterations)
+        medoides = medoides[np.argsort(indices[medoides])]
+        candidats.append((indices[medoides], valeurs[medoides]))
+
+    # parcours 3 : distance de chaque scénario aux médoïdes de tous les échantillons
+    tous = np.concatenate([valeurs for _, valeurs in candidats])
+    couts = np.zeros(len(candidats))
+    masses = np.zeros((len(candidats), k))
+    total = 0.0
+    for _, bloc, poids in source:
+        w = np.ones(len(bloc)) if poids is None else poids
+        distances = _distances(bloc, tous).reshape(len(bloc), len(candidats), k)
+        affectation = distances.argmin(axis=2)
+        couts += w @ np.take_along_axis(distances, affectation[..., None], axis=2)[..., 0]
+        for s in range(len(candidats)):
+            masses[s] += np.bincount(affectation[:, s], weights=w, minlength=k)
+        total += w.sum()
+
+    meilleur = int(np.argmin(couts))
+    indices, valeurs = candidats[meilleur]
+    return ReductionScenarios(valeurs, masses[meilleur] / total, indices, float(couts[meilleur] / total),
+                              source.nb_scenarios)
+
+
+def _distances(a, b):
+    """
+    Matrice des distances euclidiennes entre les lignes de a et celles de b.
+    """
+    carres = (a * a).sum(axis=1)[:, None] + (b * b).sum(axis=1)[None, :] - 2.0 * (a @ b.T)
+    return np.sqrt(np.maximum(carres, 0.0))
+
+
+def _echantillons(source, taille, nombre, rng):
+    """
+    nombre échantillons pondérés sans remise (A-Res : les taille plus grandes clés
+    log(u) / poids) de la source, en un parcours ; retourne les (indices, valeurs).
+    """
+    cles = [np.empty(0) for _ in range(nombre)]
+    indices = [np.empty(0, dtype=np.int64) for _ in range(nombre)]
+    valeurs = [np.empty((0, source.dimension)) for _ in range(nombre)]
+    for debut, bloc, poids in source:
+        positions = np.arange(debut, debut + len(bloc))
+        for s in range(nombre):
+            with np.errstate(divide="ignore"):
+                c = np.log(rng.random(len(bloc))) / (1.0 if poids is None else poids)
+            c_s = np.concatenate([cles[s], c])
+            if len(c_s) > taille:
+                garder = np.argpartition(c_s, len(c_s) - taille)[len(c_s) - taille:]
+            else:
+                garder = np.arange(len(c_s))
+            # seules les lignes gardées sont copiées
+            n = len(cles[s])
+            anciens, nouveaux = garder[garder < n], garder[garder >= n] - n
+            cles[s] = np.concatenate([cles[s][anciens], c[nouveaux]])
+            indices[s] = np.concatenate([indices[s][anciens], positions[nouveaux]])
+            valeurs[s] = np.concatenate([valeurs[s][anciens], bloc[nouveaux]])
+    # les scénarios de poids nul (clé -inf) ne sont jamais retenus
+    return [(i[np.isfinite(c)], v[np.isfinite(c)]) for c, i, v in zip(cles, indices, valeurs)]
+
+
+def _k_medoides(distances, k, rng, max_iterations):
+    """
+    Indices des k médoïdes d'un ensemble de points (matrice des distances).
+    """
+    m = len(distances)
+    medoides = np.empty(k, dtype=np.int64)
+    medoides[0] = rng.integers(m)
+    plus_proche = distances[medoides[0]].copy()
+    for j in range(1, k):
+        p = plus_proche ** 2
+        if p.sum() > 0:
+            medoides[j] = rng.choice(m, p=p / p.sum())
+        else:
+            # points confondus avec les médoïdes déjà choisis
+            medoides[j] = rng.choice(np.setdiff1d(np.arange(m), medoides[:j]))
+        plus_proche = np.minimum(plus_proche, distances[medoides[j]])
+
+    for _ in range(max_iterations):
+        affectation = distances[:, medoides].argmin(axis=1)
+        nouveaux = medoides.copy()
+        for j in range(k):
+            groupe = np.flatnonzero(affectation == j)
+            if len(groupe):
+                nouveaux[j] = groupe[distances[np.ix_(groupe, groupe)].sum(axis=1).argmin()]
+        if np.array_equal(nouveaux, medoides):
+            break
+        medoides = nouveaux
+    return medoides
+
+
+def evaluer_hors_echantillon(x, source, maximiser=True, z_star=None, quantiles=QUANTILES):
+    """
+    Évaluer une solution sur tous les scénarios de la source, par blocs : z_i(x) = s_i · x.
+
+    Paramètres :
+    - x : vecteur de sélection des projets, ou indicatrice des arcs du chemin dans l'ordre de
+      Graphe.arcs (voir indicatrice_chemin).
+    - maximiser : True pour des utilités (le pire scénario est celui de plus petite valeur,
+      regret z*_i - z_i(x)), False pour des temps (pire scénario de plus grande valeur, regret
+      z_i(x) - z*_i).
+    - z_star : None, tableau des z*_i de la source ou fonction bloc -> z*_i du bloc, pour les
+      regrets hors échantillon.
+    - quantiles : quantiles (pondérés) des valeurs.
+
+    Seules les valeurs z_i(x) (et les regrets) sont gardées, un flottant par scénario.
+    Retourne un dictionnaire : nb_scenarios, pire, indice_pire, meilleur, moyenne et
+    ecart_type (pondérés par les poids de la source), quantiles {q: valeur} et, avec z_star,
+    regret_max, indice_regret_max et regret_moyen.
+    """
+    x = np.asarray(x, dtype=float)
+    valeurs = np.empty(source.nb_scenarios)
+    regrets = np.empty(source.nb_scenarios) if z_star is not None else None
+    for debut, bloc, _ in source:
+        fin = debut + len(bloc)
+        valeurs[debut:fin] = bloc @ x
+        if regrets is not None:
+            zs = np.asarray(z_star(bloc) if callable(z_star) else z_star[debut:fin], dtype=float)
+            regrets[debut:fin] = zs - valeurs[debut:fin] if maximiser else valeurs[debut:fin] - zs
+
+    w = np.ones(len(valeurs)) if source.poids is None else np.asarray(source.poids, dtype=float)
+    moyenne = np.average(valeurs, weights=w)
+    indice_pire = int(valeurs.argmin() if maximiser else valeurs.argmax())
+    ordre = np.argsort(valeurs)
+    cumul = np.cumsum(w[ordre]) / w.sum()
+    sortie = {"nb_scenarios": len(valeurs), "pire": float(valeurs[indice_pire]), "indice_pire": indice_pire,
+              "meilleur": float(valeurs.max() if maximiser else valeurs.min()), "moyenne": float(moyenne),
+              "ecart_type": float(np.sqrt(np.average((valeurs - moyenne) ** 2, weights=w))),
+              "quantiles": {q: float(valeurs[ordre[min(np.searchsorted(cumul, q), len(ordre) - 1)]])
+                            for q in quantiles}}
+    if regrets is not None:
+        indice = int(regrets.argmax())
+        sortie.update(regret_max=float(regrets[indice]), indice_regret_max=indice,
+                      regret_moyen=float(np.average(regrets, weights=w)))
+    return sortie
+
+
+def resoudre_reduit(critere, costs, budget, source, k, weights=None, taille_echantillon=TAILLE_ECHANTILLON,
+                    echantillons=ECHANTILLONS, graine=0, regrets_hors_echantillon=False, engine="auto", **options):
+    """
+    Sélection de projets sur un grand ensemble de scénarios : réduire la source (utilités,
+    dimension = nombre de projets) à k scénarios (reduire_scenarios), résoudre le critère
+    ("maxmin", "minmaxRegret", "maxOWA" ou "minOWA") sur ces scénarios, puis évaluer la
+    solution sur toute la source (evaluer_hors_echantillon).
+
+    Paramètres :
+    - weights : poids OWA des k scénarios réduits (critères OWA).
+    - regrets_hors_echantillon : calculer z*_i pour chaque scénario de la source, bloc par
+      bloc (utils.z_star, moteur engine ; "dp" est vectorisé sur les scénarios d'un bloc
+      pour des coûts entiers), pour les regrets hors échantillon.
+    - options : arguments nommés de la fonction de résolution (verbose, backend, formulation,
+      limites, ...).
+
+    Retourne le Resultat du critère sur les scénarios réduits, avec infos["reduction"]
+    (ReductionScenarios), infos["hors_echantillon"] (sans solution : absent),
+    infos["temps_reduction"] et infos["temps_evaluation"].
+    """
+    from cli import CRITERES
+
+    if CRITERES.get(critere, ("",))[0] != "sac":
+        raise ValueError(f"Critère inconnu : {critere} (attendu : maxmin, minmaxRegret, maxOWA, minOWA)")
+    if len(costs) != source.dimension:
+        raise ValueError("La source doit avoir une utilité par projet.")
+    owa = critere.endswith("OWA")
+    if owa and (weights is None or len(weights) != k):
+        raise ValueError(f"Les critères OWA requièrent k = {k} poids (un par scénario réduit).")
+
+    debut = time.perf_counter()
+    reduction = reduire_scenarios(source, k, taille_echantillon, echantillons, graine)
+    temps_reduction = time.perf_counter() - debut
+
+    _, module, fonction = CRITERES[critere]
+    args = [len(costs), k, costs, reduction.scenarios, budget] + ([weights] if owa else [])
+    res = getattr(__import__(module), fonction)(*args, **options)
+    res.infos["reduction"] = reduction
+    res.infos["temps_reduction"] = temps_reduction
+
+    debut = time.perf_counter()
+    if res.x is not None:
+        z_star = None
+        if regrets_hors_echantillon:
+            import utils as ut
+
+            def z_star(bloc):
+                return ut.z_star(len(costs), len(bloc), costs, bloc, budget, engine=engine, cache=False,
+                                 backend=options.get("backend"))[0]
+        res.infos["hors_echantillon"] = evaluer_hors_echantillon(res.x, source, z_star=z_star)
+    res.infos["temps_evaluation"] = time.perf_counter() - debut
+    return res
+
+
+def graphe_reduit(graph, reduction):
+    """
+    Graphe des scénarios réduits d'une source de temps d'arcs (colonnes dans l'ordre de
+    graph.arcs), à passer aux fonctions de cheminRobuste.py (graph=..., nodes et transitions
+    None, scenarios = k).
+    """
+    from graphe import Graphe
+
+    return Graphe.depuis_tableaux(graph.queue, graph.tete, reduction.scenarios, noeuds=graph.noeuds)
+
+
+def indicatrice_chemin(graph, chemin):
+    """
+    Vecteur 0/1 des arcs de graph (ordre de graph.arcs) empruntés par le chemin (liste d'arcs).
+    """
+    arcs = {tuple(arc) for arc in chemin}
+    return np.fromiter((tuple(arc) in arcs for arc in graph.arcs), dtype=float, count=graph.nb_arcs)
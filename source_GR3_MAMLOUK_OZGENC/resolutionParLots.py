@@ -0,0 +1,215 @@
+"""
+Résolution par lots : un grand nombre d'instances indépendantes, pour un même critère,
+dans un pool de processus.
+
+Les instances sont lues à la demande dans l'itérable et au plus max_en_cours sont en
+cours à la fois (mémoire bornée pour des milliers d'instances) ; les résultats sont
+produits au fur et à mesure de la fin des résolutions, avec la position de l'instance
+dans l'itérable. Chaque processus worker crée un seul environnement Gurobi
+(ContexteSolveur), limité à threads threads, pour toutes ses instances.
+
+Une instance est :
+- un chemin de fichier JSON ou de répertoire d'instance binaire (formats de cli.py),
+  chargé dans le worker : c'est la forme à privilégier avec le pool de processus ;
+- un dictionnaire au format JSON de cli.py ;
+- une liste ou un tuple des arguments positionnels de la fonction de résolution.
+
+Utilisation :
+    for res in resoudre_lots("minOWA", ["a.json", "b/", ...], n_jobs=8, formulation="compact"):
+        print(res.indice, res.statut, res.temps["resolution"])
+"""
+import os
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, ThreadPoolExecutor, wait
+
+from cli import CRITERES, arguments_instance, charger_instance, en_dict, statut_solution
+from parallele import MODES, nb_workers, threads_par_worker
+from solveur import ContexteSolveur, choisir_backend
+
+# nombre d'instances en cours par worker (soumises et non encore produites) par défaut
+EN_COURS_PAR_WORKER = 2
+
+# variables d'environnement des threads de NumPy (BLAS, OpenMP), fixées dans chaque worker
+_THREADS_CALCUL = ("OMP_NUM_THREADS", "OPENBLAS_NUM_THREADS", "MKL_NUM_THREADS")
+
+# contexte solveur du processus worker (voir _initialiser_worker)
+_ctx_worker = None
+
+
+class ResultatLot:
+    """
+    Résultat de la résolution d'une instance d'un lot.
+
+    Attributs :
+    - indice : position de l'instance dans l'itérable.
+    - instance : chemin de l'instance (None pour une instance donnée en mémoire).
+    - critere : critère résolu.
+    - statut : statut de la résolution, "ERREUR" si une exception a été levée.
+    - solution : retour de la fonction de résolution (Resultat, ou (chemin, valeur) pour le
+      chemin robuste), None en cas d'erreur.
+    - infos : dictionnaire complété par les fonctions de chemin robuste (statut, borne, gap).
+    - erreur : message de l'exception levée au chargement ou à la résolution, None sinon.
+    - temps : durées (s) : attente (de la soumission au début dans le worker), chargement,
+      resolution et total (de la soumission à la fin de la résolution).
+    - worker : identifiant (pid) du processus qui a résolu l'instance.
+    """
+
+    __slots__ = ("indice", "instance", "critere", "statut", "solution", "infos", "erreur", "temps", "worker")
+
+    def __init__(self, indice, instance, critere, statut=None, solution=None, infos=None, erreur=None,
+                 temps=None, worker=None):
+        self.indice = indice
+        self.instance = instance
+        self.critere = critere
+        self.statut = statut
+        self.solution = solution
+        self.infos = infos if infos is not None else {}
+        self.erreur = erreur
+        self.temps = temps if temps is not None else {}
+        self.worker = worker
+
+    @property
+    def optimal(self):
+        return self.statut == "OPTIMAL"
+
+    def en_dict(self):
+        """
+        Résultat sous forme de dictionnaire sérialisable en JSON (format de la commande solve
+        de cli.py, avec l'indice, l'instance, le worker et les temps).
+        """
+        if self.erreur is not None:
+            sortie = {"critere": self.critere, "statut": self.statut, "erreur": self.erreur}
+        else:
+            sortie = en_dict(self.critere, self.solution, self.infos)
+        sortie.update(indice=self.indice, instance=self.instance, worker=self.worker, temps=dict(self.temps))
+        return sortie
+
+    def __repr__(self):
+        return f"ResultatLot(indice={self.indice!r}, critere={self.critere!r}, statut={self.statut!r})"
+
+
+def resoudre_lots(critere, instances, n_jobs=None, threads=None, max_en_cours=None, mode="process",
+                  backend=None, **options):
+    """
+    Résoudre chaque instance de l'itérable pour le critère et produire les ResultatLot dans
+    l'ordre de fin des résolutions (générateur ; ResultatLot.indice donne la position de
+    l'instance).
+
+    Paramètres :
+    - critere : nom d'un critère de cli.CRITERES ("maxmin", ..., "chemin_minOWA").
+    - instances : itérable d'instances (voir le module), parcouru à la demande.
+    - n_jobs : nombre de workers (1 = exécution séquentielle, None = tous les cœurs).
+    - threads : threads de Gurobi et de NumPy par instance (par défaut, les cœurs répartis
+      entre les workers, voir parallele.threads_par_worker).
+    - max_en_cours : nombre maximal d'instances soumises et non encore produites (par
+      défaut EN_COURS_PAR_WORKER par worker).
+    - mode : "process" (ProcessPoolExecutor) ou "thread" (ThreadPoolExecutor).
+    - backend : "gurobi", "highs" ou None (voir solveur.choisir_backend).
+    - options : arguments nommés de la fonction de résolution (presolve, formulation,
+      algorithm, limites, ...), identiques pour toutes les instances.
+
+    Les erreurs d'une instance (fichier illisible, champ manquant, ...) sont retournées dans
+    son ResultatLot (statut "ERREUR") sans interrompre le lot. Arrêter l'itération annule les
+    instances soumises qui n'ont pas commencé.
+    """
+    if critere not in CRITERES:
+        raise ValueError(f"Critère inconnu : {critere} (attendu : {', '.join(CRITERES)})")
+    if mode not in MODES:
+        raise ValueError(f"Mode inconnu : {mode} (attendu : {', '.join(MODES)})")
+    backend = choisir_backend(backend)
+    options = dict(options, backend=backend)
+    n = nb_workers(n_jobs)
+    if threads is None:
+        threads = threads_par_worker(n_jobs)
+    if max_en_cours is None:
+        max_en_cours = EN_COURS_PAR_WORKER * n
+    if max_en_cours < 1:
+        raise ValueError("max_en_cours doit être au moins 1.")
+
+    # pool de processus : un contexte par worker (_initialiser_worker) ; sinon un contexte
+    # partagé, qui crée un environnement par thread (voir ContexteSolveur)
+    ctx = None
+    if backend == "gurobi" and (n <= 1 or mode == "thread"):
+        ctx = ContexteSolveur(threads=threads)
+    try:
+        if n <= 1:
+            for indice, instance in enumerate(instances):
+                yield _resoudre(indice, instance, critere, options, time.time(), ctx)
+            return
+
+        if mode == "process":
+            executor = ProcessPoolExecutor(max_workers=n, initializer=_initialiser_worker, initargs=(backend, threads))
+        else:
+            executor = ThreadPoolExecutor(max_workers=n)
+        en_cours = set()
+        try:
+            for indice, instance in enumerate(instances):
+                en_cours.add(executor.submit(_resoudre, indice, instance, critere, options, time.time(), ctx))
+                if len(en_cours) >= max_en_cours:
+                    termines, en_cours = wait(en_cours, return_when=FIRST_COMPLETED)
+                    for future in termines:
+                        yield future.result()
+            while en_cours:
+                termines, en_cours = wait(en_cours, return_when=FIRST_COMPLETED)
+                for future in termines:
+                    yield future.result()
+        finally:
+            executor.shutdown(wait=True, cancel_futures=True)
+    finally:
+        if ctx is not None:
+            ctx.dispose()
+
+
+def _initialiser_worker(backend, threads):
+    """
+    Initialisation d'un processus worker : limite des threads de NumPy (effective si NumPy
+    n'est pas encore importé dans le worker) et environnement Gurobi du worker.
+    """
+    global _ctx_worker
+    for nom in _THREADS_CALCUL:
+        os.environ[nom] = str(threads)
+    if backend == "gurobi":
+        _ctx_worker = ContexteSolveur(threads=threads)
+
+
+def _arguments(instance, critere):
+    """
+    Arguments positionnels et nommés de la fonction de résolution pour une instance.
+    """
+    if isinstance(instance, (str, os.PathLike)):
+        return charger_instance(os.fspath(instance), critere)
+    if isinstance(instance, dict):
+        return arguments_instance(instance, critere), {}
+    return list(instance), {}
+
+
+def _resoudre(indice, instance, critere, options, soumission, ctx=None):
+    """
+    Résoudre une instance du lot (dans le worker) ; soumission : date (time.time()) de la
+    soumission au pool.
+    """
+    debut = time.time()
+    temps = {"attente": debut - soumission}
+    chemin = os.fspath(instance) if isinstance(instance, (str, os.PathLike)) else None
+    resultat = ResultatLot(indice, chemin, critere, temps=temps, worker=os.getpid())
+    genre, module, fonction = CRITERES[critere]
+    try:
+        args, nommes = _arguments(instance, critere)
+        temps["chargement"] = time.time() - debut
+
+        debut_resolution = time.time()
+        func = getattr(__import__(module), fonction)
+        options = dict(options, **nommes, ctx=ctx if ctx is not None else _ctx_worker)
+        if genre == "sac" or critere.endswith("OWA"):
+            options.setdefault("verbose", False)
+        if genre == "chemin":
+            options["infos"] = resultat.infos
+        resultat.solution = func(*args, **options)
+        resultat.statut = statut_solution(critere, resultat.solution, resultat.infos)
+        temps["resolution"] = time.time() - debut_resolution
+    except Exception as e:
+        # une instance en erreur ne doit pas interrompre le lot
+        resultat.statut = "ERREUR"
+        resultat.erreur = f"{type(e).__name__}: {e}"
+    temps["total"] = time.time() - soumission
+    return resultat
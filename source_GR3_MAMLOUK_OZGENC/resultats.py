@@ -0,0 +1,156 @@
+class Resultat:
+    """
+    Résultat d'une résolution de maxmin, minmaxRegret, maxOWA ou minOWA.
+
+    Attributs :
+    - critere : "maxmin", "minmaxRegret", "maxOWA" ou "minOWA".
+    - x : vecteur de sélection des projets (tableau NumPy de 0/1), None sans solution.
+    - objectif : valeur de la fonction objectif.
+    - valeurs : utilités z_i(x) de la solution dans chaque scénario (tableau NumPy).
+    - regrets : regrets z*_i - z_i(x) (critères à base de regret, None sinon).
+    - z_star : valeurs optimales z*_i de chaque scénario (critères à base de regret).
+    - statut : statut de la résolution ("OPTIMAL", "INFEASIBLE", "TIME_LIMIT", ...).
+    - borne, gap : meilleure borne de l'objectif et écart relatif de la solution à cette borne
+      (solution retournée à une limite de solveur.Limites), None si inconnus.
+    - temps_construction, temps_resolution, temps_extraction : durées (s) de construction du modèle,
+      de résolution et d'extraction de la solution.
+    - infos : dictionnaire de valeurs complémentaires (r_k, b_ik, w'_k, solutions de z*, ...).
+    """
+
+    __slots__ = ("critere", "x", "objectif", "valeurs", "regrets", "z_star", "statut", "borne", "gap",
+                 "temps_construction", "temps_resolution", "temps_extraction", "infos")
+
+    def __init__(self, critere, statut=None, x=None, objectif=None, valeurs=None, regrets=None,
+                 z_star=None, temps_construction=0.0, temps_resolution=0.0, temps_extraction=0.0, infos=None,
+                 borne=None, gap=None):
+        self.critere = critere
+        self.statut = statut
+        self.borne = borne
+        self.gap = gap
+        self.x = x
+        self.objectif = objectif
+        self.valeurs = valeurs
+        self.regrets = regrets
+        self.z_star = z_star
+        self.temps_construction = temps_construction
+        self.temps_resolution = temps_resolution
+        self.temps_extraction = temps_extraction
+        self.infos = infos if infos is not None else {}
+
+    @property
+    def optimal(self):
+        return self.statut == "OPTIMAL"
+
+    @property
+    def selection(self):
+        """
+        Indices (à partir de 1) des projets sélectionnés.
+        """
+        if self.x is None:
+            return []
+        return [j + 1 for j in range(len(self.x)) if self.x[j] > 0.5]
+
+    def en_dict(self):
+        """
+        Résultat sous forme de dictionnaire de types Python (sérialisable en JSON) ; les
+        infos ne sont pas reprises.
+        """
+        def liste(v):
+            return None if v is None else [_scalaire(e) for e in v]
+
+        return {"critere": self.critere, "statut": self.statut, "objectif": _scalaire(self.objectif),
+                "borne": _scalaire(self.borne), "gap": _scalaire(self.gap),
+                "selection": self.selection, "x": liste(self.x), "valeurs": liste(self.valeurs),
+                "regrets": liste(self.regrets), "z_star": liste(self.z_star),
+                "temps_construction": self.temps_construction, "temps_resolution": self.temps_resolution,
+                "temps_extraction": self.temps_extraction}
+
+    def __repr__(self):
+        return (f"Resultat(critere={self.critere!r}, statut={self.statut!r}, objectif={self.objectif!r}, "
+                f"selection={self.selection!r})")
+
+
+def _scalaire(v):
+    """
+    Convertir un scalaire NumPy en int ou float Python (None inchangé).
+    """
+    return v.item() if hasattr(v, "item") else v
+
+
+def afficher_resultat(res):
+    """
+    Afficher un résultat dans le terminal, dans le format de chaque critère.
+    """
+    if res.x is None:
+        print(f"Pas de solution ({res.critere}). Statut : {res.statut}")
+        return
+    _FORMATS[res.critere](res)
+
+
+def _afficher_maxmin(res):
+    print("")
+    print("Solution optimale:")
+    for j in range(len(res.x)):
+        print("x%d = %d" % (j + 1, res.x[j]))
+    print("")
+    print("Valeur de la fonction objective (t) :", res.objectif)
+    print("Utilités dans les scénarios:", res.valeurs.tolist())
+
+
+def _afficher_minmax_regret(res):
+    print("")
+    x_star = res.infos.get("x_star")
+    print("z*_i pour chaque scénario i:", [float(z) for z in res.z_star])
+    print("Valeurs des variables x dans chaque scénario:",
+          None if x_star is None else [[float(v) for v in x] for x in x_star])
+
+    print("Solution optimale:")
+    for j in range(len(res.x)):
+        print("x%d = %d" % (j + 1, res.x[j]))
+
+    print("")
+    print("Valeur de la fonction objective (minmax regret) :", res.objectif)
+    print("Utilités dans les scénarios:", res.valeurs.tolist())
+    print("Regrets dans les scénarios:", res.regrets.tolist())
+
+
+def _afficher_max_owa(res):
+    print("\nSolution optimale:")
+    for j in range(len(res.x)):
+        print(f"x{j + 1} = {float(res.x[j])}")
+    print("\nValeur de la fonction objectif:", res.objectif)
+    print("Valeurs des r_k dans chaque scénario:", res.infos.get("r"))
+    print("w'_k:", res.infos.get("w_prime"))
+    print("b_ik:", res.infos.get("b"))
+
+
+def _afficher_min_owa(res):
+    print("Solution optimale:")
+    for j in range(len(res.x)):
+        print(f"x{j + 1} = {float(res.x[j])}")
+    print ("regrets:")
+    for i in range(len(res.z_star)):
+        print("z_star_", i + 1, "=", res.z_star[i])
+        print(f"regret_{i + 1} = {res.regrets[i]}")
+    print("\nValeur de la fonction objectif:", res.objectif)
+    print("Valeurs des r_k dans chaque scénario:", res.infos.get("r"))
+    print("w'_k:", res.infos.get("w_prime"))
+    print("b_ik:", res.infos.get("b"))
+
+
+_FORMATS = {
+    "maxmin": _afficher_maxmin,
+    "minmaxRegret": _afficher_minmax_regret,
+    "maxOWA": _afficher_max_owa,
+    "minOWA": _afficher_min_owa,
+}
+
+
+def afficher_frontiere(resultats):
+    """
+    Afficher une frontière budget -> valeur (résultats de maxmin_budgets ou minmaxRegret_budgets).
+    """
+    print("Budget | Valeur | Projets sélectionnés")
+    for res in resultats:
+        valeur = res.objectif if res.x is not None else res.statut
+        print(f"{res.infos['budget']} | {valeur} | {res.selection}")
@@ -0,0 +1,492 @@
+"""
+Service local de résolution : serveur HTTP/JSON-RPC 2.0 (asyncio, bibliothèque standard)
+autour des fonctions de résolution de cli.CRITERES.
+
+Les modules des solveurs sont importés et les environnements Gurobi créés au démarrage ;
+chaque worker (un thread) garde pour les graphes qu'il a déjà vus le Graphe et les modèles
+OWA de Gurobi (gabarits, au plus cheminRobuste.MODELES_MAX par graphe, voir
+cheminRobuste.gabarit_owa), et les z* restent dans le cache par défaut de cacheZStar.py :
+en régime établi, une requête ne coûte que sa résolution.
+Les requêtes d'un même graphe vont toujours au même worker (un modèle n'est utilisé que
+par le thread de son environnement). Chaque worker a une file bornée (taille_file) : une
+requête refusée reçoit l'erreur FILE_PLEINE (HTTP 503). Les requêtes identiques reçues
+pendant une résolution en cours en partagent le résultat (champ "coalescee").
+
+Requête (POST /, un objet ou un lot JSON-RPC) :
+    {"jsonrpc": "2.0", "id": 1, "method": "solve",
+     "params": {"critere": "chemin_minOWA", "instance": {...}, "options": {"formulation": "compact"},
+                "limites": {"temps": 5, "gap": 0.01}}}
+instance : dictionnaire au format JSON de cli.py, ou chemin d'un fichier JSON ou d'un
+répertoire d'instance binaire lisible par le serveur ; options : arguments nommés de la
+fonction de résolution ; limites : arguments de solveur.Limites (sans callback).
+Le résultat est celui de la commande solve de cli.py. Méthodes : solve, criteres, etat
+(aussi par GET /etat).
+
+Lancement et appel :
+    python -m serveurResolution --port 8765 --workers 4
+    appel_rpc("solve", {"critere": "maxmin", "instance": {...}}, port=8765)
+"""
+import argparse
+import asyncio
+import contextlib
+import json
+import os
+import signal
+import time
+import urllib.error
+import urllib.request
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+from cacheZStar import empreinte
+from cli import CRITERES, arguments_instance, charger_instance, en_dict
+from parallele import nb_workers, threads_par_worker
+from solveur import ContexteSolveur, Limites, choisir_backend
+
+HOTE = "127.0.0.1"
+PORT = 8765
+
+# nombre maximal de requêtes en attente par worker
+TAILLE_FILE = 64
+
+# nombre maximal de graphes dont un worker garde les gabarits
+GABARITS_MAX = 32
+
+# taille maximale du corps d'une requête HTTP (octets)
+TAILLE_MAX_REQUETE = 256 * 1024 * 1024
+
+# codes d'erreur JSON-RPC 2.0 (FILE_PLEINE et ERREUR_RESOLUTION : codes propres au service)
+ERREUR_ANALYSE, REQUETE_INVALIDE, METHODE_INCONNUE, PARAMETRES_INVALIDES, ERREUR_INTERNE = (
+    -32700, -32600, -32601, -32602, -32603)
+FILE_PLEINE, ERREUR_RESOLUTION = -32000, -32001
+
+# arguments gérés par le service (interdits dans options)
+_RESERVES = ("ctx", "graph", "modeles", "infos", "limites")
+
+_STATUTS_HTTP = {200: "OK", 204: "No Content", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed",
+                 413: "Payload Too Large", 503: "Service Unavailable"}
+
+
+class ErreurRpc(Exception):
+    """
+    Erreur retournée au client dans la réponse JSON-RPC (code, message).
+    """
+
+    def __init__(self, code, message):
+        super().__init__(message)
+        self.code = code
+        self.message = message
+
+
+class _Gabarit:
+    """
+    Objets réutilisés entre les requêtes sur un même graphe : Graphe et modèles OWA.
+    """
+
+    __slots__ = ("graph", "modeles")
+
+    def __init__(self, graph):
+        self.graph = graph
+        self.modeles = {}
+
+
+class _Worker:
+    """
+    Worker du service : un thread, son ContexteSolveur et ses gabarits (les méthodes autres
+    que file s'exécutent dans le thread du worker).
+    """
+
+    def __init__(self, backend, threads, gabarits_max):
+        self.backend = backend
+        self.threads = threads
+        self.gabarits_max = gabarits_max
+        self.executor = ThreadPoolExecutor(max_workers=1)
+        self.file = None
+        self.ctx = None
+        self.gabarits = OrderedDict()
+        self.statistiques = {"resolutions": 0, "gabarits_reutilises": 0, "gabarits_construits": 0}
+
+    def initialiser(self):
+        if self.backend == "gurobi":
+            self.ctx = ContexteSolveur(threads=self.threads)
+
+    def arreter(self):
+        from cheminRobuste import liberer_modeles
+
+        for gabarit in self.gabarits.values():
+            liberer_modeles(gabarit.modeles)
+        self.gabarits.clear()
+        if self.ctx is not None:
+            self.ctx.dispose()
+
+    def gabarit(self, cle, args, graph=None):
+        """
+        Gabarit du graphe de clé cle, construit au premier appel (LRU de gabarits_max graphes).
+        """
+        if cle in self.gabarits:
+            self.gabarits.move_to_end(cle)
+            self.statistiques["gabarits_reutilises"] += 1
+            return self.gabarits[cle]
+        from cheminRobuste import liberer_modeles
+        from graphe import Graphe
+
+        if len(self.gabarits) >= self.gabarits_max:
+            liberer_modeles(self.gabarits.popitem(last=False)[1].modeles)
+        self.gabarits[cle] = _Gabarit(graph if graph is not None else Graphe(args[0], args[1]))
+        self.statistiques["gabarits_construits"] += 1
+        return self.gabarits[cle]
+
+    def resoudre(self, critere, instance, options, limites, cle_graphe, soumission):
+        debut = time.perf_counter()
+        genre, module, fonction = CRITERES[critere]
+        if isinstance(instance, str):
+            args, nommes = charger_instance(instance, critere)
+        else:
+            args, nommes = arguments_instance(instance, critere), {}
+        options = dict(options, **nommes, ctx=self.ctx)
+        options.setdefault("backend", self.backend)
+        if limites:
+            options["limites"] = Limites(**limites)
+        if genre == "sac" or critere.endswith("OWA"):
+            options.setdefault("verbose", False)
+        infos = {}
+        if genre == "chemin":
+            gabarit = self.gabarit(cle_graphe, args, options.get("graph"))
+            options["graph"] = gabarit.graph
+            options["infos"] = infos
+            if critere.endswith("OWA") and options["backend"] == "gurobi":
+                options["modeles"] = gabarit.modeles
+
+        solution = getattr(__import__(module), fonction)(*args, **options)
+        self.statistiques["resolutions"] += 1
+        sortie = en_dict(critere, solution, infos)
+        fin = time.perf_counter()
+        sortie["temps"] = {"attente": debut - soumission, "resolution": fin - debut, "total": fin - soumission}
+        return sortie
+
+
+class ServeurResolution:
+    """
+    Serveur HTTP/JSON-RPC de résolution (voir le module).
+
+    Paramètres :
+    - hote, port : adresse d'écoute (port 0 : port libre, lu dans self.port après demarrer).
+    - workers : nombre de workers (None = tous les cœurs).
+    - threads : threads de Gurobi par worker (par défaut, les cœurs répartis entre les workers).
+    - taille_file : nombre maximal de requêtes en attente par worker.
+    - backend : "gurobi", "highs" ou None (voir solveur.choisir_backend).
+    - gabarits_max : nombre maximal de graphes dont chaque worker garde les gabarits.
+
+    Utilisation :
+        serveur = ServeurResolution(port=0, workers=2)
+        await serveur.demarrer()
+        resultat = await serveur.appeler("solve", {"critere": "maxmin", "instance": {...}})
+        await serveur.arreter()
+    """
+
+    def __init__(self, hote=HOTE, port=PORT, workers=None, threads=None, taille_file=TAILLE_FILE, backend=None,
+                 gabarits_max=GABARITS_MAX):
+        self.hote = hote
+        self.port = port
+        self.backend = choisir_backend(backend)
+        n = nb_workers(workers)
+        threads = threads if threads is not None else threads_par_worker(workers)
+        self.taille_file = taille_file
+        self._workers = [_Worker(self.backend, threads, gabarits_max) for _ in range(n)]
+        self._taches = []
+        self._en_vol = {}
+        self._serveur = None
+        self.statistiques = {"requetes": 0, "coalescees": 0, "refusees": 0, "erreurs": 0}
+
+    async def demarrer(self):
+        """
+        Importer les solveurs, créer les environnements des workers et ouvrir le port.
+        """
+        for module in {module for _, module, _ in CRITERES.values()}:
+            __import__(module)
+        loop = asyncio.get_running_loop()
+        for worker in self._workers:
+            worker.file = asyncio.Queue(maxsize=self.taille_file)
+            await loop.run_in_executor(worker.executor, worker.initialiser)
+            self._taches.append(asyncio.create_task(self._boucle(worker)))
+        self._serveur = await asyncio.start_server(self._connexion, self.hote, self.port)
+        self.port = self._serveur.sockets[0].getsockname()[1]
+
+    async def servir(self):
+        """
+        Démarrer et servir jusqu'à l'annulation ou à un signal SIGINT ou SIGTERM.
+        """
+        await self.demarrer()
+        loop = asyncio.get_running_loop()
+        tache = asyncio.current_task()
+        for sig in (signal.SIGINT, signal.SIGTERM):
+            # pas de gestionnaire de signaux dans la boucle asyncio sous Windows
+            with contextlib.suppress(NotImplementedError):
+                loop.add_signal_handler(sig, tache.cancel)
+        try:
+            await self._serveur.serve_forever()
+        except asyncio.CancelledError:
+            pass
+        finally:
+            await self.arreter()
+
+    async def arreter(self):
+        """
+        Fermer le port, abandonner les requêtes en attente et libérer les workers.
+        """
+        if self._serveur is not None:
+            self._serveur.close()
+            await self._serveur.wait_closed()
+            self._serveur = None
+        for tache in self._taches:
+            tache.cancel()
+        await asyncio.gather(*self._taches, return_exceptions=True)
+        self._taches = []
+        loop = asyncio.get_running_loop()
+        for worker in self._workers:
+            await loop.run_in_executor(worker.executor, worker.arreter)
+            worker.executor.shutdown(wait=True)
+
+    def etat(self):
+        """
+        Statistiques du service : requêtes, files, résolutions et gabarits.
+        """
+        etat = dict(self.statistiques, backend=self.backend, workers=len(self._workers),
+                    en_attente=sum(w.file.qsize() for w in self._workers if w.file is not None),
+                    en_cours=len(self._en_vol))
+        for cle in ("resolutions", "gabarits_reutilises", "gabarits_construits"):
+            etat[cle] = sum(w.statistiques[cle] for w in self._workers)
+        return etat
+
+    async def appeler(self, methode, params=None):
+        """
+        Exécuter une méthode JSON-RPC et retourner son résultat (ErreurRpc en cas d'erreur).
+        """
+        self.statistiques["requetes"] += 1
+        if methode == "criteres":
+            return list(CRITERES)
+        if methode == "etat":
+            return self.etat()
+        if methode != "solve":
+            raise ErreurRpc(METHODE_INCONNUE, f"Méthode inconnue : {methode} (attendu : solve, criteres, etat)")
+        if not isinstance(params, dict):
+            raise ErreurRpc(PARAMETRES_INVALIDES, "params doit être un objet {critere, instance, options, limites}.")
+        return await self.resoudre(params.get("critere"), params.get("instance"), params.get("options"),
+                                   params.get("limites"))
+
+    async def resoudre(self, critere, instance, options=None, limites=None):
+        """
+        Résoudre une instance dans la file de son worker ; une requête identique déjà en cours
+        est partagée.
+        """
+        options = options or {}
+        if critere not in CRITERES:
+            raise ErreurRpc(PARAMETRES_INVALIDES, f"Critère inconnu : {critere} (attendu : {', '.join(CRITERES)})")
+        if not isinstance(instance, (dict, str)):
+            raise ErreurRpc(PARAMETRES_INVALIDES, "instance doit être un objet JSON ou un chemin.")
+        if not isinstance(options, dict) or any(nom in options for nom in _RESERVES):
+            raise ErreurRpc(PARAMETRES_INVALIDES,
+                            f"options doit être un objet sans les arguments {', '.join(_RESERVES)}.")
+        if limites is not None and not isinstance(limites, dict):
+            raise ErreurRpc(PARAMETRES_INVALIDES, "limites doit être un objet {temps, gap, noeuds}.")
+
+        cle = empreinte(json.dumps([critere, instance, options, limites], sort_keys=True))
+        if cle in self._en_vol:
+            self.statistiques["coalescees"] += 1
+            return dict(await asyncio.shield(self._en_vol[cle]), coalescee=True)
+
+        worker, cle_graphe = self._choisir_worker(critere, instance)
+        future = asyncio.get_running_loop().create_future()
+        try:
+            worker.file.put_nowait((critere, instance, options, limites, cle_graphe, future, time.perf_counter()))
+        except asyncio.QueueFull:
+            self.statistiques["refusees"] += 1
+            raise ErreurRpc(FILE_PLEINE, "File d'attente pleine, réessayer plus tard.") from None
+        self._en_vol[cle] = future
+        future.add_done_callback(lambda _: self._en_vol.pop(cle, None))
+        return dict(await asyncio.shield(future), coalescee=False)
+
+    def _choisir_worker(self, critere, instance):
+        """
+        Worker d'une requête et clé de son graphe : les requêtes d'un même graphe vont au même
+        worker (gabarits), les autres au worker dont la file est la plus courte.
+        """
+        if CRITERES[critere][0] != "chemin":
+            return min(self._workers, key=lambda w: w.file.qsize()), None
+        if isinstance(instance, str):
+            cle = empreinte(os.path.abspath(instance), _date_modification(instance))
+        else:
+            cle = empreinte(instance.get("nodes"), instance.get("arcs"))
+        return self._workers[int(cle[:8], 16) % len(self._workers)], cle
+
+    async def _boucle(self, worker):
+        loop = asyncio.get_running_loop()
+        while True:
+            critere, instance, options, limites, cle_graphe, future, soumission = await worker.file.get()
+            try:
+                sortie = await loop.run_in_executor(worker.executor, worker.resoudre, critere, instance, options,
+                                                    limites, cle_graphe, soumission)
+            except (ValueError, TypeError, KeyError, OSError) as e:
+                self.statistiques["erreurs"] += 1
+                _terminer(future, exception=ErreurRpc(PARAMETRES_INVALIDES, f"{type(e).__name__}: {e}"))
+            except Exception as e:
+                self.statistiques["erreurs"] += 1
+                _terminer(future, exception=ErreurRpc(ERREUR_RESOLUTION, f"{type(e).__name__}: {e}"))
+            else:
+                _terminer(future, resultat=sortie)
+            finally:
+                worker.file.task_done()
+
+    async def _traiter(self, requete):
+        """
+        Réponse JSON-RPC à une requête décodée (None pour une notification).
+        """
+        if not isinstance(requete, dict) or requete.get("jsonrpc") != "2.0" or not isinstance(requete.get("method"), str):
+            ident = requete.get("id") if isinstance(requete, dict) else None
+            return _reponse_erreur(ident, REQUETE_INVALIDE, "Requête JSON-RPC 2.0 invalide.")
+        ident = requete.get("id")
+        try:
+            resultat = await self.appeler(requete["method"], requete.get("params"))
+        except ErreurRpc as e:
+            reponse = _reponse_erreur(ident, e.code, e.message)
+        except Exception as e:
+            reponse = _reponse_erreur(ident, ERREUR_INTERNE, f"{type(e).__name__}: {e}")
+        else:
+            reponse = {"jsonrpc": "2.0", "id": ident, "result": resultat}
+        return reponse if "id" in requete else None
+
+    async def _rpc(self, corps):
+        """
+        Code HTTP et réponse JSON-RPC (objet, liste ou None) du corps d'une requête POST.
+        """
+        try:
+            requete = json.loads(corps)
+        except ValueError:
+            return 200, _reponse_erreur(None, ERREUR_ANALYSE, "JSON invalide.")
+        if isinstance(requete, list):
+            if not requete:
+                return 200, _reponse_erreur(None, REQUETE_INVALIDE, "Lot JSON-RPC vide.")
+            reponses = [r for r in await asyncio.gather(*(self._traiter(r) for r in requete)) if r is not None]
+            return (200, reponses) if reponses else (204, None)
+        reponse = await self._traiter(requete)
+        if reponse is None:
+            return 204, None
+        return (503 if reponse.get("error", {}).get("code") == FILE_PLEINE else 200), reponse
+
+    async def _connexion(self, reader, writer):
+        """
+        Connexion HTTP/1.1 (connexions persistantes) : POST / (JSON-RPC) et GET /etat.
+        """
+        try:
+            while True:
+                ligne = await reader.readline()
+                if not ligne.strip():
+                    break
+                try:
+                    methode, cible, version = ligne.decode("latin-1").split()
+                except ValueError:
+                    await _repondre(writer, 400, None, garder=False)
+                    break
+                entetes = {}
+                ligne = await reader.readline()
+                while ligne.strip():
+                    nom, _, valeur = ligne.decode("latin-1").partition(":")
+                    entetes[nom.strip().lower()] = valeur.strip().lower()
+                    ligne = await reader.readline()
+                garder = entetes.get("connection", "keep-alive" if version == "HTTP/1.1" else "close") != "close"
+                longueur = int(entetes.get("content-length", 0) or 0)
+                if longueur > TAILLE_MAX_REQUETE:
+                    await _repondre(writer, 413, None, garder=False)
+                    break
+                corps = await reader.readexactly(longueur)
+
+                if methode == "GET" and cible == "/etat":
+                    code, reponse = 200, self.etat()
+                elif cible not in ("/", "/rpc"):
+                    code, reponse = 404, None
+                elif methode != "POST":
+                    code, reponse = 405, None
+                else:
+                    code, reponse = await self._rpc(corps)
+                await _repondre(writer, code, reponse, garder)
+                if not garder:
+                    break
+        except (asyncio.IncompleteReadError, ConnectionError, ValueError):
+            pass
+        finally:
+            writer.close()
+
+
+def _date_modification(chemin):
+    # fichier JSON ou instance.json d'une instance binaire
+    fichier = os.path.join(chemin, "instance.json") if os.path.isdir(chemin) else chemin
+    try:
+        return os.stat(fichier).st_mtime_ns
+    except OSError:
+        return None
+
+
+def _terminer(future, resultat=None, exception=None):
+    if future.done():
+        return
+    if exception is not None:
+        future.set_exception(exception)
+    else:
+        future.set_result(resultat)
+
+
+def _reponse_erreur(ident, code, message):
+    return {"jsonrpc": "2.0", "id": ident, "error": {"code": code, "message": message}}
+
+
+async def _repondre(writer, code, donnees, garder):
+    corps = b"" if donnees is None else json.dumps(donnees, ensure_ascii=False).encode("utf-8")
+    entetes = [f"HTTP/1.1 {code} {_STATUTS_HTTP[code]}", f"Content-Length: {len(corps)}",
+               f"Connection: {'keep-alive' if garder else 'close'}"]
+    if corps:
+        entetes.append("Content-Type: application/json; charset=utf-8")
+    writer.write(("\r\n".join(entetes) + "\r\n\r\n").encode("latin-1") + corps)
+    await writer.drain()
+
+
+def appel_rpc(methode, params=None, hote=HOTE, port=PORT, timeout=None):
+    """
+    Client minimal (urllib) : appeler une méthode du service et retourner son résultat
+    (RuntimeError avec le code et le message d'une erreur JSON-RPC).
+    """
+    corps = json.dumps({"jsonrpc": "2.0", "id": 1, "method": methode, "params": params}).encode("utf-8")
+    requete = urllib.request.Request(f"http://{hote}:{port}/", data=corps,
+                                     headers={"Content-Type": "application/json"})
+    try:
+        with urllib.request.urlopen(requete, timeout=timeout) as f:
+            reponse = json.load(f)
+    except urllib.error.HTTPError as e:
+        if e.code != 503:
+            raise
+        reponse = json.load(e)
+    if "error" in reponse:
+        raise RuntimeError(f"{reponse['error']['code']}: {reponse['error']['message']}")
+    return reponse["result"]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m serveurResolution", description="Service local de résolution.")
+    parser.add_argument("--hote", default=HOTE)
+    parser.add_argument("--port", type=int, default=PORT)
+    parser.add_argument("--workers", type=int, default=None, help="nombre de workers (tous les cœurs par défaut)")
+    parser.add_argument("--threads", type=int, default=None, help="threads de Gurobi par worker")
+    parser.add_argument("--taille-file", type=int, default=TAILLE_FILE, help="requêtes en attente par worker")
+    parser.add_argument("--backend", default=None, choices=("gurobi", "highs"))
+    parser.add_argument("--gabarits-max", type=int, default=GABARITS_MAX, help="graphes gardés par worker")
+    args = parser.parse_args(argv)
+
+    serveur = ServeurResolution(args.hote, args.port, args.workers, args.threads, args.taille_file, args.backend,
+                                args.gabarits_max)
+    try:
+        asyncio.run(serveur.servir())
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
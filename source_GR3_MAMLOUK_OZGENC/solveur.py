@@ -0,0 +1,293 @@
+import os
+import threading
+import time
+
+# gurobipy est facultatif : sans lui (ou sans licence), seul le backend "highs" est disponible
+try:
+    from gurobipy import Env, Model, GRB, GurobiError, quicksum
+except ImportError:
+    Env = Model = GRB = GurobiError = quicksum = None
+
+# backends de résolution des programmes linéaires en nombres entiers
+BACKENDS = ("gurobi", "highs")
+
+# statuts d'une résolution arrêtée par une limite (Limites) avant la preuve d'optimalité
+STATUTS_LIMITE = ("TIME_LIMIT", "NODE_LIMIT", "INTERRUPTED")
+
+# noms des statuts de résolution de Gurobi
+_NOMS_STATUTS = {getattr(GRB.Status, nom): nom for nom in dir(GRB.Status) if nom.isupper()} if GRB else {}
+
+# environnements créés pour un contexte sérialisé vers un autre processus (pool de processus) :
+# partagés par toutes les copies du contexte d'un thread du worker, libérés à la fin du processus
+_envs_locaux = threading.local()
+
+
+class ContexteSolveur:
+    """
+    Contexte de résolution partagé : un seul environnement Gurobi (Env) pour tous les
+    modèles, avec ses paramètres (threads, limite de temps, limite mémoire, ...), et
+    une libération explicite par dispose().
+
+    Utilisation :
+        with ContexteSolveur(threads=4) as ctx:
+            maxmin(..., ctx=ctx)
+            minmaxRegret(..., ctx=ctx)
+
+    Un Env Gurobi ne doit pas être partagé entre threads ni entre processus : hors de son
+    thread d'origine (pool de threads) ou une fois sérialisé vers un autre processus (pool
+    de processus), le contexte utilise un environnement propre au thread courant, créé
+    une seule fois avec les mêmes paramètres. Les environnements des autres threads du
+    processus d'origine sont libérés avec celui du contexte par dispose().
+    """
+
+    def __init__(self, threads=None, time_limit=None, mem_limit=None, **params):
+        self.params = {"OutputFlag": 0}
+        if threads is not None:
+            self.params["Threads"] = threads
+        if time_limit is not None:
+            self.params["TimeLimit"] = time_limit
+        if mem_limit is not None:
+            self.params["MemLimit"] = mem_limit
+        self.params.update(params)
+
+        self._proprietaire = (os.getpid(), threading.get_ident())
+        # environnements des autres threads du processus d'origine : {thread: Env}
+        self._envs_threads = {}
+        self._verrou = threading.Lock()
+        self.env = _creer_env(self.params)
+
+    def environnement(self):
+        """
+        Retourner l'environnement Gurobi à utiliser dans le thread courant.
+        """
+        if self._proprietaire is not None:
+            if self.env is None:
+                raise ValueError("Le contexte solveur a été libéré (dispose).")
+            if self._proprietaire == (os.getpid(), threading.get_ident()):
+                return self.env
+            thread = threading.get_ident()
+            with self._verrou:
+                if thread not in self._envs_threads:
+                    self._envs_threads[thread] = _creer_env(self.params)
+                return self._envs_threads[thread]
+
+        envs = getattr(_envs_locaux, "envs", None)
+        if envs is None:
+            envs = _envs_locaux.envs = {}
+        cle = tuple(sorted(self.params.items()))
+        if cle not in envs:
+            envs[cle] = _creer_env(self.params)
+        return envs[cle]
+
+    def modele(self, name):
+        """
+        Créer un modèle dans l'environnement du contexte.
+        """
+        return Model(name, env=self.environnement())
+
+    def dispose(self):
+        """
+        Libérer l'environnement Gurobi et ceux créés pour les autres threads (les modèles
+        créés doivent déjà être libérés et les threads avoir terminé leurs résolutions).
+        """
+        if self._proprietaire is None:
+            # copie sérialisée : les environnements du worker sont partagés (_envs_locaux)
+            return
+        with self._verrou:
+            envs, self._envs_threads = list(self._envs_threads.values()), {}
+        for env in envs:
+            env.dispose()
+        if self.env is not None:
+            self.env.dispose()
+            self.env = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.dispose()
+
+    # seuls les paramètres sont transmis aux processus workers
+    def __getstate__(self):
+        return {"params": self.params}
+
+    def __setstate__(self, state):
+        self.params = state["params"]
+        self._proprietaire = None
+        self.env = None
+
+
+class Limites:
+    """
+    Limites d'une résolution (mode « anytime ») : quand une limite est atteinte, les fonctions
+    de résolution retournent la meilleure solution trouvée (statut "TIME_LIMIT" ou
+    "NODE_LIMIT") avec sa borne et son écart relatif (gap) au lieu d'échouer.
+
+    Paramètres :
+    - temps : durée maximale de l'appel (s), calcul de z* compris.
+    - gap : écart relatif |borne - objectif| / |objectif| suffisant pour s'arrêter (MIPGap).
+    - noeuds : nombre maximal de nœuds de l'arbre de branchement (NodeLimit).
+    - callback : fonction appelée à chaque nouvelle meilleure solution avec un dictionnaire
+      {"objectif", "borne", "gap", "temps", "solution"} (temps depuis le début de l'appel ;
+      solution : vecteur de sélection des projets ou arcs du chemin). Avec le backend
+      "highs", seule la solution finale est signalée.
+
+    Utilisation :
+        res = maxmin(..., limites=Limites(temps=2.0, gap=0.01, callback=print))
+        res.statut, res.objectif, res.borne, res.gap
+    """
+
+    def __init__(self, temps=None, gap=None, noeuds=None, callback=None):
+        self.temps = temps
+        self.gap = gap
+        self.noeuds = noeuds
+        self.callback = callback
+
+    def temps_restant(self, debut=None):
+        """
+        Temps restant (s) sur la limite de temps pour un appel commencé à debut
+        (time.perf_counter), None sans limite de temps.
+        """
+        if self.temps is None:
+            return None
+        if debut is None:
+            return self.temps
+        return max(0.0, self.temps - (time.perf_counter() - debut))
+
+    def parametres(self, debut=None):
+        """
+        Paramètres Gurobi correspondant aux limites.
+        """
+        params = {}
+        if self.temps is not None:
+            params["TimeLimit"] = self.temps_restant(debut)
+        if self.gap is not None:
+            params["MIPGap"] = self.gap
+        if self.noeuds is not None:
+            params["NodeLimit"] = self.noeuds
+        return params
+
+    def signaler(self, objectif, borne, temps, solution):
+        """
+        Transmettre une nouvelle meilleure solution au callback.
+        """
+        if self.callback is not None:
+            self.callback({"objectif": objectif, "borne": borne, "gap": ecart(objectif, borne), "temps": temps,
+                           "solution": solution})
+
+
+def ecart(objectif, borne):
+    """
+    Écart relatif |borne - objectif| / |objectif| (définition de Gurobi), None si l'un des
+    deux est inconnu ou si l'écart n'est pas défini (objectif nul, borne différente).
+    """
+    if objectif is None or borne is None:
+        return None
+    if objectif == 0:
+        return 0.0 if borne == 0 else None
+    return abs(borne - objectif) / abs(objectif)
+
+
+def optimiser(m, limites=None, debut=None, variables=None, solution=None):
+    """
+    Résoudre le modèle Gurobi m sous les limites de limites (Limites, None : sans limite) ;
+    debut : instant (time.perf_counter) du début de l'appel, pour la limite de temps. Avec un
+    callback, les valeurs de variables (MVar ou liste de variables) sont lues à chaque
+    nouvelle meilleure solution et converties par solution(valeurs).
+    """
+    if limites is None:
+        m.optimize()
+        return
+    for nom, valeur in limites.parametres(debut).items():
+        m.setParam(nom, valeur)
+    if limites.callback is None or variables is None:
+        m.optimize()
+        return
+
+    if debut is None:
+        debut = time.perf_counter()
+
+    def rappel(model, where):
+        if where == GRB.Callback.MIPSOL:
+            valeurs = model.cbGetSolution(variables)
+            borne = model.cbGet(GRB.Callback.MIPSOL_OBJBND)
+            limites.signaler(model.cbGet(GRB.Callback.MIPSOL_OBJ), borne if abs(borne) < GRB.INFINITY else None,
+                             time.perf_counter() - debut, solution(valeurs) if solution is not None else valeurs)
+
+    m.optimize(rappel)
+
+
+def reinitialiser_limites(m):
+    """
+    Remettre les paramètres de Limites.parametres à leur valeur par défaut (modèle réutilisé
+    entre des appels aux limites différentes).
+    """
+    for nom in ("TimeLimit", "MIPGap", "NodeLimit"):
+        m.setParam(nom, m.getParamInfo(nom)[5])
+
+
+def borne_gurobi(m):
+    """
+    Borne (ObjBound) et écart relatif (MIPGap) du modèle m après résolution, None s'ils ne
+    sont pas disponibles (borne infinie comprise).
+    """
+    try:
+        borne = m.ObjBound
+    except (AttributeError, GurobiError):
+        return None, None
+    if abs(borne) >= GRB.INFINITY:
+        return None, None
+    return borne, ecart(m.ObjVal, borne) if m.SolCount > 0 else None
+
+
+def gurobi_disponible():
+    return GRB is not None
+
+
+def choisir_backend(backend=None):
+    """
+    Backend à utiliser pour l'argument backend des fonctions : "gurobi", "highs"
+    (scipy.optimize.milp, voir programmeLineaire.py) ou None ("gurobi" si gurobipy est
+    installé, "highs" sinon).
+    """
+    if backend is None:
+        return "gurobi" if gurobi_disponible() else "highs"
+    if backend not in BACKENDS:
+        raise ValueError(f"Backend inconnu : {backend} (attendu : {', '.join(BACKENDS)})")
+    if backend == "gurobi":
+        _verifier_gurobi()
+    return backend
+
+
+def _verifier_gurobi():
+    if not gurobi_disponible():
+        raise ImportError("gurobipy n'est pas installé : utiliser backend=\"highs\".")
+
+
+def _creer_env(params):
+    _verifier_gurobi()
+    env = Env(empty=True)
+    for nom, valeur in params.items():
+        env.setParam(nom, valeur)
+    env.start()
+    return env
+
+
+def nouveau_modele(name, ctx=None):
+    """
+    Créer un modèle Gurobi dans l'environnement de ctx, ou dans l'environnement par
+    défaut (sans sorties) si aucun contexte n'est fourni.
+    """
+    if ctx is not None:
+        return ctx.modele(name)
+    _verifier_gurobi()
+    m = Model(name)
+    m.setParam('OutputFlag', 0)  # Désactiver les logs de Gurobi
+    return m
+
+
+def statut_gurobi(m):
+    """
+    Nom du statut de résolution du modèle m ("OPTIMAL", "INFEASIBLE", "TIME_LIMIT", ...).
+    """
+    return _NOMS_STATUTS.get(m.Status, str(m.Status))
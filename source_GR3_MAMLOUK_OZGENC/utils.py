@@ -1,87 +1,374 @@
-import random
-import time
-import pandas as pd
-from gurobipy import Model, GRB, quicksum
-
-def calcul_tps_resol(func, n_values, p_values, nb_instances, OWA=False):
-    # stocker les résultats
-    results = []
-
-    # itérer sur les différentes combinaisons de n et p
-    for n in n_values:
-        for p in p_values:
-            times = []
-            
-            for _ in range(nb_instances):
-                # generer aleatoirement les couts et les utilités entre 1 et 100
-                costs = [random.randint(1, 100) for _ in range(p)]
-                utilities = [[random.randint(1, 100) for _ in range(p)] for _ in range(n)]
-                
-                # budget = 50% du cout total
-                budget = int(0.5 * sum(costs))
-
-                # generer aleatoirement les poids entre 1 et le nombre de scenarios
-                if OWA:
-                    weights = [random.randint(1, n+1) for _ in range(n)]
-
-                # start timing
-                start_time = time.time()
-                
-                if OWA:
-                    # Resolution du problème de OWA
-                    func(p, n, costs, utilities, budget, weights, verbose=False)
-                else:
-                    # appel de la fonction
-                    func(p, n, costs, utilities, budget, verbose=False)
-
-                # stocker le temps de résolution
-                times.append(time.time() - start_time)
-
-            # Calculer le temps moyen de résolution
-            average_time = sum(times) / len(times) if times else None
-            results.append({
-                "n": n,
-                "p": p,
-                "average_resolution_time": average_time
-            })
-
-   
-    results_df = pd.DataFrame(results)
+from functools import partial
+import numpy as np
+from parallele import executer_par_scenario, nb_workers, threads_par_worker
+from solveur import GRB, choisir_backend, nouveau_modele, statut_gurobi
+from programmeLineaire import ProgrammeLineaire
+from cacheZStar import choisir_cache, empreinte
+
+def calcul_tps_resol(func, n_values, p_values, nb_instances, OWA=False, seed=None, generation=None, **kwargs):
+    """
+    Temps moyen de résolution de func (maxmin, minmaxRegret, maxOWA, minOWA ou une fonction
+    de chemin robuste de cheminRobuste.py) sur des instances aléatoires, pour chaque couple
+    (n, p) ; pour les chemins, p est le nombre de sommets et generation règle le générateur
+    de graphes. Les mesures sont faites par le banc d'essai (benchmark.py) ; seed fixe les
+    instances (None : instances aléatoires).
+    OWA est conservé pour compatibilité : les poids sont générés pour les critères OWA.
+    kwargs : arguments supplémentaires transmis à func (par exemple formulation="compact").
+    """
+    from benchmark import FONCTIONS, lancer_benchmark
+
+    critere = FONCTIONS.get(func.__name__, func.__name__)
+    resume, _ = lancer_benchmark([critere], n_values, p_values, nb_instances, seed=seed, options=kwargs,
+                                 generation=generation)
+
+    results_df = resume[["n", "p"]].copy()
+    results_df["average_resolution_time"] = resume["total_moyenne"]
     print(results_df)
-    return 
+    return results_df
+
+def comparer_formulations_owa(func, n_values, p_values, nb_instances, seed=0):
+    """
+    Comparer les temps de résolution des formulations "standard" et "compact" de maxOWA
+    ou minOWA (func) sur les mêmes instances aléatoires (même graine pour les deux).
+    """
+    temps = {}
+    for formulation in ("standard", "compact"):
+        print(f"Formulation {formulation} :")
+        df = calcul_tps_resol(func, n_values, p_values, nb_instances, OWA=True, seed=seed, formulation=formulation)
+        temps[formulation] = df["average_resolution_time"]
+
+    comparaison = df[["n", "p"]].copy()
+    comparaison["standard"] = temps["standard"]
+    comparaison["compact"] = temps["compact"]
+    comparaison["acceleration"] = comparaison["standard"] / comparaison["compact"]
+    print(comparaison)
+    return comparaison
+
+def en_matrices(nb_projects, nb_scenarios, costs, utilities):
+    """
+    Convertir les coûts et les utilités (listes ou tableaux NumPy) en tableaux NumPy de
+    flottants : vecteur des coûts (p) et matrice des utilités (n x p).
+    """
+    c = np.asarray(costs, dtype=float)[:nb_projects]
+    u = np.asarray(utilities, dtype=float)[:nb_scenarios, :nb_projects]
+    return c, u
 
-def z_star(nb_projects, nb_scenarios, costs, utilities, budget):
+def vecteur_selection(valeurs):
+    """
+    Vecteur de sélection 0/1 (entiers) à partir des valeurs des variables x d'une solution.
+    """
+    return np.rint(valeurs).astype(int)
+
+# limites d'utilisation du moteur "dp" de z_star en mode "auto"
+DP_BUDGET_MAX = 10 ** 5        # budget entier maximal
+DP_TABLE_MAX = 10 ** 8         # nombre maximal de cases de la table des décisions (projets x scénarios x budget)
+
+def z_star(nb_projects, nb_scenarios, costs, utilities, budget, engine="auto", n_jobs=1, mode="process", ctx=None,
+           cache=True, backend=None):
     """
     Résoudre le problème de maximisation de l'utilité pour chaque scénario i
     et retourner les valeurs optimales z*_i et les valeurs des variables x_j
-    pour chaque scénario i.
-    
-       """
-    # trouver z*_i pour chaque scénario i
+    pour chaque scénario i (tableaux NumPy : z* de nb_scenarios valeurs et x* de
+    nb_scenarios lignes).
+
+    engine : "mip" (un programme Gurobi par scénario), "dp" (programmation dynamique
+    sur le budget, vectorisée sur tous les scénarios ; coûts entiers positifs) ou
+    "auto" ("dp" si les coûts sont entiers et le budget assez petit, "mip" sinon).
+
+    n_jobs : nombre de workers pour résoudre les scénarios en parallèle (1 = séquentiel,
+    None = tous les cœurs) ; mode : "process" ou "thread". Les résultats restent dans
+    l'ordre des scénarios. Avec "mip", chaque worker est limité à une part des cœurs
+    (paramètre Threads de Gurobi) ; avec "dp", les scénarios sont découpés en blocs.
+
+    ctx : ContexteSolveur (environnement Gurobi partagé) ; environnement par défaut si None.
+
+    cache : True (cache par défaut de cacheZStar), False (pas de cache) ou un CacheZStar ;
+    la clé est l'empreinte des coûts, des utilités et du budget.
+
+    backend : solveur du moteur "mip", "gurobi", "highs" (scipy.optimize.milp) ou None
+    (Gurobi s'il est installé).
+    """
+    if engine not in ("auto", "dp", "mip"):
+        raise ValueError(f"Moteur inconnu : {engine} (attendu : auto, dp, mip)")
+    backend = choisir_backend(backend)
+
+    cache = choisir_cache(cache)
+    if cache is not None:
+        c, u = en_matrices(nb_projects, nb_scenarios, costs, utilities)
+        cle = empreinte("z_star", c, u, float(budget))
+        valeur = cache.get(cle)
+        if valeur is None:
+            valeur = _calculer_z_star(nb_projects, nb_scenarios, costs, utilities, budget, engine, n_jobs, mode, ctx,
+                                      backend)
+            valeur = _entree_z_star(*valeur)
+            cache.put(cle, valeur)
+        return _copie_z_star(valeur)
+    return _copie_z_star(_calculer_z_star(nb_projects, nb_scenarios, costs, utilities, budget, engine, n_jobs, mode,
+                                          ctx, backend))
+
+
+def _entree_z_star(z, xs):
+    """
+    Entrée du cache de z* : z en float64 et les solutions x*_i en matrice uint8 (une ligne
+    par scénario).
+    """
+    return np.asarray(z, dtype=np.float64), np.rint(np.asarray(xs, dtype=float)).astype(np.uint8)
+
+
+def _copie_z_star(valeur):
+    """
+    Copies de (z*, x*) en tableaux float64 : l'appelant peut les modifier sans altérer le
+    cache (les entrées disque au format tuple sont converties de la même façon).
+    """
+    return np.array(valeur[0], dtype=float), np.array(valeur[1], dtype=float)
+
+
+def _calculer_z_star(nb_projects, nb_scenarios, costs, utilities, budget, engine, n_jobs, mode, ctx, backend):
+    if engine == "auto":
+        engine = "dp" if _dp_applicable(nb_projects, nb_scenarios, costs, budget) else "mip"
+
+    if engine == "dp":
+        if not _couts_entiers(costs[:nb_projects]) or budget < 0:
+            raise ValueError("Le moteur dp requiert des coûts entiers positifs et un budget positif.")
+        if nb_workers(n_jobs) == 1:
+            return _z_star_dp(nb_projects, nb_scenarios, costs, utilities, budget)
+        # un bloc de scénarios par worker
+        n = min(nb_workers(n_jobs), nb_scenarios)
+        blocs = [[utilities[i] for i in range(k, nb_scenarios, n)] for k in range(n)]
+        resultats = executer_par_scenario(partial(_z_star_dp_bloc, nb_projects=nb_projects, costs=costs, budget=budget),
+                                          blocs, n_jobs=n, mode=mode)
+        # remettre les scénarios dans leur ordre d'origine (le bloc k contient k, k+n, k+2n, ...)
+        z_star, x_values = [None] * nb_scenarios, [None] * nb_scenarios
+        for k, (z_bloc, x_bloc) in enumerate(resultats):
+            z_star[k::n] = z_bloc
+            x_values[k::n] = x_bloc
+        return z_star, x_values
+
+    threads = threads_par_worker(n_jobs) if nb_workers(n_jobs) > 1 else None
+    resultats = executer_par_scenario(
+        partial(_z_star_scenario, nb_projects=nb_projects, costs=costs, budget=budget, threads=threads, ctx=ctx,
+                backend=backend),
+        range(nb_scenarios), (utilities[i] for i in range(nb_scenarios)), n_jobs=n_jobs, mode=mode)
+    return [z for z, _ in resultats], [x for _, x in resultats]
+
+
+def z_star_bornes(nb_projects, nb_scenarios, costs, utilities, budget):
+    """
+    Encadrer z*_i sans programme en nombres entiers, pour tous les scénarios à la fois
+    (calcul vectorisé, coûts positifs ou nuls) : projets de chaque scénario triés par
+    utilité / coût décroissante,
+    - borne inférieure : plus long préfixe de cet ordre qui tient dans le budget (sélection
+      réalisable) ;
+    - borne supérieure : relaxation linéaire du sac à dos (borne de Dantzig), soit le
+      préfixe plus la fraction du projet suivant qui épuise le budget.
+
+    Retourne (z_inf, z_sup), tableaux NumPy de nb_scenarios valeurs.
+    """
+    c, u = en_matrices(nb_projects, nb_scenarios, costs, utilities)
+    # un projet d'utilité négative n'est jamais pris par la relaxation
+    gains = np.maximum(u, 0.0)
+    ordre = np.argsort(-gains / np.maximum(c, 1e-12), axis=1, kind="stable")
+    couts = c[ordre]
+    gains = np.take_along_axis(gains, ordre, axis=1)
+    cumul_couts = np.cumsum(couts, axis=1)
+    cumul_gains = np.cumsum(gains, axis=1)
+
+    # taille du préfixe réalisable (cumul croissant : coûts positifs ou nuls)
+    k = (cumul_couts <= budget).sum(axis=1)
+    lignes, dernier = np.arange(len(u)), np.maximum(k - 1, 0)
+    z_inf = np.where(k > 0, cumul_gains[lignes, dernier], 0.0)
+    reste = budget - np.where(k > 0, cumul_couts[lignes, dernier], 0.0)
+    suivant = np.minimum(k, len(c) - 1)
+    fraction = np.where(k < len(c), gains[lignes, suivant] * reste / np.maximum(couts[lignes, suivant], 1e-12), 0.0)
+    return z_inf, z_inf + np.maximum(fraction, 0.0)
+
+
+def z_star_budgets(nb_projects, nb_scenarios, costs, utilities, budgets, engine="auto", n_jobs=1, mode="process",
+                   ctx=None, cache=True, backend=None):
+    """
+    Calculer z*_i et les solutions x*_i de chaque scénario pour plusieurs budgets, en
+    partageant les calculs d'un budget à l'autre. Retourne un dictionnaire
+    {budget: (z_star, x_values)}.
+
+    - "dp" : une seule table de programmation dynamique, construite pour le plus grand
+      budget, donne z*_i(b) pour tous les budgets b plus petits.
+    - "mip" : les budgets sont traités par ordre décroissant ; une solution x*_i reste
+      optimale pour un budget plus petit tant que son coût ne le dépasse pas (l'ensemble
+      réalisable diminue), seuls les autres scénarios sont résolus à nouveau.
+
+    engine, n_jobs, mode, ctx, cache et backend : comme pour z_star (une entrée de cache par budget).
+    """
+    if engine not in ("auto", "dp", "mip"):
+        raise ValueError(f"Moteur inconnu : {engine} (attendu : auto, dp, mip)")
+    backend = choisir_backend(backend)
+
+    cache = choisir_cache(cache)
+    c, u = en_matrices(nb_projects, nb_scenarios, costs, utilities)
+
+    resultats = {}
+    a_calculer = []
+    for b in sorted(set(budgets), reverse=True):
+        valeur = cache.get(empreinte("z_star", c, u, float(b))) if cache is not None else None
+        if valeur is None:
+            a_calculer.append(b)
+        else:
+            resultats[b] = valeur
+
+    if a_calculer:
+        if engine == "auto":
+            engine = "dp" if _dp_applicable(nb_projects, nb_scenarios, costs, a_calculer[0]) else "mip"
+
+        if engine == "dp":
+            if not _couts_entiers(costs[:nb_projects]) or a_calculer[-1] < 0:
+                raise ValueError("Le moteur dp requiert des coûts entiers positifs et des budgets positifs.")
+            c_entiers = c.astype(np.int64)
+            dp, garder = _table_dp(c_entiers, u, int(a_calculer[0]))
+            calcules = {b: _reconstruire_dp(c_entiers, dp, garder, int(b)) for b in a_calculer}
+        else:
+            calcules = _z_star_mip_budgets(nb_projects, nb_scenarios, c, utilities, a_calculer, n_jobs, mode, ctx,
+                                           backend)
+
+        for b, (z, xs) in calcules.items():
+            resultats[b] = _entree_z_star(z, xs)
+            if cache is not None:
+                cache.put(empreinte("z_star", c, u, float(b)), resultats[b])
+
+    return {b: _copie_z_star(valeur) for b, valeur in resultats.items()}
+
+
+def _z_star_mip_budgets(nb_projects, nb_scenarios, c, utilities, budgets, n_jobs, mode, ctx, backend):
+    """
+    z* par Gurobi pour des budgets donnés par ordre décroissant, en ne résolvant à nouveau
+    que les scénarios dont la solution précédente dépasse le budget courant.
+    """
+    threads = threads_par_worker(n_jobs) if nb_workers(n_jobs) > 1 else None
+    resultats = {}
+    z, xs = None, None
+    for b in budgets:
+        if z is None:
+            a_resoudre = list(range(nb_scenarios))
+            z, xs = [None] * nb_scenarios, [None] * nb_scenarios
+        else:
+            z, xs = list(z), list(xs)
+            a_resoudre = [i for i in range(nb_scenarios) if c @ np.asarray(xs[i]) > b + 1e-9]
+        solutions = executer_par_scenario(
+            partial(_z_star_scenario, nb_projects=nb_projects, costs=c, budget=b, threads=threads, ctx=ctx,
+                    backend=backend),
+            a_resoudre, (utilities[i] for i in a_resoudre), n_jobs=n_jobs, mode=mode)
+        for i, (z_i, x_i) in zip(a_resoudre, solutions):
+            z[i], xs[i] = z_i, x_i
+        resultats[b] = (z, xs)
+    return resultats
+
+
+def _couts_entiers(costs):
+    return all(float(c).is_integer() and c >= 0 for c in costs)
+
+
+def _dp_applicable(nb_projects, nb_scenarios, costs, budget):
+    """
+    Vrai si la programmation dynamique est utilisable et de taille raisonnable.
+    """
+    if budget < 0 or budget > DP_BUDGET_MAX or not _couts_entiers(costs[:nb_projects]):
+        return False
+    return nb_projects * nb_scenarios * (int(budget) + 1) <= DP_TABLE_MAX
+
+
+def _z_star_dp(nb_projects, nb_scenarios, costs, utilities, budget):
+    """
+    Sac à dos 0/1 par programmation dynamique sur l'axe du budget, pour tous les scénarios à la fois.
+    """
+    c = np.asarray(costs[:nb_projects], dtype=np.int64)
+    u = np.asarray([list(utilities[i][:nb_projects]) for i in range(nb_scenarios)], dtype=float)
+    dp, garder = _table_dp(c, u, int(budget))
+    return _reconstruire_dp(c, dp, garder, int(budget))
+
+
+def _table_dp(c, u, B):
+    """
+    dp[i, b] est la meilleure utilité du scénario i avec un budget b (pour tout b <= B) ;
+    la table garder mémorise les décisions pour reconstruire les solutions.
+    """
+    nb_projects = len(c)
+    nb_scenarios = u.shape[0]
+    dp = np.zeros((nb_scenarios, B + 1))
+    garder = np.zeros((nb_projects, nb_scenarios, B + 1), dtype=bool)
+
+    for j in range(nb_projects):
+        cj = c[j]
+        if cj > B:
+            continue
+        # prendre le projet j à partir de la table précédente (0/1 : pas de réutilisation)
+        candidat = dp[:, :B + 1 - cj] + u[:, j:j + 1]
+        meilleur = candidat > dp[:, cj:]
+        garder[j, :, cj:] = meilleur
+        dp[:, cj:] = np.where(meilleur, candidat, dp[:, cj:])
+    return dp, garder
+
+
+def _reconstruire_dp(c, dp, garder, b_max):
+    """
+    Valeurs optimales et solutions de chaque scénario pour le budget b_max <= B.
+    """
+    nb_projects = len(c)
     z_star = []
     x_values = []
-
-    for i in range(nb_scenarios):
-        # initialisation du modèle
-        m = Model("maximize_scenario_%d" % (i + 1))
-        m.setParam('OutputFlag', 0)  # Désactiver les logs de Gurobi
-        
-        # declaration des variables de decision, x_j = 1 si le projet j est sélectionné, 0 sinon
-        x = []
-        for j in range(nb_projects):
-            x.append(m.addVar(vtype=GRB.BINARY, name="x%d" % (j + 1)))
-
-        # definition de l'ojectif (maximiser z_i(x))
-        m.setObjective(quicksum(utilities[i][j] * x[j] for j in range(nb_projects)), GRB.MAXIMIZE)
-
-        # definition des contraintes
-        m.addConstr(quicksum(costs[j] * x[j] for j in range(nb_projects)) <= budget, "budget_constraint")
-
-        # Resolution
-        m.optimize()
-
-        # Stocker la valeur optimale de z_i
-        z_star.append(m.objVal)
-        # stocker les valeurs des variables x
-        x_values.append([x[j].x for j in range(nb_projects)])
+    for i in range(dp.shape[0]):
+        x = [0.0] * nb_projects
+        b = b_max
+        for j in range(nb_projects - 1, -1, -1):
+            if garder[j, i, b]:
+                x[j] = 1.0
+                b -= c[j]
+        z_star.append(float(dp[i, b_max]))
+        x_values.append(x)
     return z_star, x_values
+
+
+def _z_star_dp_bloc(utilities, nb_projects, costs, budget):
+    return _z_star_dp(nb_projects, len(utilities), costs, utilities, budget)
+
+
+def _z_star_scenario(i, utilities_i, nb_projects, costs, budget, threads=None, ctx=None, backend="gurobi"):
+    """
+    Résoudre le problème de maximisation de l'utilité du scénario i avec Gurobi (ou le backend donné).
+    utilities_i est la ligne des utilités du scénario i ; threads limite le nombre de
+    threads de Gurobi lorsque plusieurs scénarios sont résolus en parallèle.
+    """
+    if backend != "gurobi":
+        pl = ProgrammeLineaire("maximize_scenario_%d" % (i + 1), maximiser=True)
+        x = pl.binaires(nb_projects, obj=np.asarray(utilities_i, dtype=float)[:nb_projects])
+        pl.contraintes([(np.asarray(costs, dtype=float)[:nb_projects], x)], haut=budget)
+        sol = pl.resoudre(backend, ctx)
+        if sol.valeurs is None:
+            raise ValueError(f"Pas de solution pour le scénario {i + 1} (statut {sol.statut}).")
+        return sol.objectif, np.rint(sol.valeurs[x]).tolist()
+
+    # initialisation du modèle
+    m = nouveau_modele("maximize_scenario_%d" % (i + 1), ctx)
+    if threads is not None:
+        m.setParam('Threads', threads)
+
+    c = np.asarray(costs, dtype=float)[:nb_projects]
+    u = np.asarray(utilities_i, dtype=float)[:nb_projects]
+
+    # declaration des variables de decision, x_j = 1 si le projet j est sélectionné, 0 sinon
+    x = m.addMVar(nb_projects, vtype=GRB.BINARY, name="x")
+
+    # definition de l'ojectif (maximiser z_i(x))
+    m.setObjective(u @ x, GRB.MAXIMIZE)
+
+    # definition des contraintes
+    m.addConstr(c @ x <= budget, name="budget_constraint")
+
+    # Resolution
+    m.optimize()
+
+    # valeur optimale de z_i et valeurs des variables x
+    if m.SolCount == 0:
+        statut = statut_gurobi(m)
+        m.dispose()
+        raise ValueError(f"Pas de solution pour le scénario {i + 1} (statut {statut}).")
+    resultat = m.objVal, x.X.tolist()
+    m.dispose()
+    return resultat